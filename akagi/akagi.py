@@ -12,6 +12,7 @@ import jsonschema
 import subprocess
 from pathlib import Path
 from sys import executable
+from collections import deque
 from threading import Thread
 from functools import partial
 from datetime import datetime
@@ -32,7 +33,8 @@ from textual.widgets import (Button, Checkbox, Footer, Header, Input, Label, Sel
                              Digits, Static, RichLog, DataTable, ContentSwitcher,
                              Markdown, MarkdownViewer)
 
-from .logger import logger
+from .logger import logger, DEBUG_ENABLED
+from .log_tail import LogTail
 from .misc import TILE_2_UNICODE_ART_RICH, VERTICAL_RULE, EMPTY_VERTICAL_RULE, ADDITIONAL_THEMES
 from .libriichi_helper import meta_to_recommend
 from playwright_client.client import Client
@@ -280,13 +282,22 @@ class ModelsScreen(Screen):
 # ============================================= #
 class LogsScreen(Screen):
     BINDINGS = [("escape", "app.pop_screen", "back")]
+    FOLLOW_INTERVAL = 0.5
     def __init__(self, *args, **kwargs):
         self.log_names: set[str] = set()
         self.log_paths: dict[str, tuple[datetime, Path]] = {}
+        # 表示中ログの tail（末尾だけ読む・追記を追う・遡る）
+        self.log_tail: LogTail | None = None
+        self.log_window: deque[str] = deque()
+        self.paged_back = False
         super().__init__(*args, **kwargs)
 
     def on_mount(self) -> None:
-        pass
+        self.set_interval(self.FOLLOW_INTERVAL, self.follow_log)
+
+    def on_unmount(self) -> None:
+        if self.log_tail is not None:
+            self.log_tail.close()
 
     def compose(self) -> ComposeResult:
         self.update_files()
@@ -300,7 +311,12 @@ class LogsScreen(Screen):
             highlight=True, markup=True, auto_scroll=True,
             id="logs_log"
         )
-        yield Button("Refresh", variant="primary", id="logs_refresh_button")
+        yield Horizontal(
+            Button("Older", id="logs_older_button"),
+            Button("Latest", id="logs_latest_button"),
+            Button("Refresh", variant="primary", id="logs_refresh_button"),
+            id="logs_buttons",
+        )
         yield Footer()
 
     def update_files(self, log_dir: str = "./logs") -> None:
@@ -333,15 +349,68 @@ class LogsScreen(Screen):
 
     def on_tabs_tab_activated(self, event: Tabs.TabActivated) -> None:
         """Handle TabActivated message sent by Tabs."""
-        rich_log: RichLog = self.query_one("#logs_log")
         tab_name: str = event.tab.label_text
+        if self.log_tail is not None:
+            self.log_tail.close()
+        self.log_tail = LogTail(self.log_paths[tab_name][1])
+        self.show_latest()
+
+    def render_window(self, scroll_home: bool = False) -> None:
+        rich_log: RichLog = self.query_one("#logs_log")
         rich_log.clear()
-        with open(self.log_paths[tab_name][1], "rb") as f:
-            try:
-                content = f.read().decode("utf-8")
-            except UnicodeDecodeError:
-                content = f.read().decode("ascii", errors="replace")
-        rich_log.write(content)
+        if self.log_window:
+            rich_log.write("\n".join(self.log_window))
+        if scroll_home:
+            rich_log.scroll_home(animate=False)
+
+    def show_latest(self) -> None:
+        """Show the last few KB of the current log and resume following it."""
+        if self.log_tail is None:
+            return
+        rich_log: RichLog = self.query_one("#logs_log")
+        try:
+            lines = self.log_tail.tail()
+        except OSError as e:
+            logger.error(f"Failed to open log {self.log_tail.path}: {e}")
+            return
+        self.log_window = deque(lines, maxlen=rich_log.max_lines)
+        self.paged_back = False
+        rich_log.auto_scroll = True
+        self.render_window()
+
+    def follow_log(self) -> None:
+        """Timer: append lines written since the last tick (bounded read)."""
+        if self.log_tail is None or self.paged_back:
+            return
+        try:
+            lines = self.log_tail.follow()
+        except OSError:
+            return
+        if lines:
+            self.log_window.extend(lines)
+            rich_log: RichLog = self.query_one("#logs_log")
+            rich_log.write("\n".join(lines))
+
+    @on(Button.Pressed, "#logs_older_button")
+    def logs_older_button_clicked(self) -> None:
+        """Page backwards; following pauses until Latest is pressed."""
+        if self.log_tail is None:
+            return
+        lines = self.log_tail.older()
+        if not lines:
+            self.notify("Already at the beginning of the log.")
+            return
+        rich_log: RichLog = self.query_one("#logs_log")
+        self.paged_back = True
+        rich_log.auto_scroll = False
+        # 表示行数の上限を超えた分は新しい側から捨てる（Latest で取り直す）
+        window = lines + list(self.log_window)
+        self.log_window = deque(window[:rich_log.max_lines], maxlen=rich_log.max_lines)
+        self.render_window(scroll_home=True)
+
+    @on(Button.Pressed, "#logs_latest_button")
+    def logs_latest_button_clicked(self) -> None:
+        self.show_latest()
 
     @on(Button.Pressed, "#logs_refresh_button")
     def logs_refresh_button_clicked(self) -> None:
@@ -609,7 +678,7 @@ class Recommandation(Horizontal):
         if recommandation_button.label == "Reach":
             # I think Mortal can tolerate getting multiple reach
             # https://github.com/Equim-chan/Mortal/blob/3ec7a80f0f34446e9fd51c5df4a2940706874fe7/libriichi/src/state/update.rs#L665
-            playwright_client.messages.put({
+            playwright_client.put_message({
                 "type": "reach",
                 "actor": mjai_controller.bot.player_id,
             })
@@ -726,7 +795,7 @@ class BestAction(Horizontal):
         if best_action_button_action.label == "Reach":
             # I think Mortal can tolerate getting multiple reach
             # https://github.com/Equim-chan/Mortal/blob/3ec7a80f0f34446e9fd51c5df4a2940706874fe7/libriichi/src/state/update.rs#L665
-            playwright_client.messages.put({
+            playwright_client.put_message({
                 "type": "reach",
                 "actor": mjai_controller.bot.player_id,
             })
@@ -962,15 +1031,19 @@ class AkagiApp(App):
                 return
             mjai_msgs = playwright_client.dump_messages()
             if mjai_msgs:
+                # autoplay は set_timer の後で動くので、このバッチの受信時刻と seq はここで控えておく
+                received_at, seq = playwright_client.last_batch_at, playwright_client.last_batch_seq
                 # ============================================= #
                 #                React to MJAI                  #
                 # ============================================= #
                 mjai_in_log: RichLog = self.query_one("#mjai_in_log")
                 for mjai_msg in mjai_msgs:
-                    logger.debug(f"-> {mjai_msg}")
+                    if DEBUG_ENABLED:
+                        logger.debug(f"-> {mjai_msg}")
                     mjai_in_log.write(mjai_msg)
                 mjai_response = mjai_controller.react(mjai_msgs)
-                logger.debug(f"<- {mjai_response}")
+                if DEBUG_ENABLED:
+                    logger.debug(f"<- {mjai_response}")
                 mjai_bot.react(input_list=mjai_msgs)
                 mjai_out_log: RichLog = self.query_one("#mjai_out_log")
                 if (
@@ -997,18 +1070,19 @@ class AkagiApp(App):
                     ((mjai_response["type"] != "none" or mjai_bot.can_act_3p) and (    mjai_bot.is_3p))
                 ):
                     if settings.autoplay:
-                        self.set_timer(0.1, partial(self.autoplay, mjai_response))
+                        self.set_timer(0.1, partial(self.autoplay, mjai_response, received_at, seq))
         except Exception as e:
             logger.error(f"Error in main loop: {traceback.format_exc()}")
 
-    def autoplay(self, mjai_response: dict) -> None:
+    def autoplay(self, mjai_response: dict, received_at: float | None = None, seq: int | None = None) -> None:
         """
         Autoplay function to handle MJAI messages.
+        received_at / seq: the batch mjai_response answers (captured in main_loop).
         """
         global autoplay, playwright_client, mjai_controller
 
         try:
-            act_result = autoplay.act(mjai_response)
+            act_result = autoplay.act(mjai_response, received_at=received_at, seq=seq)
             if not act_result:
                 logger.warning("Action not preformed.")
                 self.app.notify(
@@ -1025,7 +1099,7 @@ class AkagiApp(App):
             )
             return
         if mjai_response["type"] == "reach":
-            playwright_client.messages.put({
+            playwright_client.put_message({
                 "type": "reach",
                 "actor": mjai_controller.bot.player_id,
             })
@@ -2,7 +2,7 @@
 # -*- coding: utf-8 -*-
 """
 summary_tweet_with_graphs.py
-- Akagiログを読み、順位分布(棒)＋累積ポイント(折れ線)画像を作って
+- 結果ストア（akagi/result_store.py、無い期間は Akagiログ）を読み、順位分布(棒)＋累積ポイント(折れ線)画像を作って
   朝/昼/晩ランダム時刻で自動ツイート
 
 環境変数（任意）:
@@ -19,8 +19,10 @@ from typing import Dict, Any, List, Optional
 import matplotlib.pyplot as plt
 import requests
 
-# 同パッケージ内の投稿ユーティリティ（あなたの x_post.py）
-from .x_post import ensure_access_token, post_tweet, post_tweet_with_img
+# 投稿はアウトボックス経由（画像アップロード・再送はバックグラウンド）
+from .outbox import XSender, get_outbox
+# 戦績は結果ストアから時間範囲で読む（akagi.log の全走査はストア導入前の分だけ）
+from .result_store import get_result_store
 
 LOG_PATH = os.getenv("AKAGI_LOG_PATH", "./akagi.log")
 HOURS = int(os.getenv("AKAGI_TWEET_HOURS", "48"))
@@ -61,19 +63,32 @@ def _extract(line: str):
         }
     return None
 
-def _read_recent(hours=48) -> List[Dict[str,Any]]:
-    now = datetime.now()
-    start = now - timedelta(hours=hours)
+def _read_log(start: datetime, until: Optional[datetime] = None) -> List[Dict[str,Any]]:
     recs=[]
     if not os.path.exists(LOG_PATH): return recs
     with open(LOG_PATH, "r", encoding="utf-8", errors="ignore") as f:
         for line in f:
             ts = _parse_ts(line)
             if not ts or ts < start: continue
+            if until is not None and ts >= until: break
             r = _extract(line)
             if r: recs.append(r)
     return recs
 
+def _read_recent(hours=48) -> List[Dict[str,Any]]:
+    # 結果ストア（終局時に記録）を時間範囲で引く。ストア導入前の期間だけログを走査して補う
+    start = datetime.now() - timedelta(hours=hours)
+    try:
+        store = get_result_store()
+        first = store.first_ts()
+        recs = store.query(start)
+    except Exception as e:
+        print("[Summary] result store unavailable, scanning log:", e)
+        return _read_log(start)
+    if first is None or first > start:
+        recs = _read_log(start, until=first) + recs
+    return recs
+
 # --------- 集計 & 画像生成 ----------
 def _summarize(records: List[Dict[str,Any]]) -> Dict[str,Any]:
     dist={1:0,2:0,3:0,4:0}
@@ -136,14 +151,20 @@ def run_summary_once(run_at: datetime) -> None:
     recs = _read_recent(hours=HOURS)
     summ = _summarize(recs)
     text = _format_text(_period_label(run_at), summ)
-    img  = _make_graph(summ["dist"], summ["points"])
+    # 送信が遅れても上書きされないよう、実行毎に別ファイル
+    img  = _make_graph(summ["dist"], summ["points"], out=f"summary_{run_at.strftime('%Y%m%d_%H%M')}.png")
     if DRYRUN:
         print("[DRYRUN] text:", text)
         print("[DRYRUN] image saved:", img)
         return
-    # 画像つき投稿
-    status, data = post_tweet_with_img(text, [img])
-    print("[Tweet]", status, data)
+    # 画像つき投稿（アウトボックスに積むだけ）
+    outbox = get_outbox()
+    if "x" not in outbox.senders:
+        # 非対話：トークンが無ければブラウザ認可を待たずに dead（送信スレッドを塞がない）
+        outbox.register("x", XSender())
+    # 画像は送信済み／dead になった時点で outbox が消す
+    outbox.enqueue("x", {"text": text, "images": [os.path.abspath(img)], "delete_images": True})
+    print("[Tweet] queued:", text)
 
 # --------- スケジューラ（朝昼晩ランダム） ----------
 def _pick_times():
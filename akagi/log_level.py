@@ -0,0 +1,28 @@
+"""
+Log level shared by every */logger.py.
+
+AKAGI_LOG_LEVEL (default DEBUG) sets the level of each package's file sink.
+DEBUG_ENABLED is False above DEBUG, so hot paths can skip building debug
+f-strings. An unknown level name (e.g. "warn") is reported once and replaced
+by DEBUG instead of failing at import time.
+"""
+from __future__ import annotations
+
+import os
+
+from loguru import logger as main_logger
+
+DEFAULT_LOG_LEVEL = "DEBUG"
+
+
+def _resolve_level(name: str) -> str:
+    try:
+        main_logger.level(name)
+    except ValueError:
+        main_logger.warning(f"Unknown AKAGI_LOG_LEVEL={name!r}, using {DEFAULT_LOG_LEVEL}")
+        return DEFAULT_LOG_LEVEL
+    return name
+
+
+LOG_LEVEL: str = _resolve_level(os.getenv("AKAGI_LOG_LEVEL", DEFAULT_LOG_LEVEL).strip().upper() or DEFAULT_LOG_LEVEL)
+DEBUG_ENABLED: bool = main_logger.level(LOG_LEVEL).no <= main_logger.level("DEBUG").no
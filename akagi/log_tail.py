@@ -0,0 +1,125 @@
+"""
+Bounded reads of (possibly huge) log files for the TUI logs screen.
+
+`LogTail` never reads a file from the start:
+ - `tail()` seeks to the last `tail_bytes` and returns the complete lines there,
+ - `follow()` returns lines appended since the last call (at most `max_read`
+   bytes per call; the rest comes on the next call), and starts over if the
+   file was truncated,
+ - `older()` pages backwards `page_bytes` at a time. The byte offsets of the
+   line starts read by tail()/older() are kept in `starts`, so the next page
+   always ends exactly where the oldest shown line begins.
+
+Every call costs O(bytes returned), independent of the file size.
+"""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import BinaryIO, List, Optional
+
+
+def _decode(raw: bytes) -> str:
+    return raw.decode("utf-8", errors="replace")
+
+
+class LogTail:
+    def __init__(self, path: Path | str, tail_bytes: int = 64 * 1024,
+                 page_bytes: int = 64 * 1024, max_read: int = 256 * 1024) -> None:
+        self.path = Path(path)
+        self.tail_bytes = tail_bytes
+        self.page_bytes = page_bytes
+        self.max_read = max_read
+        # 表示済み行の先頭バイト位置（昇順）。starts[0] が一番古い表示行
+        self.starts: List[int] = []
+        self._pos = 0           # 次に follow() で読む位置（完結した行の直後）
+        self._f: Optional[BinaryIO] = None
+
+    def _file(self) -> BinaryIO:
+        if self._f is None:
+            self._f = open(self.path, "rb")
+        return self._f
+
+    def close(self) -> None:
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+    @property
+    def at_start(self) -> bool:
+        """ファイル先頭まで遡り済みか"""
+        top = self.starts[0] if self.starts else self._pos
+        return top <= 0
+
+    def _lines(self, offset: int, raw: bytes) -> tuple[List[int], List[str]]:
+        """raw（offset から始まる完結した行の並び）を行に分け、各行の先頭位置も返す"""
+        starts, lines = [], []
+        pos = 0
+        while pos < len(raw):
+            nl = raw.find(b"\n", pos)
+            end = len(raw) if nl < 0 else nl + 1
+            starts.append(offset + pos)
+            lines.append(_decode(raw[pos:end]).rstrip("\r\n"))
+            pos = end
+        return starts, lines
+
+    def tail(self) -> List[str]:
+        """末尾 tail_bytes の完結した行を返し、そこから follow() を始める"""
+        f = self._file()
+        size = os.fstat(f.fileno()).st_size
+        start = max(0, size - self.tail_bytes)
+        f.seek(start)
+        raw = f.read(size - start)
+        if start > 0:
+            # 途中から読んだ最初の行は切れているので捨てる
+            nl = raw.find(b"\n")
+            cut = len(raw) if nl < 0 else nl + 1
+            raw, start = raw[cut:], start + cut
+        # 書きかけの最終行は follow() に回す
+        end = raw.rfind(b"\n") + 1
+        raw = raw[:end]
+        self.starts, lines = self._lines(start, raw)
+        self._pos = start + end
+        if not self.starts:
+            self.starts = [self._pos]
+        return lines
+
+    def follow(self) -> List[str]:
+        """前回以降に追記された完結行（1 回 max_read バイトまで）"""
+        f = self._file()
+        size = os.fstat(f.fileno()).st_size
+        if size < self._pos:
+            # ローテート / 切り詰め：先頭から読み直す
+            self._pos = 0
+            self.starts = [0]
+        if size == self._pos:
+            return []
+        f.seek(self._pos)
+        raw = f.read(min(size - self._pos, self.max_read))
+        end = raw.rfind(b"\n") + 1
+        if end == 0:
+            if len(raw) < self.max_read:
+                return []  # 行が書き終わるのを待つ
+            end = len(raw)  # 改行の無い巨大な 1 行は分割して出す
+        _, lines = self._lines(self._pos, raw[:end])
+        self._pos += end
+        return lines
+
+    def older(self) -> List[str]:
+        """表示中の最古行より前を page_bytes 分返す（先頭に達していれば空）"""
+        top = self.starts[0] if self.starts else self._pos
+        if top <= 0:
+            return []
+        f = self._file()
+        start = max(0, top - self.page_bytes)
+        f.seek(start)
+        raw = f.read(top - start)
+        if start > 0:
+            nl = raw.find(b"\n")
+            if nl < 0 or nl + 1 >= len(raw):
+                # 1 ページに収まらない長い行：切れ目のまま出す
+                nl = -1
+            raw, start = raw[nl + 1:], start + nl + 1
+        starts, lines = self._lines(start, raw)
+        self.starts[:0] = starts
+        return lines
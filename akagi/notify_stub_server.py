@@ -0,0 +1,113 @@
+"""
+Local stand-in for the Slack and LINE APIs used by akagi.outbox.
+
+    python -m akagi.notify_stub_server --port 8790 --rate-limit-every 3
+    AKAGI_SLACK_API_BASE=http://127.0.0.1:8790/api AKAGI_LINE_API_BASE=http://127.0.0.1:8790 python run_akagi.py
+
+Serves POST /api/chat.postMessage (Slack) and POST /v2/bot/message/push (LINE),
+prints every accepted message (kept in `received` / `bodies` for tests), and can
+inject failures:
+  --rate-limit-every N   every N-th request answers 429 with Retry-After
+  --fail-every N         every N-th request answers 500
+  --down                 every request answers 503 (outage)
+"""
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, List
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "NotifyStubServer"
+
+    def log_message(self, fmt: str, *args: Any) -> None:
+        pass
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers.get("Content-Length", "0")))
+        srv = self.server
+        n = next(srv.counter)
+        if srv.down:
+            self._reply(503, {"ok": False, "error": "service_unavailable"})
+            return
+        if srv.rate_limit_every and n % srv.rate_limit_every == 0:
+            self._reply(429, {"ok": False, "error": "ratelimited"}, {"Retry-After": str(srv.retry_after)})
+            return
+        if srv.fail_every and n % srv.fail_every == 0:
+            self._reply(500, {"ok": False, "error": "internal_error"})
+            return
+
+        try:
+            data = json.loads(body or b"{}")
+        except ValueError:
+            self._reply(400, {"ok": False, "error": "invalid_json"})
+            return
+        if self.path == "/api/chat.postMessage":
+            srv.record("slack", data.get("text", ""), data)
+            self._reply(200, {"ok": True, "ts": f"{time.time():.6f}"})
+        elif self.path == "/v2/bot/message/push":
+            text = "".join(m.get("text", "") for m in data.get("messages", []))
+            srv.record("line", text, data)
+            self._reply(200, {})
+        else:
+            self._reply(404, {"ok": False, "error": "not_found"})
+
+    def _reply(self, status: int, payload: dict, headers: dict | None = None) -> None:
+        raw = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(raw)
+
+
+class NotifyStubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, rate_limit_every: int = 0, fail_every: int = 0,
+                 down: bool = False, retry_after: int = 1, quiet: bool = False):
+        super().__init__(address, _Handler)
+        self.rate_limit_every = rate_limit_every
+        self.fail_every = fail_every
+        self.down = down
+        self.retry_after = retry_after
+        self.quiet = quiet
+        self.counter = itertools.count(1)
+        self.received: List[tuple] = []
+        self.bodies: List[tuple] = []   # (channel, リクエスト JSON そのもの)。宛先の検証用
+        self._lock = threading.Lock()
+
+    def record(self, channel: str, text: str, body: dict | None = None) -> None:
+        with self._lock:
+            self.received.append((channel, text))
+            self.bodies.append((channel, body or {}))
+        if not self.quiet:
+            print(f"[{channel}] {text!r}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local stand-in for the Slack/LINE notification APIs.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--rate-limit-every", type=int, default=0)
+    parser.add_argument("--fail-every", type=int, default=0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--down", action="store_true")
+    args = parser.parse_args()
+
+    server = NotifyStubServer((args.host, args.port), args.rate_limit_every, args.fail_every, args.down, args.retry_after)
+    print(f"notify stub on http://{args.host}:{server.server_address[1]} "
+          f"(slack base: /api, line base: /)")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
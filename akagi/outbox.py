@@ -0,0 +1,435 @@
+"""
+Notification outbox (Slack / LINE / X).
+
+Callers only enqueue: `get_outbox().enqueue("slack", {"text": ...})` appends
+to an in-memory list and returns immediately. A background spool worker
+writes new items to SQLite in one transaction per batch (WAL,
+synchronous=NORMAL, so fsyncs are batched), which makes them survive a
+restart. Each registered channel then has its own delivery worker, so a slow
+or broken channel (an X upload, an OAuth problem) never holds up the others.
+Delivery
+ - goes through one pooled requests.Session per channel,
+ - coalesces bursts: consecutive pending text items for the same channel with
+   the same destination (every field but "text" equal) are joined into one
+   message (up to COALESCE_MAX), and an item with a `coalesce_key` replaces an
+   older pending item with the same key,
+ - backs off per channel: Retry-After on 429 blocks the whole channel, any
+   other failure (including an exception from the sender) retries with
+   jittered exponential backoff, and items are marked dead after MAX_ATTEMPTS.
+
+A Slack/LINE/X outage therefore never blocks a click or the next game.
+
+Senders read their API base from AKAGI_SLACK_API_BASE / AKAGI_LINE_API_BASE so
+`python -m akagi.notify_stub_server` can stand in for both.
+"""
+from __future__ import annotations
+
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .logger import logger
+from .x_post import XAuthRequired
+
+OUTBOX_PATH  = Path(os.getenv("AKAGI_OUTBOX_PATH", str(Path().cwd() / "logs" / "notify_outbox.sqlite3")))
+SLACK_API_BASE = os.getenv("AKAGI_SLACK_API_BASE", "https://slack.com/api").rstrip("/")
+LINE_API_BASE  = os.getenv("AKAGI_LINE_API_BASE", "https://api.line.me").rstrip("/")
+
+MAX_ATTEMPTS   = int(os.getenv("AKAGI_OUTBOX_MAX_ATTEMPTS", "8"))
+BACKOFF_BASE   = 2.0
+BACKOFF_MAX    = 600.0
+COALESCE_MAX   = 10     # 1 通にまとめる最大件数
+COALESCE_DELAY = 1.0    # 新着から少し待って、まとめて送る（秒）
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    channel      TEXT NOT NULL,
+    payload      TEXT NOT NULL,
+    coalesce_key TEXT,
+    created_at   REAL NOT NULL,
+    next_at      REAL NOT NULL,
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    status       TEXT NOT NULL DEFAULT 'pending',
+    last_error   TEXT
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_at);
+"""
+
+
+@dataclass
+class Delivery:
+    ok: bool
+    retry_after: Optional[float] = None   # 429 等：チャネル全体をこの秒数止める
+    permanent: bool = False               # 再送しても無駄（認証エラー等）
+    detail: str = ""
+
+
+def _session(pool_size: int = 2) -> requests.Session:
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    return s
+
+
+def _retry_after(resp: requests.Response) -> float:
+    try:
+        return max(1.0, float(resp.headers.get("Retry-After", "1")))
+    except ValueError:
+        return 1.0
+
+
+class Sender:
+    """1 チャネル分の送信。coalesce=True ならテキストをまとめて送ってよい"""
+    name = "base"
+    coalesce = False
+
+    def send(self, payload: Dict[str, Any]) -> Delivery:
+        raise NotImplementedError
+
+    def finished(self, payload: Dict[str, Any], delivered: bool) -> None:
+        """送信済み／諦めた item ごとに 1 回呼ばれる（後片付け用）"""
+
+
+class SlackSender(Sender):
+    name = "slack"
+    coalesce = True
+
+    def __init__(self, token: str, channel_id: str, api_base: str = SLACK_API_BASE, timeout: float = 10.0):
+        self.token = token
+        self.channel_id = channel_id
+        self.url = f"{api_base}/chat.postMessage"
+        self.timeout = timeout
+        self.session = _session()
+
+    def send(self, payload: Dict[str, Any]) -> Delivery:
+        if not self.token or not self.channel_id:
+            return Delivery(False, permanent=True, detail="token or channel_id missing")
+        body: Dict[str, Any] = {"channel": payload.get("channel") or self.channel_id, "text": payload["text"]}
+        if payload.get("thread_ts"):
+            body["thread_ts"] = payload["thread_ts"]
+        resp = self.session.post(
+            self.url, json=body, timeout=self.timeout,
+            headers={"Authorization": f"Bearer {self.token}", "Content-Type": "application/json; charset=utf-8"},
+        )
+        if resp.status_code == 429:
+            return Delivery(False, retry_after=_retry_after(resp), detail="429")
+        try:
+            data = resp.json()
+        except ValueError:
+            data = {}
+        if resp.ok and data.get("ok"):
+            return Delivery(True, detail=f"ts={data.get('ts')}")
+        error = data.get("error") or resp.text[:200]
+        # 認証・チャネル設定の誤りは再送しても直らない
+        permanent = error in ("invalid_auth", "not_authed", "channel_not_found", "account_inactive", "token_revoked")
+        return Delivery(False, permanent=permanent, detail=f"{resp.status_code} {error}")
+
+
+class LineSender(Sender):
+    name = "line"
+    coalesce = True
+
+    def __init__(self, token: str, user_id: str, api_base: str = LINE_API_BASE, timeout: float = 10.0):
+        self.token = token
+        self.user_id = user_id
+        self.url = f"{api_base}/v2/bot/message/push"
+        self.timeout = timeout
+        self.session = _session()
+
+    def send(self, payload: Dict[str, Any]) -> Delivery:
+        if not self.token or not self.user_id:
+            return Delivery(False, permanent=True, detail="token or user_id missing")
+        body = {"to": self.user_id, "messages": [{"type": "text", "text": payload["text"]}]}
+        resp = self.session.post(
+            self.url, json=body, timeout=self.timeout,
+            headers={"Authorization": f"Bearer {self.token}", "Content-Type": "application/json"},
+        )
+        if resp.status_code == 200:
+            return Delivery(True)
+        if resp.status_code == 429:
+            return Delivery(False, retry_after=_retry_after(resp), detail="429")
+        return Delivery(False, permanent=resp.status_code in (400, 401, 403), detail=f"{resp.status_code} {resp.text[:200]}")
+
+
+class XSender(Sender):
+    """
+    X への投稿（画像付き可）。payload: {"text": ..., "images": [path, ...], "delete_images": bool}
+    既定の post は非対話：保存済みトークンが無ければブラウザ認可を始めずに諦める（permanent）。
+    """
+    name = "x"
+
+    def __init__(self, post: Optional[Callable[[str, List[str]], tuple]] = None):
+        if post is None:
+            from .x_post import post_tweet_with_img
+            post = partial(post_tweet_with_img, interactive=False)
+        self.post = post
+
+    def send(self, payload: Dict[str, Any]) -> Delivery:
+        try:
+            status, data = self.post(payload["text"], list(payload.get("images") or []))
+        except XAuthRequired as e:
+            return Delivery(False, permanent=True, detail=f"auth required: {e}")
+        except FileNotFoundError as e:
+            return Delivery(False, permanent=True, detail=f"image missing: {e}")
+        if 200 <= status < 300:
+            return Delivery(True, detail=str(data)[:200])
+        if status == 429:
+            return Delivery(False, retry_after=60.0, detail="429")
+        return Delivery(False, permanent=status in (400, 401, 403), detail=f"{status} {str(data)[:200]}")
+
+    def finished(self, payload: Dict[str, Any], delivered: bool) -> None:
+        if not payload.get("delete_images"):
+            return
+        for path in payload.get("images") or []:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def _destination(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """text 以外（channel / thread_ts 等の宛先指定）。これが同じ item だけまとめてよい"""
+    return {k: v for k, v in payload.items() if k != "text"}
+
+
+class Outbox:
+    def __init__(self, path: Path = OUTBOX_PATH):
+        self.path = Path(path)
+        self.senders: Dict[str, Sender] = {}
+        self._incoming: List[tuple] = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._blocked_until: Dict[str, float] = {}
+        self._thread: Optional[threading.Thread] = None
+        # チャネルごとの配送ワーカー（1 つが詰まっても他は止まらない）
+        self._channel_wake: Dict[str, threading.Event] = {}
+        self._channel_threads: Dict[str, threading.Thread] = {}
+        self._schema_ready = threading.Event()
+        self._stopped = False
+
+    # ---- producer side (any thread) ----
+
+    def register(self, channel: str, sender: Sender) -> None:
+        self.senders[channel] = sender
+        self._ensure_worker()
+        self._wake.set()
+
+    def enqueue(self, channel: str, payload: Dict[str, Any], coalesce_key: Optional[str] = None) -> None:
+        """ディスクにもネットワークにも触れずに返る"""
+        with self._lock:
+            self._incoming.append((channel, json.dumps(payload, ensure_ascii=False), coalesce_key, time.time()))
+        self._ensure_worker()
+        self._wake.set()
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """テスト／終了時用：送れるものが無くなるまで待つ"""
+        end = time.monotonic() + timeout
+        while time.monotonic() < end:
+            with self._lock:
+                incoming = bool(self._incoming)
+            if not incoming and self._pending_count() == 0:
+                return True
+            self._wake.set()
+            time.sleep(0.05)
+        return False
+
+    def stop(self) -> None:
+        self._stopped = True
+        self._wake.set()
+        for wake in list(self._channel_wake.values()):
+            wake.set()
+
+    # ---- workers ----
+
+    def _ensure_worker(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name="akagi-outbox", daemon=True)
+            self._thread.start()
+        for channel in list(self.senders):
+            thread = self._channel_threads.get(channel)
+            if thread is None or not thread.is_alive():
+                self._channel_wake.setdefault(channel, threading.Event())
+                thread = threading.Thread(target=self._run_channel, args=(channel,),
+                                          name=f"akagi-outbox-{channel}", daemon=True)
+                self._channel_threads[channel] = thread
+                thread.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def _pending_count(self) -> int:
+        """送信先が登録済みのチャネルで、まだ送れていない件数"""
+        try:
+            conn = sqlite3.connect(self.path, timeout=1.0)
+            try:
+                rows = conn.execute("SELECT channel FROM outbox WHERE status='pending'").fetchall()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return 0
+        return sum(1 for (ch,) in rows if ch in self.senders)
+
+    def _run(self) -> None:
+        """spool 担当：新着を SQLite に書き、各チャネルのワーカーを起こす"""
+        conn = self._connect()
+        self._schema_ready.set()
+        pending = conn.execute("SELECT COUNT(*) FROM outbox WHERE status='pending'").fetchone()[0]
+        if pending:
+            logger.info(f"[outbox] {pending} pending notification(s) from a previous run")
+        while not self._stopped:
+            # 先に clear しておけば、処理中に来た enqueue の wake は取りこぼさない
+            self._wake.clear()
+            try:
+                self._spool(conn)
+            except Exception as e:
+                logger.error(f"[outbox] spool error: {e}")
+            for wake in list(self._channel_wake.values()):
+                wake.set()
+            self._wake.wait(timeout=60.0)
+        conn.close()
+
+    def _run_channel(self, channel: str) -> None:
+        self._schema_ready.wait()
+        conn = self._connect()
+        wake = self._channel_wake[channel]
+        while not self._stopped:
+            wake.clear()
+            try:
+                wait = self._deliver_due(conn, channel)
+            except Exception as e:
+                logger.error(f"[outbox] {channel}: worker error: {e}")
+                wait = 5.0
+            wake.wait(timeout=wait)
+        conn.close()
+
+    def _spool(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            batch, self._incoming = self._incoming, []
+        if not batch:
+            return
+        with conn:  # 1 トランザクション = fsync 1 回
+            for channel, payload, key, created in batch:
+                if key:
+                    conn.execute(
+                        "UPDATE outbox SET status='coalesced' WHERE status='pending' AND channel=? AND coalesce_key=?",
+                        (channel, key),
+                    )
+                conn.execute(
+                    "INSERT INTO outbox (channel, payload, coalesce_key, created_at, next_at) VALUES (?, ?, ?, ?, ?)",
+                    (channel, payload, key, created, created + (COALESCE_DELAY if self._coalescing(channel) else 0.0)),
+                )
+
+    def _coalescing(self, channel: str) -> bool:
+        sender = self.senders.get(channel)
+        return bool(sender and sender.coalesce)
+
+    def _groups(self, sender: Sender, items: List[tuple]) -> List[List[tuple]]:
+        """先頭から、宛先が同じ連続 item を COALESCE_MAX 件までまとめる（順序は保つ）"""
+        if not sender.coalesce:
+            return [[row] for row in items]
+        groups: List[List[tuple]] = []
+        for row in items:
+            dest = _destination(json.loads(row[2]))
+            if groups and len(groups[-1]) < COALESCE_MAX and groups[-1][0][4] == dest:
+                groups[-1].append((*row, dest))
+            else:
+                groups.append([(*row, dest)])
+        return groups
+
+    def _deliver_due(self, conn: sqlite3.Connection, channel: str) -> float:
+        """このチャネルの期限の来たものを送る。次に起きるまでの秒数を返す"""
+        sender = self.senders.get(channel)
+        blocked = self._blocked_until.get(channel, 0.0) - time.monotonic()
+        if sender is not None and blocked <= 0:
+            rows = conn.execute(
+                "SELECT id, channel, payload, attempts FROM outbox"
+                " WHERE status='pending' AND channel=? AND next_at<=? ORDER BY id",
+                (channel, time.time()),
+            ).fetchall()
+            for group in self._groups(sender, rows):
+                if not self._deliver_group(conn, channel, sender, group):
+                    break  # このチャネルは今は送れない。残りは次回
+
+        nxt = conn.execute("SELECT MIN(next_at) FROM outbox WHERE status='pending' AND channel=?",
+                           (channel,)).fetchone()[0]
+        wait = 60.0 if nxt is None else max(0.05, nxt - time.time())
+        blocked = self._blocked_until.get(channel, 0.0) - time.monotonic()
+        if blocked > 0:
+            wait = max(wait, blocked)
+        return min(wait, 60.0)
+
+    def _deliver_group(self, conn: sqlite3.Connection, channel: str, sender: Sender, group: List[tuple]) -> bool:
+        ids = [row[0] for row in group]
+        payloads = [json.loads(row[2]) for row in group]
+        payload = payloads[0]
+        if len(payloads) > 1:
+            payload = dict(payload, text="\n\n".join(p.get("text", "") for p in payloads))
+        try:
+            result = sender.send(payload)
+        except (Exception, SystemExit) as e:
+            # 送信側の想定外の例外（x_post の sys.exit も含む）も 1 回の失敗として数える
+            result = Delivery(False, detail=f"{type(e).__name__}: {e}")
+
+        marks = ",".join("?" * len(ids))
+        with conn:
+            if result.ok:
+                conn.execute(f"UPDATE outbox SET status='sent', attempts=attempts+1, last_error=NULL WHERE id IN ({marks})", ids)
+                logger.info(f"[outbox] {channel}: sent {len(ids)} item(s) {result.detail}")
+                self._finished(sender, payloads, True)
+                return True
+
+            attempts = max(row[3] for row in group) + 1
+            if result.permanent or attempts >= MAX_ATTEMPTS:
+                conn.execute(f"UPDATE outbox SET status='dead', attempts=?, last_error=? WHERE id IN ({marks})",
+                             [attempts, result.detail, *ids])
+                logger.error(f"[outbox] {channel}: giving up on {len(ids)} item(s) after {attempts} attempt(s): {result.detail}")
+                self._finished(sender, payloads, False)
+                return True
+
+            if result.retry_after is not None:
+                delay = result.retry_after
+                self._blocked_until[channel] = time.monotonic() + delay
+            else:
+                delay = min(BACKOFF_MAX, BACKOFF_BASE ** attempts) * random.uniform(0.8, 1.2)
+            conn.execute(f"UPDATE outbox SET attempts=?, next_at=?, last_error=? WHERE id IN ({marks})",
+                         [attempts, time.time() + delay, result.detail, *ids])
+            logger.warning(f"[outbox] {channel}: delivery failed ({result.detail}), retry in {delay:.1f}s (attempt {attempts})")
+            return False
+
+    @staticmethod
+    def _finished(sender: Sender, payloads: List[Dict[str, Any]], delivered: bool) -> None:
+        for payload in payloads:
+            try:
+                sender.finished(payload, delivered)
+            except Exception as e:
+                logger.warning(f"[outbox] {sender.name}: cleanup failed: {e}")
+
+
+_default: Optional[Outbox] = None
+_default_lock = threading.Lock()
+
+
+def get_outbox() -> Outbox:
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = Outbox()
+        return _default
@@ -0,0 +1,127 @@
+"""
+Append-only store of game results (SQLite, indexed by timestamp).
+
+The post-game flow records each result the moment it learns it
+(`get_result_store().record(info)`), and the summary/graph generator asks for a
+time range (`query(start, end)`) instead of scanning akagi.log with regexes.
+Results carrying a game uuid are recorded at most once.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .logger import logger
+
+RESULT_STORE_PATH = Path(os.getenv("AKAGI_RESULT_STORE_PATH", str(Path().cwd() / "logs" / "results.sqlite3")))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts            REAL NOT NULL,
+    uuid          TEXT UNIQUE,
+    mode_id       INTEGER,
+    is_sanma      INTEGER,
+    rank          INTEGER,
+    score         INTEGER,
+    grading_delta INTEGER,
+    grading_after INTEGER,
+    source        TEXT,
+    payload       TEXT
+);
+CREATE INDEX IF NOT EXISTS results_ts ON results (ts);
+"""
+
+
+def _int(v: Any) -> Optional[int]:
+    try:
+        return None if v is None else int(v)
+    except (TypeError, ValueError):
+        return None
+
+
+class ResultStore:
+    def __init__(self, path: Path | str = RESULT_STORE_PATH) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def record(self, info: Dict[str, Any], ts: Optional[float] = None, source: str = "") -> bool:
+        """結果を 1 件追加。同じ uuid が既にあれば何もしない（False）"""
+        row = (
+            time.time() if ts is None else ts,
+            info.get("uuid") or None,
+            _int(info.get("mode_id")),
+            None if info.get("is_sanma") is None else int(bool(info.get("is_sanma"))),
+            _int(info.get("rank")),
+            _int(info.get("score")),
+            _int(info.get("grading_delta")),
+            _int(info.get("grading_after")),
+            source,
+            json.dumps(info, ensure_ascii=False, default=str),
+        )
+        try:
+            with self._lock, self._db() as conn:
+                cur = conn.execute(
+                    "INSERT OR IGNORE INTO results (ts, uuid, mode_id, is_sanma, rank, score, grading_delta, grading_after, source, payload)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+                return cur.rowcount > 0
+        except sqlite3.Error as e:
+            logger.error(f"[results] record failed: {e}")
+            return False
+
+    def query(self, start: datetime, end: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """[start, end) の結果を古い順に返す（ts はローカル時刻の datetime）"""
+        hi = time.time() + 1 if end is None else end.timestamp()
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT ts, uuid, mode_id, is_sanma, rank, score, grading_delta, grading_after FROM results"
+                " WHERE ts >= ? AND ts < ? ORDER BY ts", (start.timestamp(), hi)).fetchall()
+        return [
+            {
+                "ts": datetime.fromtimestamp(ts), "uuid": uuid, "mode_id": mode_id,
+                "is_sanma": None if is_sanma is None else bool(is_sanma),
+                "rank": rank, "score": score, "delta": delta, "total": total,
+            }
+            for ts, uuid, mode_id, is_sanma, rank, score, delta, total in rows
+        ]
+
+    def first_ts(self) -> Optional[datetime]:
+        """最古の記録時刻（ストア導入前の期間はログから補うため）"""
+        with self._lock:
+            (ts,) = self._db().execute("SELECT MIN(ts) FROM results").fetchone()
+        return None if ts is None else datetime.fromtimestamp(ts)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_store: Optional[ResultStore] = None
+_store_lock = threading.Lock()
+
+
+def get_result_store() -> ResultStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ResultStore()
+        return _store
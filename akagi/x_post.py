@@ -40,11 +40,11 @@ TWEET_URL = "https://api.twitter.com/2/tweets"
 
 import requests
 
-def upload_media(filepath: str) -> str | None:
+def upload_media(filepath: str, interactive: bool = True) -> str | None:
     """
     v1.1 の upload endpoint を使って画像をアップロードし、media_id_string を返す。
     """
-    token = ensure_access_token()
+    token = ensure_access_token(interactive)
     url = "https://upload.twitter.com/1.1/media/upload.json"
     with open(filepath, "rb") as f:
         files = {"media": f}
@@ -55,16 +55,17 @@ def upload_media(filepath: str) -> str | None:
     print("[upload_media] failed:", resp.status_code, resp.text[:300])
     return None
 
-def post_tweet_with_img(text: str, image_paths: list[str]) -> tuple[int, dict]:
+def post_tweet_with_img(text: str, image_paths: list[str], interactive: bool = True) -> tuple[int, dict]:
     """
     画像を複数添付してツイート（最大4枚）。
+    interactive=False ならブラウザでの認可には進まず XAuthRequired を投げる（バックグラウンド送信用）。
     """
     mids = []
     for p in image_paths[:4]:
-        mid = upload_media(p)
+        mid = upload_media(p, interactive)
         if mid:
             mids.append(mid)
-    token = ensure_access_token()
+    token = ensure_access_token(interactive)
     url = "https://api.twitter.com/2/tweets"
     payload = {"text": text}
     if mids:
@@ -199,11 +200,18 @@ def refresh_tokens(client_id: str, refresh_token: str) -> Dict:
         data["expires_at"] = now() + int(data.get("expires_in", 0))
     return data
 
-def ensure_access_token() -> str:
+class XAuthRequired(RuntimeError):
+    """保存済みトークンでは投稿できず、ブラウザでの認可が必要（interactive=False のとき）"""
+
+def ensure_access_token(interactive: bool = True) -> str:
     if not CLIENT_ID:
+        if not interactive:
+            raise XAuthRequired("X_CLIENT_ID is not set")
         sys.exit("ERROR: X_CLIENT_ID が未設定です。")
     tokens = load_tokens()
     if not tokens.get("access_token"):
+        if not interactive:
+            raise XAuthRequired(f"no stored token in {TOKEN_FILE}; run `python -m akagi.x_post <text>` once to authorize")
         pkce = make_pkce()
         auth_url = build_auth_url(CLIENT_ID, REDIRECT_URI, SCOPES, pkce.challenge, pkce.state)
         print("\nOpen this URL if browser doesn't open automatically:\n", auth_url, "\n")
@@ -223,6 +231,8 @@ def ensure_access_token() -> str:
         return tokens["access_token"]
 
     if not tokens.get("refresh_token"):
+        if not interactive:
+            raise XAuthRequired("access token expired and there is no refresh token")
         os.remove(TOKEN_FILE)
         return ensure_access_token()
 
@@ -233,7 +243,9 @@ def ensure_access_token() -> str:
         save_tokens(new_tokens)
         return new_tokens["access_token"]
 
-    # refresh失敗 → 再認可
+    # refresh失敗 → 再認可（非対話なら一時的な失敗として再送に任せる）
+    if not interactive:
+        raise RuntimeError(f"token refresh failed: {new_tokens}")
     os.remove(TOKEN_FILE)
     return ensure_access_token()
 
@@ -0,0 +1,13 @@
+"""
+Bridge throughput benchmark over recorded frames (AKAGI_FRAME_RECORD=1).
+
+    python bench_bridge.py logs/ [--backend liqi --backend module:Class] [--baseline bench.json]
+
+See playwright_client/bridge/bench.py for the options.
+"""
+import sys
+
+from playwright_client.bridge.bench import main
+
+if __name__ == "__main__":
+    sys.exit(main())
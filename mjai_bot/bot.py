@@ -1,22 +1,72 @@
 # -*- coding: utf-8 -*-
 import json
-import os
 from mjai import Bot
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Mapping
 from mjai.mlibriichi.state import PlayerState  # type: ignore
-from .logger import logger
+from .logger import logger, DEBUG_ENABLED
+from settings.tunables import Tunables, TunablesStore, tunables_store
 
 # --- ラス回避 / 安全評価 ---
 from .strategy.last_avoid import TableState, MoveCandidate, LastAvoidConfig, choose_with_last_avoid
 from .strategy.safety import SafetyContext  # 型ヒントだけ使う
 
+SEAT_WINDS = ("E", "S", "W", "N")
+
+
+@dataclass(frozen=True)
+class TableSnapshot:
+    """
+    Read-only view of the table state tracked by AkagiBot.
+    Rebuilt once per react() call; consumers (autoplay etc.) must not mutate it.
+    """
+    player_id: int | None = None
+    is_3p: bool = False
+    dealer: int = 0
+    round_wind: str = "E"
+    honba: int = 0
+    kyotaku: int = 0
+    scores: tuple[int, ...] = (25000, 25000, 25000, 25000)
+    turn_counter: int = 0        # 全員の打牌数（ざっくり順目）
+    remaining_tiles: int = 0     # live ツモ枚数
+    rivers: Mapping[int, tuple[str, ...]] = field(default_factory=lambda: MappingProxyType({}))
+    furos: Mapping[int, tuple[tuple[str, ...], ...]] = field(default_factory=lambda: MappingProxyType({}))
+    riichi_seats: frozenset[int] = frozenset()
+    dora_indicators: tuple[str, ...] = ()
+
+    @property
+    def is_oya(self) -> bool:
+        return self.player_id is not None and self.dealer == self.player_id
+
+    @property
+    def junme(self) -> int | None:
+        """自分の巡目（自分の打牌数 + 1）"""
+        if self.player_id is None:
+            return None
+        return len(self.rivers.get(self.player_id, ())) + 1
+
+    @property
+    def seat_wind(self) -> str | None:
+        if self.player_id is None:
+            return None
+        n = 3 if self.is_3p else 4
+        return SEAT_WINDS[(self.player_id - self.dealer) % n]
+
+    @property
+    def opponent_riichi_seats(self) -> list[int]:
+        return sorted(s for s in self.riichi_seats if s != self.player_id)
+
+
 class AkagiBot(Bot):
     """
     This bot tracks game states and picks a discard via last-avoid safety layer.
     """
-    def __init__(self):
+    def __init__(self, tunables: TunablesStore = tunables_store):
         super().__init__()
         self.is_3p = False
+        self.__tunables_store = tunables
+        self.__tunables: Tunables = tunables.get()
 
         # --- 局面トラッキング ---
         self.__rivers = {0: [], 1: [], 2: [], 3: []}  # [(tile, tsumogiri), ...]
@@ -31,11 +81,52 @@ class AkagiBot(Bot):
         self.__discard_events = []
         self.__call_events = []
         self.__dora_indicators = []
-        self.__cfg_last_avoid = LastAvoidConfig()
+        self.__furos = {0: [], 1: [], 2: [], 3: []}  # [(pai, *consumed), ...]
+        self.__cfg_last_avoid = LastAvoidConfig.from_tunables(self.__tunables)
 
         # ざっくり順目カウンタ（配牌後0、以後各打牌で+1）
         self.__turn_counter = 0
 
+        self.__snapshot = TableSnapshot()
+
+    @property
+    def snapshot(self) -> TableSnapshot:
+        return self.__snapshot
+
+    def __build_snapshot(self) -> TableSnapshot:
+        return TableSnapshot(
+            player_id=self.player_id,
+            is_3p=self.is_3p,
+            dealer=self.__dealer,
+            round_wind=self.__round_wind,
+            honba=self.__honba,
+            kyotaku=self.__kyotaku,
+            scores=tuple(self.__scores),
+            turn_counter=self.__turn_counter,
+            remaining_tiles=self.__remaining_tiles_live,
+            rivers=MappingProxyType({k: tuple(t for t, _ in v) for k, v in self.__rivers.items()}),
+            furos=MappingProxyType({k: tuple(v) for k, v in self.__furos.items()}),
+            riichi_seats=frozenset(self.__riichi_actors),
+            dora_indicators=tuple(self.__dora_indicators),
+        )
+
+    def __track_furo(self, event: dict) -> None:
+        actor = event["actor"]
+        melds = self.__furos.setdefault(actor, [])
+        et = event["type"]
+        if et == "ankan":
+            melds.append(tuple(event["consumed"]))
+        elif et == "kakan":
+            base = event["pai"][:2]
+            for i, meld in enumerate(melds):
+                if len(meld) == 3 and all(p[:2] == base for p in meld):
+                    melds[i] = meld + (event["pai"],)
+                    break
+            else:
+                melds.append(tuple(event["consumed"]) + (event["pai"],))
+        else:  # chi / pon / daiminkan
+            melds.append((event["pai"], *event["consumed"]))
+
     # -------------------------
     # 思考
     # -------------------------
@@ -113,6 +204,7 @@ class AkagiBot(Bot):
                     self.__round_wind = "E"
                     self.__remaining_tiles_live = 0
                     self.__turn_counter = 0
+                    self.__furos = {0: [], 1: [], 2: [], 3: []}
 
                 if et == "start_kyoku":
                     # 3P 判定（既存ロジック）
@@ -134,11 +226,18 @@ class AkagiBot(Bot):
                     self.__riichi_actors = set()
                     self.__riichi_early_turns = {}
                     self.__turn_counter = 0
+                    self.__furos = {0: [], 1: [], 2: [], 3: []}
+
+                    # tunables は局の区切りで取り直す（ファイル変更はここで反映）
+                    tunables = self.__tunables_store.get()
+                    if tunables is not self.__tunables:
+                        self.__tunables = tunables
+                        self.__cfg_last_avoid = LastAvoidConfig.from_tunables(tunables)
 
                     # 残り live ツモ枚数 初期化
-                    init_4p = int(os.getenv("AKAGI_INIT_LIVE_TILES_4P", "70"))
-                    init_3p = int(os.getenv("AKAGI_INIT_LIVE_TILES_3P", "83"))
-                    self.__remaining_tiles_live = init_3p if self.is_3p else init_4p
+                    self.__remaining_tiles_live = (
+                        tunables.init_live_tiles_3p if self.is_3p else tunables.init_live_tiles_4p
+                    )
 
                 # dora 表示（カン後の新ドラ含む）を即時反映
                 if et == "start_kyoku" or et == "dora":
@@ -159,6 +258,7 @@ class AkagiBot(Bot):
 
                 if et in ["chi", "pon", "daiminkan", "kakan", "ankan"]:
                     self.__call_events.append(event)
+                    self.__track_furo(event)
 
                 # カン時は live -1（補助ツモは王牌）
                 if et in ["daiminkan", "kakan", "ankan"]:
@@ -172,7 +272,8 @@ class AkagiBot(Bot):
 
                 # 3P用の nukidora パッチ（既存）
                 if et == "nukidora":
-                    logger.debug(f"Event: {event}")
+                    if DEBUG_ENABLED:
+                        logger.debug(f"Event: {event}")
                     replace_event = {
                         "type": "dahai",
                         "actor": event["actor"],
@@ -186,9 +287,12 @@ class AkagiBot(Bot):
                     self.action_candidate = self.player_state.update(json.dumps(replace_event))
                     continue
 
-                logger.debug(f"Event: {event}")
+                if DEBUG_ENABLED:
+                    logger.debug(f"Event: {event}")
                 self.action_candidate = self.player_state.update(json.dumps(event))
 
+            self.__snapshot = self.__build_snapshot()
+
             # 自分のリーチ後、限定状況はそのままツモ切り（既存ロジック）
             if (
                 self.self_riichi_accepted
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Inference-only Mortal checkpoints.
+
+The training checkpoint (mortal.pth) carries the full config dict and pickled
+extras that inference never touches. `convert_checkpoint` strips it down to
+`mortal`, `current_dqn` and the three config values `load_model` needs, and
+saves it in torch's zip format so `load_state` can map it read-only with
+`torch.load(mmap=True, weights_only=True)`. Several Akagi processes on one host
+then share the weights through the page cache instead of each holding a copy.
+
+Usage:
+    python -m mjai_bot.inference.checkpoint mjai_bot/mortal/mortal.pth
+    # -> mjai_bot/mortal/mortal.inference.pth (picked up by load_model)
+"""
+from __future__ import annotations
+
+import argparse
+import pathlib
+import time
+from typing import Any, Tuple
+
+import torch
+
+INFERENCE_SUFFIX = ".inference.pth"
+FORMAT_VERSION = 1
+
+
+def inference_path(control_state_file: pathlib.Path) -> pathlib.Path:
+    control_state_file = pathlib.Path(control_state_file)
+    return control_state_file.with_name(control_state_file.stem + INFERENCE_SUFFIX)
+
+
+def _minimal_config(config: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "control": {"version": int(config["control"]["version"])},
+        "resnet": {
+            "conv_channels": int(config["resnet"]["conv_channels"]),
+            "num_blocks": int(config["resnet"]["num_blocks"]),
+        },
+    }
+
+
+def convert_checkpoint(src: pathlib.Path, dst: pathlib.Path | None = None) -> pathlib.Path:
+    src = pathlib.Path(src)
+    dst = pathlib.Path(dst) if dst is not None else inference_path(src)
+    state = torch.load(src, map_location="cpu", weights_only=False)
+    slim = {
+        "format": FORMAT_VERSION,
+        "config": _minimal_config(state["config"]),
+        # contiguous clones so every tensor gets its own compact storage record
+        "mortal": {k: v.detach().contiguous().clone() for k, v in state["mortal"].items()},
+        "current_dqn": {k: v.detach().contiguous().clone() for k, v in state["current_dqn"].items()},
+    }
+    tmp = dst.with_name(dst.name + ".tmp")
+    torch.save(slim, tmp)
+    tmp.replace(dst)
+    return dst
+
+
+def _is_stale(slim: pathlib.Path, src: pathlib.Path) -> bool:
+    return src.exists() and src.stat().st_mtime > slim.stat().st_mtime
+
+
+def load_state(control_state_file: pathlib.Path, device: torch.device) -> Tuple[dict[str, Any], bool]:
+    """
+    Returns (state, mmapped).
+
+    When an up-to-date inference file sits next to `control_state_file` it is
+    mapped read-only on CPU and `mmapped` is True; the caller should build its
+    modules on the meta device and `load_state_dict(..., assign=True)` so the
+    mapped tensors are used directly. Otherwise the full checkpoint is loaded
+    the old way.
+    """
+    control_state_file = pathlib.Path(control_state_file)
+    slim = inference_path(control_state_file)
+    if slim.exists() and not _is_stale(slim, control_state_file):
+        state = torch.load(slim, map_location="cpu", mmap=True, weights_only=True)
+        if state.get("format") == FORMAT_VERSION:
+            return state, True
+    return torch.load(control_state_file, map_location=device), False
+
+
+def load_config(control_state_file: pathlib.Path) -> dict[str, Any]:
+    """
+    Only the config (version / resnet shape), for engines that defer loading
+    the weights. The inference file is mapped, so the tensors are never read;
+    without one the full checkpoint has to be loaded once and dropped.
+    """
+    state, _ = load_state(control_state_file, torch.device("cpu"))
+    config = state["config"]
+    del state
+    return config
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert a Mortal training checkpoint into an mmap-able inference file.")
+    parser.add_argument("src", type=pathlib.Path, help="path to mortal.pth")
+    parser.add_argument("dst", type=pathlib.Path, nargs="?", default=None, help=f"output path (default: <src stem>{INFERENCE_SUFFIX})")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    dst = convert_checkpoint(args.src, args.dst)
+    print(f"wrote {dst} ({dst.stat().st_size / 1e6:.1f} MB) in {time.perf_counter() - t0:.2f}s")
+
+    t0 = time.perf_counter()
+    state, mmapped = load_state(args.src, torch.device("cpu"))
+    print(f"reload check: mmap={mmapped} in {time.perf_counter() - t0:.3f}s, config={state['config']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Hedged remote/local inference for the OT online mode.
+
+The remote call gets a latency budget (AKAGI_OT_HEDGE_BUDGET_MS, 150 ms by
+default). If it has not answered by then, the calling thread runs local
+inference and uses its result; the remote call keeps running on its own pool
+only to report to the breaker, so slow remote calls never hold up local
+inference. A circuit breaker stops calling a server that fails or answers past
+the budget, for a cooling period that grows on repeated trips. A half-open
+probe after the cooldown decides whether to close it again.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from functools import partial
+from typing import Callable, Tuple, TypeVar
+
+from ..logger import logger
+
+T = TypeVar("T")
+
+HEDGE_BUDGET = float(os.getenv("AKAGI_OT_HEDGE_BUDGET_MS", "150")) / 1000.0
+BREAKER_FAILURES = int(os.getenv("AKAGI_OT_BREAKER_FAILURES", "3"))
+BREAKER_COOLDOWN = float(os.getenv("AKAGI_OT_BREAKER_COOLDOWN", "30"))
+BREAKER_MAX_COOLDOWN = 300.0
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURES, cooldown: float = BREAKER_COOLDOWN,
+                 max_cooldown: float = BREAKER_MAX_COOLDOWN):
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.state = self.CLOSED
+        self._failures = 0
+        self._cooldown = cooldown
+        self._open_until = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() >= self._open_until:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info("OT circuit breaker closed")
+            self.state = self.CLOSED
+            self._failures = 0
+            self._cooldown = self.base_cooldown
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            if self.state == self.OPEN:
+                # late outcomes of calls sent before the trip
+                return
+            self._failures += 1
+            if self.state == self.HALF_OPEN:
+                # failed probe: back off harder
+                self._cooldown = min(self._cooldown * 2, self.max_cooldown)
+            elif self._failures < self.failure_threshold:
+                return
+            self.state = self.OPEN
+            self._open_until = time.monotonic() + self._cooldown
+            self._probe_in_flight = False
+            logger.warning(f"OT circuit breaker open for {self._cooldown:.0f}s after {self._failures} failures")
+
+
+class HedgedInference:
+    def __init__(self, budget: float = HEDGE_BUDGET, breaker: CircuitBreaker | None = None):
+        self.budget = budget
+        self.breaker = breaker or CircuitBreaker()
+        # remote calls only: local inference runs in the caller's thread
+        self._pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="akagi-hedge")
+
+    def _on_remote_done(self, started: float, fut: Future) -> None:
+        if fut.cancelled() or fut.exception() is not None:
+            self.breaker.record_failure()
+        elif time.monotonic() - started > self.budget:
+            # answered, but too late to be used: as bad as a failure for latency
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    def run(self, remote: Callable[[], T], local: Callable[[], T]) -> Tuple[T, str]:
+        """Returns (result, "remote" | "local")."""
+        if not self.breaker.allow():
+            return local(), "local"
+
+        remote_fut = self._pool.submit(remote)
+        # the breaker hears about the remote outcome even when local wins
+        remote_fut.add_done_callback(partial(self._on_remote_done, time.monotonic()))
+
+        done, _ = wait([remote_fut], timeout=self.budget)
+        if done and remote_fut.exception() is None:
+            return remote_fut.result(), "remote"
+
+        try:
+            result = local()
+        except Exception:
+            if not done:
+                # local failed: a late remote answer is still better than nothing
+                wait([remote_fut])
+                if remote_fut.exception() is None:
+                    return remote_fut.result(), "remote"
+            # both failed: surface the local error, the remote one is already counted
+            raise
+        # still queued behind slow calls: don't send it at all
+        remote_fut.cancel()
+        return result, "local"
@@ -0,0 +1,357 @@
+# -*- coding: utf-8 -*-
+"""
+Host-local shared inference daemon.
+
+One daemon loads the 4p and 3p Mortal engines once and serves `react_batch`
+for every Akagi process on the host. Requests from different processes are
+merged into a single forward pass per model.
+
+Transport:
+ - control channel: Unix domain socket (TCP on loopback where AF_UNIX is
+   unavailable, e.g. older Windows Python builds)
+ - data channel: one shared-memory slab per client holding `max_batch` rows of
+   obs / mask / q. The client writes obs+mask, sends the row count, the
+   daemon writes q back into the same slab and replies with actions and
+   greedy flags only.
+
+Start the daemon:
+    python -m mjai_bot.inference.local_server --address /tmp/akagi-inference.sock
+
+Point Akagi at it:
+    AKAGI_INFERENCE_SOCKET=/tmp/akagi-inference.sock   (or tcp://127.0.0.1:47001)
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..logger import logger
+
+DEFAULT_ADDRESS = "/tmp/akagi-inference.sock" if hasattr(socket, "AF_UNIX") else "tcp://127.0.0.1:47001"
+CONNECT_TIMEOUT = 0.5
+REQUEST_TIMEOUT = 2.0
+
+_COUNT = struct.Struct("!I")
+_ROW = struct.Struct("!hB")  # action, is_greedy
+
+
+# ---------- framing ----------
+
+def _recv_exact(sock: socket.socket, n: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            raise ConnectionError("inference socket closed")
+        buf += chunk
+    return bytes(buf)
+
+
+def _send_json(sock: socket.socket, obj: dict) -> None:
+    body = json.dumps(obj, separators=(",", ":")).encode("utf-8")
+    sock.sendall(_COUNT.pack(len(body)) + body)
+
+
+def _recv_json(sock: socket.socket) -> dict:
+    (n,) = _COUNT.unpack(_recv_exact(sock, _COUNT.size))
+    return json.loads(_recv_exact(sock, n))
+
+
+def _parse_address(address: str) -> Tuple[int, Any]:
+    if address.startswith("tcp://"):
+        host, port = address[len("tcp://"):].rsplit(":", 1)
+        return socket.AF_INET, (host, int(port))
+    return socket.AF_UNIX, address
+
+
+# ---------- shared slab ----------
+
+@dataclass
+class _Slab:
+    shm: shared_memory.SharedMemory
+    obs: np.ndarray    # (max_batch, *obs_shape) float32
+    masks: np.ndarray  # (max_batch, action_space) bool
+    q: np.ndarray      # (max_batch, action_space) float32
+
+    @staticmethod
+    def nbytes(max_batch: int, obs_shape: Tuple[int, ...], action_space: int) -> int:
+        obs_n = max_batch * int(np.prod(obs_shape)) * 4
+        return obs_n + max_batch * action_space * (1 + 4)
+
+    @classmethod
+    def view(cls, shm: shared_memory.SharedMemory, max_batch: int, obs_shape: Tuple[int, ...], action_space: int) -> "_Slab":
+        obs_n = max_batch * int(np.prod(obs_shape)) * 4
+        mask_n = max_batch * action_space
+        obs = np.ndarray((max_batch, *obs_shape), dtype=np.float32, buffer=shm.buf, offset=0)
+        masks = np.ndarray((max_batch, action_space), dtype=np.bool_, buffer=shm.buf, offset=obs_n)
+        q = np.ndarray((max_batch, action_space), dtype=np.float32, buffer=shm.buf, offset=obs_n + mask_n)
+        return cls(shm, obs, masks, q)
+
+
+def _attach_untracked(name: str) -> shared_memory.SharedMemory:
+    shm = shared_memory.SharedMemory(name=name)
+    # Before 3.13 attaching registers the segment with this process's resource
+    # tracker, which would unlink the client's memory when the daemon exits.
+    if os.name == "posix":
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore[attr-defined]
+        except Exception:
+            pass
+    return shm
+
+
+# ---------- client (used by MortalEngine) ----------
+
+class LocalInferenceClient:
+    """Blocking client; one slab and one connection per engine, serialized by a lock."""
+
+    def __init__(self, address: str, model_key: str, max_batch: int = 4):
+        self.address = address
+        self.model_key = model_key
+        self.max_batch = max_batch
+        self._sock: Optional[socket.socket] = None
+        self._slab: Optional[_Slab] = None
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+        if self._slab is not None:
+            self._slab.shm.close()
+            try:
+                self._slab.shm.unlink()
+            except FileNotFoundError:
+                pass
+            self._slab = None
+
+    def _connect(self, batch: int, obs_shape: Tuple[int, ...], action_space: int) -> None:
+        self.close()
+        self.max_batch = max(self.max_batch, batch)
+        size = _Slab.nbytes(self.max_batch, obs_shape, action_space)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        self._slab = _Slab.view(shm, self.max_batch, obs_shape, action_space)
+
+        family, addr = _parse_address(self.address)
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(addr)
+        sock.settimeout(REQUEST_TIMEOUT)
+        _send_json(sock, {
+            "op": "hello",
+            "model": self.model_key,
+            "shm": shm.name,
+            "max_batch": self.max_batch,
+            "obs_shape": list(obs_shape),
+            "action_space": action_space,
+        })
+        reply = _recv_json(sock)
+        if not reply.get("ok"):
+            sock.close()
+            raise ConnectionError(f"inference daemon rejected hello: {reply.get('error')}")
+        self._sock = sock
+
+    def react_batch(self, obs, masks) -> Tuple[list, list, list, list]:
+        n = len(obs)
+        obs_shape = tuple(obs[0].shape)
+        action_space = int(masks[0].shape[-1])
+        with self._lock:
+            slab = self._slab
+            if (
+                self._sock is None
+                or slab is None
+                or n > self.max_batch
+                or slab.obs.shape[1:] != obs_shape
+                or slab.masks.shape[1] != action_space
+            ):
+                self._connect(n, obs_shape, action_space)
+                slab = self._slab
+            try:
+                slab.obs[:n] = np.stack(obs, axis=0)
+                slab.masks[:n] = np.stack(masks, axis=0)
+                self._sock.sendall(_COUNT.pack(n))
+                reply = _recv_exact(self._sock, _ROW.size * n)
+            except (OSError, ConnectionError):
+                self.close()
+                raise
+            q_out = slab.q[:n].tolist()
+            out_masks = slab.masks[:n].tolist()
+
+        actions, is_greedy = [], []
+        for i in range(n):
+            action, greedy = _ROW.unpack_from(reply, i * _ROW.size)
+            actions.append(action)
+            is_greedy.append(bool(greedy))
+        return actions, q_out, out_masks, is_greedy
+
+
+# ---------- daemon ----------
+
+@dataclass
+class _Job:
+    obs: np.ndarray
+    masks: np.ndarray
+    done: threading.Event = field(default_factory=threading.Event)
+    result: Optional[Tuple[list, list, list, list]] = None
+    error: Optional[BaseException] = None
+
+
+class _Batcher(threading.Thread):
+    """Merges jobs for one model that arrive within `max_wait` into one forward pass."""
+
+    def __init__(self, name: str, react: Callable, max_wait: float, max_rows: int):
+        super().__init__(name=f"akagi-batcher-{name}", daemon=True)
+        self.react = react
+        self.max_wait = max_wait
+        self.max_rows = max_rows
+        self.jobs: "queue.Queue[_Job]" = queue.Queue()
+
+    def run(self) -> None:
+        while True:
+            batch = [self.jobs.get()]
+            rows = len(batch[0].obs)
+            while rows < self.max_rows:
+                try:
+                    job = self.jobs.get(timeout=self.max_wait)
+                except queue.Empty:
+                    break
+                batch.append(job)
+                rows += len(job.obs)
+            self._run_batch(batch)
+
+    def _run_batch(self, batch: List[_Job]) -> None:
+        obs = [row for job in batch for row in job.obs]
+        masks = [row for job in batch for row in job.masks]
+        try:
+            actions, q_out, _, is_greedy = self.react(obs, masks, None)
+        except BaseException as ex:
+            for job in batch:
+                job.error = ex
+                job.done.set()
+            return
+        start = 0
+        for job in batch:
+            end = start + len(job.obs)
+            job.result = (actions[start:end], q_out[start:end], None, is_greedy[start:end])
+            job.done.set()
+            start = end
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    server: "InferenceServer"
+
+    def handle(self) -> None:
+        sock: socket.socket = self.request
+        try:
+            hello = _recv_json(sock)
+            batcher = self.server.batchers.get(hello.get("model"))
+            if hello.get("op") != "hello" or batcher is None:
+                _send_json(sock, {"ok": False, "error": f"unknown model {hello.get('model')!r}"})
+                return
+            shm = _attach_untracked(hello["shm"])
+        except Exception as ex:
+            logger.warning(f"inference daemon: bad hello: {ex}")
+            return
+        slab = _Slab.view(shm, int(hello["max_batch"]), tuple(hello["obs_shape"]), int(hello["action_space"]))
+        _send_json(sock, {"ok": True})
+        logger.info(f"inference daemon: client attached model={hello['model']} shm={hello['shm']}")
+        try:
+            while True:
+                (n,) = _COUNT.unpack(_recv_exact(sock, _COUNT.size))
+                job = _Job(obs=slab.obs[:n].copy(), masks=slab.masks[:n].copy())
+                batcher.jobs.put(job)
+                job.done.wait()
+                if job.error is not None:
+                    logger.error(f"inference daemon: batch failed: {job.error}")
+                    return
+                actions, q_out, _, is_greedy = job.result
+                slab.q[:n] = np.asarray(q_out, dtype=np.float32)
+                sock.sendall(b"".join(_ROW.pack(a, int(g)) for a, g in zip(actions, is_greedy)))
+        except ConnectionError:
+            pass
+        finally:
+            shm.close()
+            logger.info(f"inference daemon: client detached shm={hello['shm']}")
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+    class _UnixServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+else:  # pragma: no cover - platform without AF_UNIX
+    _UnixServer = None
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class InferenceServer:
+    def __init__(self, address: str, engines: Dict[str, Any], max_wait_ms: float = 2.0, max_rows: int = 64):
+        self.address = address
+        self.batchers = {
+            key: _Batcher(key, engine.react_local, max_wait_ms / 1000.0, max_rows)
+            for key, engine in engines.items()
+        }
+        family, addr = _parse_address(address)
+        if family == socket.AF_INET:
+            self._server = _TCPServer(addr, _Handler)
+        else:
+            if os.path.exists(addr):
+                os.unlink(addr)
+            self._server = _UnixServer(addr, _Handler)
+        self._server.batchers = self.batchers  # type: ignore[attr-defined]
+
+    def serve_forever(self) -> None:
+        for b in self.batchers.values():
+            b.start()
+        logger.info(f"inference daemon listening on {self.address} models={list(self.batchers)}")
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            family, addr = _parse_address(self.address)
+            if family != socket.AF_INET and os.path.exists(addr):
+                os.unlink(addr)
+
+
+def _load_engines(models: List[str]) -> Dict[str, Any]:
+    engines: Dict[str, Any] = {}
+    if "4p" in models:
+        from ..mortal import model as model_4p
+        engines["4p"] = model_4p.load_engine(local_backend=False)
+    if "3p" in models:
+        from ..mortal3p import model as model_3p
+        engines["3p"] = model_3p.load_engine(local_backend=False)
+    return engines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Shared Mortal inference daemon for local Akagi processes.")
+    parser.add_argument("--address", default=os.getenv("AKAGI_INFERENCE_SOCKET", DEFAULT_ADDRESS))
+    parser.add_argument("--models", default="4p,3p", help="comma separated: 4p,3p")
+    parser.add_argument("--max-wait-ms", type=float, default=2.0, help="how long to wait for more requests to batch")
+    parser.add_argument("--max-rows", type=int, default=64)
+    args = parser.parse_args()
+
+    engines = _load_engines([m.strip() for m in args.models.split(",") if m.strip()])
+    InferenceServer(args.address, engines, args.max_wait_ms, args.max_rows).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
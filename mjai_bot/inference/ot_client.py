@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""
+Client for the OT online inference server.
+
+ - one pooled `requests.Session` per (server, api_key), so decisions reuse a
+   keep-alive connection instead of a fresh TCP/TLS handshake each time
+ - compact binary batches (`application/x-akagi-batch`): shape header, obs as
+   packed bits when it is a 0/1 tensor (raw float32 otherwise), packed masks;
+   responses carry int16 actions, float32 q and packed flags
+ - negotiation: binary is opt-in (`"binary": true` in ot_settings.json). When
+   enabled, the first request offers binary; if the server answers with any
+   non-2xx status, the same batch is retried once as the original gzip+JSON
+   body, and a server that accepts that (or answers binary with JSON) is
+   remembered as legacy-only. Without the setting only gzip+JSON is sent.
+
+`mjai_bot.inference.ot_stub_server` speaks both formats for local testing.
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import struct
+import threading
+from typing import List, Sequence, Tuple
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+BINARY_CONTENT_TYPE = "application/x-akagi-batch"
+WIRE_VERSION = 1
+
+OBS_FLOAT32 = 1
+OBS_BITS = 2
+
+_MAGIC = b"AKB1"
+# magic, version, obs encoding, ndim (per row), batch, action_space
+_REQ_HEAD = struct.Struct("!4sBBHII")
+# magic, version, batch, action_space
+_RES_HEAD = struct.Struct("!4sBxxII")
+_DIM = struct.Struct("!I")
+
+Batch = Tuple[List[int], List[List[float]], List[List[bool]], List[bool]]
+
+
+# ---------- codec (shared with the stub server) ----------
+
+def encode_request(obs: Sequence[np.ndarray], masks: Sequence[np.ndarray]) -> bytes:
+    obs_arr = np.ascontiguousarray(np.stack(obs, axis=0), dtype=np.float32)
+    mask_arr = np.stack(masks, axis=0).astype(bool, copy=False)
+    batch, action_space = mask_arr.shape
+    row_shape = obs_arr.shape[1:]
+
+    if np.all((obs_arr == 0) | (obs_arr == 1)):
+        encoding, body = OBS_BITS, np.packbits(obs_arr.astype(bool), axis=None).tobytes()
+    else:
+        encoding, body = OBS_FLOAT32, obs_arr.tobytes()
+
+    head = _REQ_HEAD.pack(_MAGIC, WIRE_VERSION, encoding, len(row_shape), batch, action_space)
+    dims = b"".join(_DIM.pack(d) for d in row_shape)
+    return head + dims + body + np.packbits(mask_arr, axis=None).tobytes()
+
+
+def decode_request(data: bytes) -> Tuple[np.ndarray, np.ndarray]:
+    magic, version, encoding, ndim, batch, action_space = _REQ_HEAD.unpack_from(data, 0)
+    if magic != _MAGIC or version != WIRE_VERSION:
+        raise ValueError("unsupported batch payload")
+    off = _REQ_HEAD.size
+    row_shape = tuple(_DIM.unpack_from(data, off + i * _DIM.size)[0] for i in range(ndim))
+    off += ndim * _DIM.size
+    count = batch * int(np.prod(row_shape))
+    if encoding == OBS_BITS:
+        nbytes = (count + 7) // 8
+        obs = np.unpackbits(np.frombuffer(data, np.uint8, nbytes, off), count=count).astype(np.float32)
+    elif encoding == OBS_FLOAT32:
+        nbytes = count * 4
+        obs = np.frombuffer(data, np.float32, count, off).copy()
+    else:
+        raise ValueError(f"unknown obs encoding {encoding}")
+    off += nbytes
+    mask_count = batch * action_space
+    masks = np.unpackbits(np.frombuffer(data, np.uint8, (mask_count + 7) // 8, off), count=mask_count).astype(bool)
+    return obs.reshape(batch, *row_shape), masks.reshape(batch, action_space)
+
+
+def encode_response(actions, q_out, masks, is_greedy) -> bytes:
+    q_arr = np.asarray(q_out, dtype=np.float32)
+    batch, action_space = q_arr.shape
+    return b"".join((
+        _RES_HEAD.pack(_MAGIC, WIRE_VERSION, batch, action_space),
+        np.asarray(actions, dtype=">i2").tobytes(),
+        np.packbits(np.asarray(is_greedy, dtype=bool)).tobytes(),
+        np.packbits(np.asarray(masks, dtype=bool), axis=None).tobytes(),
+        q_arr.astype(">f4").tobytes(),
+    ))
+
+
+def decode_response(data: bytes) -> Batch:
+    magic, version, batch, action_space = _RES_HEAD.unpack_from(data, 0)
+    if magic != _MAGIC or version != WIRE_VERSION:
+        raise ValueError("unsupported batch response")
+    off = _RES_HEAD.size
+    actions = np.frombuffer(data, ">i2", batch, off)
+    off += batch * 2
+    greedy = np.unpackbits(np.frombuffer(data, np.uint8, (batch + 7) // 8, off), count=batch).astype(bool)
+    off += (batch + 7) // 8
+    mask_count = batch * action_space
+    masks = np.unpackbits(np.frombuffer(data, np.uint8, (mask_count + 7) // 8, off), count=mask_count).astype(bool)
+    off += (mask_count + 7) // 8
+    q_out = np.frombuffer(data, ">f4", mask_count, off).astype(np.float32)
+    return (
+        actions.tolist(),
+        q_out.reshape(batch, action_space).tolist(),
+        masks.reshape(batch, action_space).tolist(),
+        greedy.tolist(),
+    )
+
+
+# ---------- client ----------
+
+class OTClient:
+    def __init__(self, server: str, api_key: str, endpoint: str, timeout: float, pool_size: int = 4,
+                 binary: bool = False):
+        self.server = server
+        self.api_key = api_key
+        self.binary = binary
+        self.url = f"{server}{endpoint}"
+        self.timeout = timeout
+        # None = not negotiated yet. Legacy servers may answer an unknown body with 500, so binary is opt-in.
+        self.binary_supported: bool | None = None if binary else False
+        self._lock = threading.Lock()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Authorization": api_key})
+
+    def matches(self, server: str, api_key: str, binary: bool = False) -> bool:
+        return self.server == server and self.api_key == api_key and self.binary == binary
+
+    def close(self) -> None:
+        self.session.close()
+
+    def react_batch(self, obs, masks, timeout: float | None = None) -> Batch:
+        timeout = self.timeout if timeout is None else timeout
+        if self.binary_supported is not False:
+            r = self.session.post(
+                self.url,
+                data=encode_request(obs, masks),
+                headers={"Content-Type": BINARY_CONTENT_TYPE, "Accept": f"{BINARY_CONTENT_TYPE}, application/json;q=0.5"},
+                timeout=timeout,
+            )
+            if not r.ok and self.binary_supported is None:
+                # Not negotiated yet: whatever the error (415, or a 500 from a server that
+                # choked on the body), retry once in the legacy format and remember it if it works.
+                result = self._react_batch_legacy(obs, masks, timeout)
+                with self._lock:
+                    self.binary_supported = False
+                return result
+            r.raise_for_status()
+            if r.headers.get("Content-Type", "").startswith(BINARY_CONTENT_TYPE):
+                self.binary_supported = True
+                return decode_response(r.content)
+            # Server accepted the body but answered JSON: treat as legacy from now on.
+            self.binary_supported = False
+            return self._parse_json(r)
+        return self._react_batch_legacy(obs, masks, timeout)
+
+    def _react_batch_legacy(self, obs, masks, timeout: float) -> Batch:
+        post_data = {
+            'obs': [o.tolist() for o in obs],
+            'masks': [m.tolist() for m in masks],
+        }
+        data = json.dumps(post_data, separators=(',', ':'))
+        r = self.session.post(
+            self.url,
+            data=gzip.compress(data.encode('utf-8')),
+            headers={'Content-Encoding': 'gzip'},
+            timeout=timeout,
+        )
+        r.raise_for_status()
+        return self._parse_json(r)
+
+    @staticmethod
+    def _parse_json(r: requests.Response) -> Batch:
+        r_json = r.json()
+        return r_json['actions'], r_json['q_out'], r_json['masks'], r_json['is_greedy']
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+Local stand-in for the OT inference server.
+
+Speaks both the legacy gzip+JSON body and the binary batch format from
+`ot_client`, on /react_batch and /react_batch_3p, with HTTP/1.1 keep-alive.
+By default it answers with a seeded random policy; `--engine` serves the real
+local Mortal model instead.
+
+    python -m mjai_bot.inference.ot_stub_server --port 8765
+    # ot_settings.json: {"server": "http://127.0.0.1:8765", "online": true, "api_key": "test", "binary": true}
+
+`--legacy-only` answers binary bodies with 500, like a legacy server failing
+to gunzip/parse them, to exercise the client's fallback negotiation;
+`--delay-ms` adds artificial latency.
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import logging
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict
+
+import numpy as np
+
+from .ot_client import BINARY_CONTENT_TYPE, decode_request, encode_response
+
+log = logging.getLogger("akagi.inference")
+
+
+def random_policy(seed: int = 0) -> Callable:
+    rng = np.random.default_rng(seed)
+
+    def react(obs, masks, invisible_obs=None):
+        masks = np.asarray(masks, dtype=bool)
+        q = rng.standard_normal(masks.shape).astype(np.float32)
+        q[~masks] = -np.inf
+        actions = q.argmax(-1)
+        return actions.tolist(), q.tolist(), masks.tolist(), [True] * len(actions)
+
+    return react
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "StubServer"
+
+    def log_message(self, fmt: str, *args: Any) -> None:
+        log.debug(fmt % args)
+
+    def do_POST(self) -> None:
+        react = self.server.policies.get(self.path)
+        if react is None:
+            self._reply(404, "application/json", b'{"error":"not found"}')
+            return
+        body = self.rfile.read(int(self.headers.get("Content-Length", "0")))
+        if self.server.delay:
+            time.sleep(self.server.delay)
+
+        if self.headers.get("Content-Type", "").startswith(BINARY_CONTENT_TYPE):
+            if self.server.legacy_only:
+                self.server.received.append((self.path, "binary-rejected"))
+                self._reply(500, "application/json", b'{"error":"failed to parse request body"}')
+                return
+            self.server.received.append((self.path, "binary"))
+            obs, masks = decode_request(body)
+            result = react(list(obs), list(masks), None)
+            self._reply(200, BINARY_CONTENT_TYPE, encode_response(*result))
+            return
+
+        self.server.received.append((self.path, "json"))
+        if self.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        req = json.loads(body)
+        obs = [np.asarray(o, dtype=np.float32) for o in req["obs"]]
+        masks = [np.asarray(m, dtype=bool) for m in req["masks"]]
+        actions, q_out, out_masks, is_greedy = react(obs, masks, None)
+        payload = {"actions": actions, "q_out": q_out, "masks": out_masks, "is_greedy": is_greedy}
+        self._reply(200, "application/json", json.dumps(payload).encode("utf-8"))
+
+    def _reply(self, status: int, content_type: str, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, policies: Dict[str, Callable], legacy_only: bool = False, delay: float = 0.0):
+        super().__init__(address, _Handler)
+        self.policies = policies
+        self.legacy_only = legacy_only
+        self.delay = delay
+        # (path, "binary" | "binary-rejected" | "json") per request, for tests
+        self.received: list[tuple[str, str]] = []
+
+
+def make_server(host: str = "127.0.0.1", port: int = 0, engine: bool = False,
+                legacy_only: bool = False, delay_ms: float = 0.0, seed: int = 0) -> StubServer:
+    policies: Dict[str, Callable]
+    if engine:
+        from ..mortal import model as model_4p
+        from ..mortal3p import model as model_3p
+        policies = {
+            "/react_batch": model_4p.load_engine(local_backend=False).react_local,
+            "/react_batch_3p": model_3p.load_engine(local_backend=False).react_local,
+        }
+    else:
+        policies = {"/react_batch": random_policy(seed), "/react_batch_3p": random_policy(seed + 1)}
+    return StubServer((host, port), policies, legacy_only, delay_ms / 1000.0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local stand-in for the OT inference server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--engine", action="store_true", help="serve the local Mortal models instead of a random policy")
+    parser.add_argument("--legacy-only", action="store_true", help="fail binary batches with 500 like a legacy server")
+    parser.add_argument("--delay-ms", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    server = make_server(args.host, args.port, args.engine, args.legacy_only, args.delay_ms, args.seed)
+    log.info(f"OT stub server on http://{args.host}:{server.server_address[1]} legacy_only={args.legacy_only}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Observation-level q-value cache for MortalEngine.
+
+Reach-accepted tsumogiri, fast-forward after reconnect and review replays feed
+the engine byte-identical (obs, mask) pairs over and over. Entries are keyed by
+a 128-bit hash of the raw obs buffer, the mask bits and a per-engine salt
+(model name + version), and evicted in LRU order.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import partial
+from typing import Any, Optional, Tuple
+
+import numpy as np
+
+try:
+    import xxhash  # optional, faster than blake2b on large obs buffers
+    _new_hasher = xxhash.xxh3_128
+except ImportError:
+    _new_hasher = partial(hashlib.blake2b, digest_size=16)
+
+# (action, q_values, mask, is_greedy) for one batch row
+CacheEntry = Tuple[int, list, list, bool]
+
+
+class QValueCache:
+    def __init__(self, capacity: int = 4096, salt: str = ""):
+        self.capacity = capacity
+        self._salt = salt.encode("utf-8")
+        self._entries: OrderedDict[bytes, CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, obs: np.ndarray, mask: np.ndarray) -> bytes:
+        h = _new_hasher()
+        h.update(self._salt)
+        h.update(np.ascontiguousarray(obs).data)
+        h.update(np.packbits(np.asarray(mask, dtype=bool)).tobytes())
+        return h.digest()
+
+    def get(self, key: bytes) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: bytes, entry: CacheEntry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.misses
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.lookups
+        return {
+            "size": len(self._entries),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+        }
@@ -1,8 +1,10 @@
+import os
 import json
-import gzip
+import time
+import threading
 import torch
+import contextlib
 import pathlib
-import requests
 import traceback
 import numpy as np
 
@@ -16,6 +18,11 @@ from itertools import permutations
 from .libriichi3p.mjai import Bot
 from .libriichi3p.consts import obs_shape, oracle_obs_shape, ACTION_SPACE, GRP_SIZE
 from .logger import logger
+from ..inference.qcache import QValueCache
+from ..inference.checkpoint import load_config, load_state
+from ..inference.local_server import LocalInferenceClient
+from ..inference.ot_client import OTClient
+from ..inference.hedge import HedgedInference
 
 # ========== Online Server =========== #
 OT_REQUEST_TIMEOUT = 2
@@ -34,6 +41,33 @@ def online_settings_init():
             ot_settings = json.load(f)
 
 online_settings_init()
+
+_ot_client: Optional[OTClient] = None
+# リモートが遅い/落ちているときはローカル推論と競争させ、サーキットブレーカーで呼び出しを止める
+ot_hedge = HedgedInference()
+
+def get_ot_client() -> OTClient:
+    # 接続 (keep-alive) を使い回すため、設定が変わらない限り同じクライアントを返す
+    global _ot_client
+    binary = bool(ot_settings.get('binary', False))  # バイナリ形式は対応サーバのみ（opt-in）
+    if _ot_client is None or not _ot_client.matches(ot_settings['server'], ot_settings['api_key'], binary):
+        if _ot_client is not None:
+            _ot_client.close()
+        _ot_client = OTClient(ot_settings['server'], ot_settings['api_key'], '/react_batch_3p', OT_REQUEST_TIMEOUT, binary=binary)
+    return _ot_client
+# ==================================== #
+
+# ========== Local Server ============ #
+# mjai_bot.inference.local_server のデーモンを使う場合に指定
+LOCAL_INFERENCE_ADDRESS = os.getenv("AKAGI_INFERENCE_SOCKET", "")
+LOCAL_INFERENCE_RETRY = 5.0
+MODEL_KEY = '3p'
+# ==================================== #
+
+# ========== Q-value Cache =========== #
+# 0 で無効化。同一 (obs, mask) の再推論を省く
+Q_CACHE_SIZE = int(os.getenv("AKAGI_Q_CACHE_SIZE", "4096"))
+Q_CACHE_LOG_EVERY = 1000
 # ==================================== #
 
 class ChannelAttention(nn.Module):
@@ -276,12 +310,13 @@ class MortalEngine:
         boltzmann_epsilon = 0,
         boltzmann_temp = 1,
         top_p = 1,
+        q_cache_size = 0,
+        local_server_address = '',
+        loader = None,
     ):
         self.engine_type = 'mortal'
         self.device = device or torch.device('cpu')
         assert isinstance(self.device, torch.device)
-        self.brain = brain.to(self.device).eval()
-        self.dqn = dqn.to(self.device).eval()
         self.is_oracle = is_oracle
         self.version = version
         self.stochastic_latent = stochastic_latent
@@ -295,46 +330,104 @@ class MortalEngine:
         self.boltzmann_temp = boltzmann_temp
         self.top_p = top_p
 
+        # brain=None なら重みは loader() -> (brain, dqn, version) で、プロセス内推論が初めて必要になった時に読む
+        self.q_cache_size = q_cache_size
+        self.brain = None
+        self.dqn = None
+        self.q_cache = None
+        self._loader = loader
+        self._load_lock = threading.Lock()
+        if brain is not None:
+            self._set_model(brain, dqn, version)
+
+        self.local_client = LocalInferenceClient(local_server_address, MODEL_KEY) if local_server_address else None
+        self._local_retry_at = 0.0
+        # 複数卓で共有されるので、プロセス内の順伝播は 1 本ずつ（CPU スレッドの取り合いを避ける）
+        self._forward_lock = threading.Lock()
+
+    def _set_model(self, brain, dqn, version):
+        self.version = version
+        self.q_cache = QValueCache(self.q_cache_size, salt=f'{self.name}:{version}') if self.q_cache_size > 0 else None
+        self.dqn = dqn.to(self.device).eval()
+        # brain は最後：_ensure_model は brain を見て読み込み済みと判断する
+        self.brain = brain.to(self.device).eval()
+
+    def _ensure_model(self):
+        if self.brain is not None:
+            return
+        with self._load_lock:
+            if self.brain is None:
+                logger.info("Loading the in-process model (local inference server unavailable)")
+                self._set_model(*self._loader())
+
     def react_batch(self, obs, masks, invisible_obs):
         # ========== Online Server =========== #
         global ot_settings, is_online
         if ot_settings['online']:
+            result, source = ot_hedge.run(
+                lambda: get_ot_client().react_batch(obs, masks),
+                lambda: self._react_offline(obs, masks, invisible_obs),
+            )
+            is_online = source == 'remote'
+            return result
+        # ==================================== #
+        return self._react_offline(obs, masks, invisible_obs)
+
+    def _react_offline(self, obs, masks, invisible_obs):
+        # ========== Local Server ============ #
+        if self.local_client is not None and time.monotonic() >= self._local_retry_at:
             try:
-                list_obs = [o.tolist() for o in obs]
-                list_masks = [m.tolist() for m in masks]
-                post_data = {
-                    'obs': list_obs,
-                    'masks': list_masks,
-                }
-                data = json.dumps(post_data, separators=(',', ':'))
-                compressed_data = gzip.compress(data.encode('utf-8'))
-                headers = {
-                    'Authorization': ot_settings['api_key'],
-                    'Content-Encoding': 'gzip',
-                }
-                r = requests.post(
-                    f'{ot_settings["server"]}/react_batch_3p',
-                    headers=headers,
-                    data=compressed_data,
-                    timeout=OT_REQUEST_TIMEOUT
-                )
-                assert r.status_code == 200
-                is_online = True
-                r_json = r.json()
-                return r_json['actions'], r_json['q_out'], r_json['masks'], r_json['is_greedy']
-            except:
-                is_online = False
-                pass
+                return self.local_client.react_batch(obs, masks)
+            except Exception as ex:
+                logger.warning(f"Local inference server unavailable, falling back to in-process model: {ex}")
+                self._local_retry_at = time.monotonic() + LOCAL_INFERENCE_RETRY
         # ==================================== #
+        return self.react_local(obs, masks, invisible_obs)
+
+    def react_local(self, obs, masks, invisible_obs):
+        self._ensure_model()
         try:
             with (
+                self._forward_lock,
                 torch.autocast(self.device.type, enabled=self.enable_amp),
                 torch.inference_mode(),
             ):
-                return self._react_batch(obs, masks, invisible_obs)
+                return self._react_batch_cached(obs, masks, invisible_obs)
         except Exception as ex:
             raise Exception(f'{ex}\n{traceback.format_exc()}')
 
+    def _q_cache_usable(self) -> bool:
+        # Sampling makes results non-deterministic, so the cache must be bypassed.
+        return (
+            self.q_cache is not None
+            and self.boltzmann_epsilon <= 0
+            and not self.stochastic_latent
+            and not self.is_oracle
+        )
+
+    def _react_batch_cached(self, obs, masks, invisible_obs):
+        if not self._q_cache_usable():
+            return self._react_batch(obs, masks, invisible_obs)
+
+        keys = [self.q_cache.key(o, m) for o, m in zip(obs, masks)]
+        rows = [self.q_cache.get(k) for k in keys]
+        miss_idx = [i for i, row in enumerate(rows) if row is None]
+        if miss_idx:
+            actions, q_out, out_masks, is_greedy = self._react_batch(
+                [obs[i] for i in miss_idx],
+                [masks[i] for i in miss_idx],
+                invisible_obs,
+            )
+            for j, i in enumerate(miss_idx):
+                rows[i] = (actions[j], q_out[j], out_masks[j], is_greedy[j])
+                self.q_cache.put(keys[i], rows[i])
+
+        if self.q_cache.lookups % Q_CACHE_LOG_EVERY < len(keys):
+            logger.debug(f"q-cache stats: {self.q_cache.stats()}")
+
+        actions, q_out, out_masks, is_greedy = (list(col) for col in zip(*rows))
+        return actions, q_out, out_masks, is_greedy
+
     def _react_batch(self, obs, masks, invisible_obs):
         obs = torch.as_tensor(np.stack(obs, axis=0), device=self.device)
         masks = torch.as_tensor(np.stack(masks, axis=0), device=self.device)
@@ -379,36 +472,67 @@ def sample_top_p(logits, p):
     sampled = probs_idx.gather(-1, probs_sort.multinomial(1)).squeeze(-1)
     return sampled
 
-def load_model(seat: int) -> Bot:
+# latest binary model
+CONTROL_STATE_FILE = pathlib.Path(__file__).parent / "mortal.pth"
+
+def _load_weights(device):
+    # mortal.inference.pth があれば mmap で読み込む (mjai_bot.inference.checkpoint で生成)
+    t0 = time.perf_counter()
+    state, mmapped = load_state(CONTROL_STATE_FILE, device)
+
+    # mmap 時は meta device 上で組み立て、マップ済みテンソルをそのまま使う
+    with torch.device('meta') if mmapped else contextlib.nullcontext():
+        mortal = Brain(version=state['config']['control']['version'], conv_channels=state['config']['resnet']['conv_channels'], num_blocks=state['config']['resnet']['num_blocks']).eval()
+        dqn = DQN(version=state['config']['control']['version']).eval()
+    mortal.load_state_dict(state['mortal'], assign=mmapped)
+    dqn.load_state_dict(state['current_dqn'], assign=mmapped)
+    logger.debug(f"Loaded model in {time.perf_counter() - t0:.3f}s (mmap={mmapped})")
+    return mortal, dqn, state['config']['control']['version']
+
+def load_engine(local_backend: bool = True) -> MortalEngine:
     # check if GPU is available
     if torch.cuda.is_available():
         device = torch.device('cuda')
     else:
         device = torch.device('cpu')
 
-    # latest binary model
-    control_state_file = "./mortal.pth"
-
-    # Get the path of control_state_file = current directory / control_state_file
-    control_state_file = pathlib.Path(__file__).parent / control_state_file
-    state = torch.load(control_state_file, map_location=device)
-
-    mortal = Brain(version=state['config']['control']['version'], conv_channels=state['config']['resnet']['conv_channels'], num_blocks=state['config']['resnet']['num_blocks']).eval()
-    dqn = DQN(version=state['config']['control']['version']).eval()
-    mortal.load_state_dict(state['mortal'])
-    dqn.load_state_dict(state['current_dqn'])
+    if local_backend and LOCAL_INFERENCE_ADDRESS:
+        # 推論デーモンが本体。重みはデーモンに届かずフォールバックする時まで読まない
+        # （libriichi の Bot が engine.version を読むので、設定だけは先に取る）
+        version = load_config(CONTROL_STATE_FILE)['control']['version']
+        mortal, dqn, loader = None, None, partial(_load_weights, device)
+    else:
+        mortal, dqn, version = _load_weights(device)
+        loader = None
 
     engine = MortalEngine(
         mortal,
         dqn,
         is_oracle = False,
-        version = state['config']['control']['version'],
+        version = version,
         device = device,
         enable_amp = False,
         enable_quick_eval = False,
         enable_rule_based_agari_guard = True,
         name = 'mortal',
+        q_cache_size = Q_CACHE_SIZE,
+        local_server_address = LOCAL_INFERENCE_ADDRESS if local_backend else '',
+        loader = loader,
     )
+    return engine
+
+_shared_engines: Dict[bool, MortalEngine] = {}
+_shared_engine_lock = threading.Lock()
 
+def shared_engine(local_backend: bool = True) -> MortalEngine:
+    # 対局ごと・卓ごとに読み直さず、プロセス内で 1 つのエンジン（重みと q-cache）を使い回す
+    with _shared_engine_lock:
+        engine = _shared_engines.get(local_backend)
+        if engine is None:
+            engine = _shared_engines[local_backend] = load_engine(local_backend)
+        return engine
+
+def load_model(seat: int) -> Bot:
+    engine = shared_engine()
     bot = Bot(engine, seat)
     return bot
@@ -2,7 +2,6 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from typing import List, Optional, Dict
-import os
 import logging
 from .safety import SafetyContext, aggregate_danger, bucketize, Tile
 
@@ -31,13 +30,27 @@ class MoveCandidate:
     ev_point: float = 0.0
     danger_score: float = 0.0
 
-@dataclass
+@dataclass(frozen=True)
 class LastAvoidConfig:
+    # 値の供給元は settings.tunables（AKAGI_LAST_AVOID_* / AKAGI_EARLY_DEALER_RIICHI_*）
     enabled: bool = True
-    danger_threshold_high: float = float(os.getenv("AKAGI_LAST_AVOID_DANGER_HIGH", "0.5"))
-    danger_threshold_low: float  = float(os.getenv("AKAGI_LAST_AVOID_DANGER_LOW", "0.8"))
-    must_fold_point_diff: int    = int(os.getenv("AKAGI_LAST_AVOID_MUST_FOLD", "8000"))
-    can_escape_point_diff: int   = int(os.getenv("AKAGI_LAST_AVOID_CAN_ESCAPE", "2000"))
+    danger_threshold_high: float = 0.5
+    danger_threshold_low: float  = 0.8
+    must_fold_point_diff: int    = 8000
+    can_escape_point_diff: int   = 2000
+    early_dealer_riichi_turn: int   = 8
+    early_dealer_riichi_add: float  = 0.10
+
+    @classmethod
+    def from_tunables(cls, t) -> "LastAvoidConfig":
+        return cls(
+            danger_threshold_high=t.last_avoid_danger_high,
+            danger_threshold_low=t.last_avoid_danger_low,
+            must_fold_point_diff=t.last_avoid_must_fold,
+            can_escape_point_diff=t.last_avoid_can_escape,
+            early_dealer_riichi_turn=t.early_dealer_riichi_turn,
+            early_dealer_riichi_add=t.early_dealer_riichi_add,
+        )
 
 def rank_order(scores: List[int]) -> List[int]:
     return sorted(range(4), key=lambda i: (-scores[i], i))
@@ -90,6 +103,8 @@ def choose_with_last_avoid(
         my_tiles=ts.my_tiles,
         dora_indicators=ts.dora_indicators,
         riichi_early_turns=ts.riichi_early_turns,
+        early_dealer_riichi_boost_at=cfg.early_dealer_riichi_turn,
+        early_dealer_riichi_add=cfg.early_dealer_riichi_add,
     )
 
     # 危険度を付与
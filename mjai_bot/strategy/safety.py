@@ -3,7 +3,6 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Dict, List, Set, Tuple, Optional, Iterable, Union
 import logging
-import os
 
 log = logging.getLogger("akagi.safety")
 
@@ -243,8 +242,8 @@ class SafetyContext:
     my_tiles: Optional[List[Tile]] = None
     riichi_early_turns: Optional[Dict[int, int]] = None  # actor->宣言順目（小さいほど早い）
     # 早い親リーチ補正
-    early_dealer_riichi_boost_at: int = int(os.getenv("AKAGI_EARLY_DEALER_RIICHI_TURN", "8"))
-    early_dealer_riichi_add: float = float(os.getenv("AKAGI_EARLY_DEALER_RIICHI_ADD", "0.10"))
+    early_dealer_riichi_boost_at: int = 8
+    early_dealer_riichi_add: float = 0.10
 
 def danger_against_player(tile: Tile,
                           opp_river: List[Union[Tile, RiverItem]],
@@ -1,6 +1,6 @@
 from .util import Point
-from .logger import logger
-from .autoplay_majsoul import AutoPlayMajsoul
+from .logger import logger, DEBUG_ENABLED
+from .autoplay_majsoul import AutoPlayMajsoul, location_points
 from settings.settings import settings
 from playwright_client.client import Client
     
@@ -8,6 +8,8 @@ class AutoPlay(object):
     def __init__(self):
         self.autoplay: AutoPlayMajsoul = AutoPlayMajsoul()
         self.client: Client = None
+        # リーチ宣言の直後の打牌は宣言の続き（宣言クリックを打ち切らない）
+        self._after_reach: bool = False
 
     def set_bot(self, bot):
         """
@@ -28,13 +30,17 @@ class AutoPlay(object):
             None: No return value.
         """
         self.client = client
+        # 牌・ボタン座標のピクセル変換を先に済ませておく
+        client.controller.prime_points(location_points())
 
-    def act(self, mjai_msg: dict) -> bool:
+    def act(self, mjai_msg: dict, received_at: float | None = None, seq: int | None = None) -> bool:
         """
         Given a MJAI message, this method processes the message and performs the corresponding action.
 
         Args:
             mjai_msg (dict): The MJAI message to process.
+            received_at (float | None): Receive time of the batch mjai_msg answers (default client.last_batch_at).
+            seq (int | None): controller.event_seq of that batch (default client.last_batch_seq).
 
         Returns:
             bool: True if the action was performed, False otherwise.
@@ -42,15 +48,25 @@ class AutoPlay(object):
         if not self.client.running:
             logger.error("Client is not running.")
             return False
-        points: list[Point] = self.autoplay.act(mjai_msg)
+        # 呼び出しが遅れると（TUI の set_timer 等）client の値は次のバッチのものになり得るので、渡されたものを優先する
+        if received_at is None:
+            received_at = self.client.last_batch_at
+        if seq is None:
+            seq = self.client.last_batch_seq
+        points: list[Point] = self.autoplay.act(mjai_msg, received_at=received_at)
+        supersede = not self._after_reach
+        self._after_reach = mjai_msg.get("type") == "reach"
         if not points:
             # Maybe under riichi condition
             return True
-        for point in points:
-            command = {"command": "delay", "delay": point.delay}
-            self.client.send_command(command)
-            command = {"command": "click", "point": [point.x, point.y]}
-            self.client.send_command(command)
-        logger.debug(f"Processed MJAI message: {mjai_msg}")
-        logger.debug(f"Points to click: {points}")
+        # 一連のクリックを 1 つの gesture として送る（前の判断の残りはキャンセルされる）
+        # seq: このクリックが答えている mjai イベント。後続イベントが来たら controller が捨てる
+        self.client.send_gesture(
+            [[point.x, point.y, point.delay] for point in points],
+            supersede=supersede,
+            seq=seq,
+        )
+        if DEBUG_ENABLED:
+            logger.debug(f"Processed MJAI message: {mjai_msg}")
+            logger.debug(f"Points to click: {points}")
         return True
@@ -1,153 +1,20 @@
-import os
 import time
 import json
 import random
 import math
-from .logger import logger
+from .logger import logger, DEBUG_ENABLED
 from .util import Point
+from .timing import TimingPlanner
 from settings.settings import settings
+from settings.tunables import Tunables, TunablesStore, tunables_store
 
-from functools import cmp_to_key
-from mjai_bot.bot import AkagiBot
+from functools import cmp_to_key, wraps
+from typing import Mapping
+from mjai_bot.bot import AkagiBot, TableSnapshot
 
 
-# ---- Tuning knobs (env overridable) ----
-def _getf(name: str, default: float) -> float:
-    try:
-        v = os.getenv(name)
-        return float(v) if v is not None else default
-    except Exception:
-        return default
-
-def _geti(name: str, default: int) -> int:
-    try:
-        v = os.getenv(name)
-        return int(v) if v is not None else default
-    except Exception:
-        return default
-
-
-# --- Waits ---
-NAKI_PREWAIT = _getf("AKAGI_NAKI_PREWAIT", 2.00)
-AKAGI_REACH_WAIT = _getf("AKAGI_REACH_WAIT", 1.00)
-AKAGI_RON_WAIT = _getf("AKAGI_RON_WAIT", 1.00)
-AKAGI_TSUMO_WAIT = _getf("AKAGI_TSUMO_WAIT", 1.00)
-NAKI_BUTTON_WAIT = _getf("AKAGI_NAKI_BUTTON_WAIT", 0.50)
-NAKI_CAND_WAIT = _getf("AKAGI_NAKI_CAND_WAIT", 0.25)
-NAKI_DOUBLE_CLICK = _geti("AKAGI_NAKI_DOUBLE_CLICK", 0)
-NAKI_SINGLE_WAIT = _getf("AKAGI_NAKI_SINGLE_WAIT", NAKI_CAND_WAIT)
-NAKI_NONE_PREWAIT = _getf("AKAGI_NAKI_NONE_PREWAIT", 0.15)
-AKAGI_OYA_FIRST_DAHAI_EXTRA = _getf("AKAGI_OYA_FIRST_DAHAI_EXTRA", 2.00)
-
-# --- Tenpai bias ---
-AKAGI_TENPAI_BIAS_ENABLE = _geti("AKAGI_TENPAI_BIAS_ENABLE", 1)
-AKAGI_TENPAI_BIAS_OYA_SHANTEN2 = _geti("AKAGI_TENPAI_BIAS_OYA_SHANTEN2", 1)
-
-# --- Naki safety (simple & strong) ---
-AKAGI_NAKI_SAFETY_ENABLE = _geti("AKAGI_NAKI_SAFETY_ENABLE", 1)
-AKAGI_NAKI_SAFETY_JUNME_TIGHT = _geti("AKAGI_NAKI_SAFETY_JUNME_TIGHT", 9)  # earlier endgame
-AKAGI_NAKI_SAFETY_MIN_ANPAI = _geti("AKAGI_NAKI_SAFETY_MIN_ANPAI", 3)      # need >=3 safe tiles late
-
-# --- Fold mode (simplified) ---
-AKAGI_FOLD_ENABLE = _geti("AKAGI_FOLD_ENABLE", 1)
-AKAGI_FOLD_SHANTEN_THRESH = _geti("AKAGI_FOLD_SHANTEN_THRESH", 3)
-AKAGI_FOLD_BADNESS_SCORE_THRESH = _geti("AKAGI_FOLD_BADNESS_SCORE_THRESH", 7)
-AKAGI_FOLD_EARLY_JUNME = _geti("AKAGI_FOLD_EARLY_JUNME", 7)
-AKAGI_FOLD_RELEASE_SHANTEN = _geti("AKAGI_FOLD_RELEASE_SHANTEN", 1)
-AKAGI_FOLD_FORCE_ON_RIICHI = _geti("AKAGI_FOLD_FORCE_ON_RIICHI", 1)
-
-# --- Oya endgame push (no KAN paths at all) ---
-AKAGI_OYA_ENDGAME_PUSH_ENABLE = _geti("AKAGI_OYA_ENDGAME_PUSH_ENABLE", 1)
-AKAGI_OYA_ENDGAME_JUNME = _geti("AKAGI_OYA_ENDGAME_JUNME", 11)
-AKAGI_OYA_ENDGAME_ALLOW_SHANTEN2 = _geti("AKAGI_OYA_ENDGAME_ALLOW_SHANTEN2", 1)
-AKAGI_OYA_ENDGAME_MIN_ANPAI = _geti("AKAGI_OYA_ENDGAME_MIN_ANPAI", 1)
-AKAGI_OYA_ENDGAME_ALLOW_CHI_PON = _geti("AKAGI_OYA_ENDGAME_ALLOW_CHI_PON", 1)
-
-# --- Anti-Last (no KAN paths at all) ---
-AKAGI_ANTI_LAST_ENABLE = _geti("AKAGI_ANTI_LAST_ENABLE", 1)
-AKAGI_ANTI_LAST_JUNME = _geti("AKAGI_ANTI_LAST_JUNME", 12)
-AKAGI_ANTI_LAST_GAP_MIN = _geti("AKAGI_ANTI_LAST_GAP_MIN", 5000)
-AKAGI_ANTI_LAST_AT_RISK_LEAD = _geti("AKAGI_ANTI_LAST_AT_RISK_LEAD", 3000)
-AKAGI_ANTI_LAST_ALLOW_REACH = _geti("AKAGI_ANTI_LAST_ALLOW_REACH", 1)
-AKAGI_ANTI_LAST_ALLOW_CHI_PON = _geti("AKAGI_ANTI_LAST_ALLOW_CHI_PON", 1)
-AKAGI_ANTI_LAST_ALLOW_CHILD_SHANTEN2 = _geti("AKAGI_ANTI_LAST_ALLOW_CHILD_SHANTEN2", 1)
-
-# --- Score policy ---
-AKAGI_SCOREPOLICY_ENABLE = _geti("AKAGI_SCOREPOLICY_ENABLE", 1)
-AKAGI_TOP_EXTRA_ANPAI = _geti("AKAGI_TOP_EXTRA_ANPAI", 1)
-AKAGI_TOP_NAKI_SHANTEN_MAX = _geti("AKAGI_TOP_NAKI_SHANTEN_MAX", 1)
-AKAGI_LAST_ALLOW_SHANTEN2 = _geti("AKAGI_LAST_ALLOW_SHANTEN2", 1)
-AKAGI_NEAR_GAP_SMALL = _geti("AKAGI_NEAR_GAP_SMALL", 2000)
-
-# --- Riichi gate ---
-RIICHI_BASE_RISK = _getf("AKAGI_RIICHI_BASE_RISK", 0.10)
-RIICHI_DEALER_BONUS = _getf("AKAGI_RIICHI_DEALER_BONUS", 0.22)
-RIICHI_THREAT_PENALTY = _getf("AKAGI_RIICHI_THREAT_PENALTY", 0.32)
-RIICHI_PLACE_PENALTY = _getf("AKAGI_RIICHI_PLACE_PENALTY", 0.45)
-
-# --- Placement utility ---
-U1 = _getf("AKAGI_UTILITY_1ST", 30.0)
-U2 = _getf("AKAGI_UTILITY_2ND", 10.0)
-U3 = _getf("AKAGI_UTILITY_3RD", -15.0)
-U4 = _getf("AKAGI_UTILITY_4TH", -40.0)
-
-# --- Dora aggression ---
-AKAGI_MYDORA_RISK_PER_TILE = _getf("AKAGI_MYDORA_RISK_PER_TILE", 0.08)
-AKAGI_MYDORA_MAX_RISK_BONUS = _getf("AKAGI_MYDORA_MAX_RISK_BONUS", 0.22)
-
-# --- Somete (self) relax switches ---
-AKAGI_SOMETE_ENABLE = _geti("AKAGI_SOMETE_ENABLE", 1)
-AKAGI_SOMETE_RATIO = _getf("AKAGI_SOMETE_RATIO", 0.80)
-AKAGI_SOMETE_SHANTEN_MAX = _geti("AKAGI_SOMETE_SHANTEN_MAX", 3)
-AKAGI_SOMETE_SAFETY_RELAX = _geti("AKAGI_SOMETE_SAFETY_RELAX", 1)
-
-# --- Somete CARE (opponent) switches ---
-AKAGI_SOMETE_CARE_ENABLE = _geti("AKAGI_SOMETE_CARE_ENABLE", 1)
-AKAGI_SOMETE_CARE_THREAT_GATE = _getf("AKAGI_SOMETE_CARE_THREAT_GATE", 0.50)
-AKAGI_SOMETE_CARE_OTHER_SUIT_DISCARDS = _geti("AKAGI_SOMETE_CARE_OTHER_SUIT_DISCARDS", 6)
-AKAGI_SOMETE_CARE_TARGET_SUIT_MAX = _geti("AKAGI_SOMETE_CARE_TARGET_SUIT_MAX", 1)
-
-# --- Oya yakuhai force-pon ---
-AKAGI_OYA_YAKUHAI_FORCE_PON = _geti("AKAGI_OYA_YAKUHAI_FORCE_PON", 1)
-
-# --- Naki progress override (取りこぼし救済) ---
-AKAGI_NAKI_PROGRESS_OVERRIDE_ENABLE = _geti("AKAGI_NAKI_PROGRESS_OVERRIDE_ENABLE", 1)
-AKAGI_NAKI_PROGRESS_MAX_JUNME = _geti("AKAGI_NAKI_PROGRESS_MAX_JUNME", 12)
-AKAGI_NAKI_PROGRESS_THREAT_MAX = _getf("AKAGI_NAKI_PROGRESS_THREAT_MAX", 0.70)
-
-# --- Somete progress override (自分の染め手で“鳴けば前進”を救う) ---
-AKAGI_SOMETE_PROGRESS_OVERRIDE_ENABLE = _geti("AKAGI_SOMETE_PROGRESS_OVERRIDE_ENABLE", 1)
-AKAGI_SOMETE_PROGRESS_MAX_JUNME = _geti("AKAGI_SOMETE_PROGRESS_MAX_JUNME", 12)
-AKAGI_SOMETE_PROGRESS_THREAT_MAX = _getf("AKAGI_SOMETE_PROGRESS_THREAT_MAX", 0.60)
-AKAGI_SOMETE_PROGRESS_RELAX_ANPAI = _geti("AKAGI_SOMETE_PROGRESS_RELAX_ANPAI", 1)
-
-# --- Naki Chain (連鎖鳴き) overrides ---
-AKAGI_NAKI_CHAIN_ENABLE = _geti("AKAGI_NAKI_CHAIN_ENABLE", 1)
-AKAGI_NAKI_CHAIN_MAX = _geti("AKAGI_NAKI_CHAIN_MAX", 2)
-AKAGI_NAKI_CHAIN_WINDOW_JUNME = _geti("AKAGI_NAKI_CHAIN_WINDOW_JUNME", 2)
-AKAGI_NAKI_CHAIN_THREAT_MAX = _getf("AKAGI_NAKI_CHAIN_THREAT_MAX", 0.65)
-AKAGI_NAKI_CHAIN_RELAX_ANPAI = _geti("AKAGI_NAKI_CHAIN_RELAX_ANPAI", 1)
-
-# --- KAN policy switches ---
-AKAGI_KAN_ENABLE = _geti("AKAGI_KAN_ENABLE", 1)
-AKAGI_ANKAN_ENABLE     = _geti("AKAGI_ANKAN_ENABLE", 1)
-AKAGI_KAKAN_ENABLE     = _geti("AKAGI_KAKAN_ENABLE", 1)
-AKAGI_DAIMINKAN_ENABLE = _geti("AKAGI_DAIMINKAN_ENABLE", 0)
-AKAGI_KAN_THREAT_MAX        = _getf("AKAGI_KAN_THREAT_MAX", 0.50)
-AKAGI_KAN_LATE_JUNME_BLOCK  = _geti("AKAGI_KAN_LATE_JUNME_BLOCK", 12)
-AKAGI_KAN_MIN_ANPAI_VS_RIICHI = _geti("AKAGI_KAN_MIN_ANPAI_VS_RIICHI", 2)
-AKAGI_KAN_ALLOW_IF_ANTI_LAST   = _geti("AKAGI_KAN_ALLOW_IF_ANTI_LAST", 1)
-AKAGI_KAN_ALLOW_IF_SOMETE      = _geti("AKAGI_KAN_ALLOW_IF_SOMETE", 1)
-AKAGI_KAN_ALLOW_IF_NEED_BIG    = _geti("AKAGI_KAN_ALLOW_IF_NEED_BIG", 1)
-AKAGI_ANKAN_MIN_SHANTEN   = _geti("AKAGI_ANKAN_MIN_SHANTEN", 1)
-AKAGI_KAKAN_REQUIRE_TENPAI = _geti("AKAGI_KAKAN_REQUIRE_TENPAI", 1)
-AKAGI_KAKAN_MIN_SHAPE_GOOD = _getf("AKAGI_KAKAN_MIN_SHAPE_GOOD", 0.60)
-AKAGI_DMK_EARLY_JUNME     = _geti("AKAGI_DMK_EARLY_JUNME", 6)
-
-# --- OYA-TENPAI 強化用 knobs（追加） ---
-AKAGI_OYA_TENPAI_FORCE_ENABLE = _geti("AKAGI_OYA_TENPAI_FORCE_ENABLE", 1)
-AKAGI_OYA_TENPAI_FORCE_THREAT = _getf("AKAGI_OYA_TENPAI_FORCE_THREAT", 0.55)
-AKAGI_OYA_TENPAI_FORCE_GAIN   = _getf("AKAGI_OYA_TENPAI_FORCE_GAIN", 0.0)  # 受け入れ増などの閾値補助（0で無効）
+# ---- Tuning knobs ----
+# AKAGI_* の値は settings/tunables.py の Tunables に集約（tunables.json + 環境変数、ホットリロード対応）
 
 
 # Coordinates here is on the resolution of 16x9
@@ -195,6 +62,12 @@ LOCATION = {
     ],
 }
 
+def location_points() -> list[tuple[float, float]]:
+    """LOCATION の全クリック座標（ツモ牌位置を含む）。controller の座標キャッシュの事前計算用"""
+    points = list(LOCATION["tiles"]) + list(LOCATION["actions"]) + list(LOCATION["candidates"])
+    points += [(x + LOCATION["tsumo_space"], y) for x, y in LOCATION["tiles"]]
+    return points
+
 # Priority of actions
 ACTION_PIORITY = [
     0,  # none
@@ -244,9 +117,32 @@ def sigmoid(x: float) -> float:
         return 0.0 if x < 0 else 1.0
 
 
+def _per_decision(fn):
+    """
+    引数なしヘルパーの結果を act() 1回分だけメモ化する。
+    act() の外（_decision_cache が None）では毎回計算する。
+    """
+    key = fn.__name__
+
+    @wraps(fn)
+    def wrapper(self):
+        cache = self._decision_cache
+        if cache is None:
+            return fn(self)
+        if key not in cache:
+            cache[key] = fn(self)
+        return cache[key]
+    return wrapper
+
+
 class AutoPlayMajsoul(object):
-    def __init__(self):
+    def __init__(self, tunables: TunablesStore = tunables_store):
         self.bot: AkagiBot = None
+        # 判断ごとに tunables.get() で最新のスナップショットに差し替える
+        self._tunables = tunables
+        self._cfg: Tunables = tunables.get()
+        # 上流遅延を差し引いてクリック待ちを決める
+        self._timing = TimingPlanner(self._cfg)
         # 親番フラグ／「この局の最初の自分の打牌が終わったか」フラグ
         self._is_oya: bool = False
         self._first_discard_done: bool = True
@@ -263,90 +159,47 @@ class AutoPlayMajsoul(object):
         self._naki_chain_anchor_junme: int | None = None
         self._naki_chain_count: int = 0
 
-        # === 新規学習系・推定器の内部キャッシュ ===
-        self._ev_cache = {}
-        self._opp_cache = {}
+        # === 判断1回分の派生値キャッシュ（act() 内でのみ有効）===
+        self._decision_cache: dict | None = None
 
     # ---- helpers: 状態参照 ----
+    # AkagiBot が react() ごとに作る TableSnapshot を直接読む
+    @property
+    def _snap(self) -> TableSnapshot:
+        return self.bot.snapshot
+
     def _is_oya_now(self) -> bool:
-        try:
-            dealer = getattr(self.bot, "_AkagiBot__dealer", None)
-            myid   = getattr(self.bot, "player_id", None)
-            return dealer is not None and myid is not None and int(dealer) == int(myid)
-        except Exception:
-            return False
+        return self._snap.is_oya
 
     def _is_my_first_discard_this_hand(self) -> bool:
-        try:
-            rivers = getattr(self.bot, "_AkagiBot__rivers", None)
-            myid   = getattr(self.bot, "player_id", None)
-            if not isinstance(rivers, dict) or myid is None:
-                return False
-            my_river = rivers.get(myid, [])
-            return len(my_river) == 0
-        except Exception:
+        snap = self._snap
+        if snap.player_id is None:
             return False
+        return len(snap.rivers.get(snap.player_id, ())) == 0
 
-    def _rivers(self):
-        try:
-            rivers = getattr(self.bot, "_AkagiBot__rivers", None)
-            if isinstance(rivers, dict):
-                return rivers
-        except Exception:
-            pass
-        return {}
+    def _rivers(self) -> Mapping[int, tuple[str, ...]]:
+        return self._snap.rivers
 
-    def _furos(self):
-        try:
-            furos = getattr(self.bot, "_AkagiBot__furos", None)
-            if isinstance(furos, dict):
-                return furos
-        except Exception:
-            pass
-        return {}
+    def _furos(self) -> Mapping[int, tuple[tuple[str, ...], ...]]:
+        return self._snap.furos
 
     def _junme(self) -> int | None:
-        for cand in ["junme", "_AkagiBot__junme", "kyoku_junme"]:
-            if hasattr(self.bot, cand):
-                try:
-                    return int(getattr(self.bot, cand))
-                except Exception:
-                    pass
-        return None
+        return self._snap.junme
 
     def _riichi_seat_ids(self) -> list[int]:
-        try:
-            for cand in ["players_riichi", "_AkagiBot__players_riichi", "riichi_players"]:
-                if hasattr(self.bot, cand):
-                    d = getattr(self.bot, cand)
-                    if isinstance(d, dict):
-                        return [int(k) for k, v in d.items() if v]
-            for cand in ["riichi_list", "_AkagiBot__riichi_list"]:
-                if hasattr(self.bot, cand):
-                    lst = getattr(self.bot, cand)
-                    if isinstance(lst, (list, tuple)):
-                        return [int(x) for x in lst]
-        except Exception:
-            pass
-        return []
+        """自分以外のリーチ者"""
+        return self._snap.opponent_riichi_seats
 
     def _scores(self) -> list[int] | None:
-        for cand in ["scores", "_AkagiBot__scores", "player_scores"]:
-            if hasattr(self.bot, cand):
-                s = getattr(self.bot, cand)
-                if isinstance(s, (list, tuple)) and len(s) >= 4:
-                    try:
-                        return [int(x) for x in s[:4]]
-                    except Exception:
-                        pass
-        return None
+        scores = self._snap.scores
+        if len(scores) < 4:
+            return None
+        return list(scores[:4])
 
     def _my_seat(self) -> int | None:
-        try:
-            return int(getattr(self.bot, "player_id", None))
-        except Exception:
-            return None
+        return self._snap.player_id
 
+    @_per_decision
     def _rank_and_gaps(self):
         """
         自分の現在順位と、3位との差/4位との差（自分が3位なら下へのリード、4位なら上へのビハインド）。
@@ -405,12 +258,13 @@ class AutoPlayMajsoul(object):
     def _is_genbutsu_to(self, seat_id: int, pai: str) -> bool:
         try:
             norm = self._normalize_pai(pai)
-            r = self._rivers().get(se_id := seat_id, [])
+            r = self._rivers().get(seat_id, ())
             rn = [self._normalize_pai(x) for x in r]
             return norm in rn
         except Exception:
             return False
 
+    @_per_decision
     def _get_shanten_safe(self) -> int | None:
         try:
             if hasattr(self.bot, "shanten"):
@@ -436,27 +290,18 @@ class AutoPlayMajsoul(object):
         i = order.index(tile)
         return order[(i+1) % len(order)]
 
+    @_per_decision
     def _current_dora_tiles(self) -> set[str]:
         dora_tiles = set()
-        try:
-            indicators = None
-            for cand in ["dora_indicators", "dora_indicator", "dora_list", "_AkagiBot__dora_indicators"]:
-                if hasattr(self.bot, cand):
-                    indicators = getattr(self.bot, cand)
-                    break
-            if not indicators:
-                return dora_tiles
-
-            for ind in indicators:
-                t = self._normalize_pai(ind)
-                if t in ("E","S","W","N","P","F","C"):
-                    dora_tiles.add(self._next_honor(t))
-                elif len(t) == 2 and t[1] in ("m","p","s"):
-                    dora_tiles.add(self._next_suit_tile(t))
-        except Exception:
-            pass
+        for ind in self._snap.dora_indicators:
+            t = self._normalize_pai(ind)
+            if t in ("E","S","W","N","P","F","C"):
+                dora_tiles.add(self._next_honor(t))
+            elif len(t) == 2 and t[1] in ("m","p","s"):
+                dora_tiles.add(self._next_suit_tile(t))
         return dora_tiles
 
+    @_per_decision
     def _my_dora_count(self) -> int:
         try:
             hand = list(getattr(self.bot, "tehai_mjai", []))
@@ -471,6 +316,7 @@ class AutoPlayMajsoul(object):
             return 0
 
     # --- hand badness ---
+    @_per_decision
     def _badness_score(self) -> int:
         try:
             hand = list(getattr(self.bot, "tehai_mjai", []))
@@ -505,56 +351,42 @@ class AutoPlayMajsoul(object):
             return 0
 
     # --- oya endgame push? ---
+    @_per_decision
     def _oya_endgame_push_active(self) -> bool:
-        if not AKAGI_OYA_ENDGAME_PUSH_ENABLE:
+        if not self._cfg.oya_endgame_push_enable:
             return False
         if not self._is_oya:
             return False
         junme = self._junme()
         if junme is None:
             return False
-        return junme >= AKAGI_OYA_ENDGAME_JUNME
+        return junme >= self._cfg.oya_endgame_junme
 
     # --- anti-last active? ---
+    @_per_decision
     def _anti_last_active(self) -> bool:
-        if not AKAGI_ANTI_LAST_ENABLE:
+        if not self._cfg.anti_last_enable:
             return False
         junme = self._junme()
         if junme is None:
             junme_ok = False
         else:
-            junme_ok = junme >= AKAGI_ANTI_LAST_JUNME
+            junme_ok = junme >= self._cfg.anti_last_junme
         if self._is_all_last_like():
             junme_ok = True
 
         rank, gap_to_third, lead_over_4th = self._rank_and_gaps()
         if rank is None:
             return False
-        if rank == 4 and (gap_to_third is not None and gap_to_third >= AKAGI_ANTI_LAST_GAP_MIN) and junme_ok:
+        if rank == 4 and (gap_to_third is not None and gap_to_third >= self._cfg.anti_last_gap_min) and junme_ok:
             return True
-        if rank == 3 and (lead_over_4th is not None and lead_over_4th <= AKAGI_ANTI_LAST_AT_RISK_LEAD) and junme_ok:
+        if rank == 3 and (lead_over_4th is not None and lead_over_4th <= self._cfg.anti_last_at_risk_lead) and junme_ok:
             return True
         return False
 
     # --- my wind ---
     def _my_jikaze(self) -> str | None:
-        try:
-            for cand in ["jikaze", "seat_wind", "my_wind", "_AkagiBot__jikaze", "_AkagiBot__seat_wind"]:
-                if hasattr(self.bot, cand):
-                    v = getattr(self.bot, cand)
-                    if isinstance(v, str) and v in ("E","S","W","N"):
-                        return v
-            for cand in ["players_wind", "player_winds", "_AkagiBot__players_wind"]:
-                if hasattr(self.bot, cand):
-                    d = getattr(self.bot, cand)
-                    me = self._my_seat()
-                    if isinstance(d, dict) and me is not None:
-                        v = d.get(me)
-                        if isinstance(v, str) and v in ("E","S","W","N"):
-                            return v
-        except Exception:
-            pass
-        return None
+        return self._snap.seat_wind
 
     # --- yakuhai? ---
     def _is_yakuhai_tile(self, pai: str) -> bool:
@@ -570,11 +402,12 @@ class AutoPlayMajsoul(object):
         return False
 
     # ---- Somete判定（清一・混一の狙い目）----
+    @_per_decision
     def _is染め手_like(self) -> bool:
         """
         自分の手牌が染め手寄りかの簡易判定
         """
-        if not AKAGI_SOMETE_ENABLE:
+        if not self._cfg.somete_enable:
             return False
         try:
             hand = list(getattr(self.bot, "tehai_mjai", []))
@@ -588,7 +421,7 @@ class AutoPlayMajsoul(object):
             most_suit = max(set(suits), key=suits.count)
             suited = [s for s in suits if s == most_suit]
             ratio = float(len(suited) + len(honors)) / float(len(hand))
-            return ratio >= AKAGI_SOMETE_RATIO
+            return ratio >= self._cfg.somete_ratio
         except Exception:
             return False
 
@@ -620,13 +453,14 @@ class AutoPlayMajsoul(object):
                     if s: furo_suits.append(s)
             furo_bias = furo_suits and (max(set(furo_suits), key=furo_suits.count) == min_suit)
 
-            if other_discards >= AKAGI_SOMETE_CARE_OTHER_SUIT_DISCARDS and min_discards <= AKAGI_SOMETE_CARE_TARGET_SUIT_MAX:
+            if other_discards >= self._cfg.somete_care_other_suit_discards and min_discards <= self._cfg.somete_care_target_suit_max:
                 if furo_bias or self._junme() and self._junme() >= 6:
                     return min_suit
         except Exception as _e:
             logger.debug(f"[SOMETE-CARE] detect error for seat {seat_id}: {_e}")
         return None
 
+    @_per_decision
     def _detect_somete_danger_suits(self) -> set[str]:
         danger = set()
         try:
@@ -642,12 +476,12 @@ class AutoPlayMajsoul(object):
 
     # --- update fold mode ---
     def _update_fold_mode(self, mjai_msg: dict):
-        if not AKAGI_FOLD_ENABLE:
+        if not self._cfg.fold_enable:
             self._fold_mode = False
         if mjai_msg.get("type") == "start_kyoku":
             self._capture_round_info_from_start(mjai_msg)
 
-        if AKAGI_FOLD_FORCE_ON_RIICHI and self._riichi_seat_ids():
+        if self._cfg.fold_force_on_riichi and self._riichi_seat_ids():
             if not self._fold_locked_by_riichi:
                 logger.debug("[FOLD] lock by riichi")
             self._fold_locked_by_riichi = True
@@ -658,19 +492,19 @@ class AutoPlayMajsoul(object):
 
         try:
             if (shanten is not None) and (junme is not None):
-                bad_opening = (shanten >= AKAGI_FOLD_SHANTEN_THRESH and badness >= AKAGI_FOLD_BADNESS_SCORE_THRESH)
+                bad_opening = (shanten >= self._cfg.fold_shanten_thresh and badness >= self._cfg.fold_badness_score_thresh)
 
                 myd = self._my_dora_count()
                 if myd >= 2:
-                    if junme <= AKAGI_FOLD_EARLY_JUNME:
+                    if junme <= self._cfg.fold_early_junme:
                         bad_opening = False
 
-                if bad_opening and junme <= AKAGI_FOLD_EARLY_JUNME:
+                if bad_opening and junme <= self._cfg.fold_early_junme:
                     if not self._fold_mode:
                         logger.debug(f"[FOLD] enter (opening bad) shanten={shanten}, badness={badness}, junme={junme}")
                     self._fold_mode = True
 
-                if (shanten <= AKAGI_FOLD_RELEASE_SHANTEN) or (myd >= 2):
+                if (shanten <= self._cfg.fold_release_shanten) or (myd >= 2):
                     if not self._fold_locked_by_riichi:
                         if self._fold_mode:
                             logger.debug(f"[FOLD] release (improved/myd) shanten={shanten}, junme={junme}, myd={myd}")
@@ -688,7 +522,7 @@ class AutoPlayMajsoul(object):
 
     # ---- naki for tempai (with S3 non-dealer guard + somete relax) ----
     def _should_accept_naki_for_tenpai(self, naki_type: str) -> bool:
-        if not AKAGI_TENPAI_BIAS_ENABLE:
+        if not self._cfg.tenpai_bias_enable:
             return True
         if naki_type not in ("chi", "pon"):
             return True  # KANは別途ポリシー
@@ -709,26 +543,26 @@ class AutoPlayMajsoul(object):
 
         # --- 染め手なら緩和（速度優先） ---
         if self._is染め手_like():
-            if shanten <= AKAGI_SOMETE_SHANTEN_MAX:
+            if shanten <= self._cfg.somete_shanten_max:
                 return True
 
         # ラス回避・親終盤の特例
-        if self._anti_last_active() and AKAGI_ANTI_LAST_ALLOW_CHILD_SHANTEN2:
+        if self._anti_last_active() and self._cfg.anti_last_allow_child_shanten2:
             if shanten <= 2:
                 return True
-        if self._oya_endgame_push_active() and AKAGI_OYA_ENDGAME_ALLOW_SHANTEN2:
+        if self._oya_endgame_push_active() and self._cfg.oya_endgame_allow_shanten2:
             if shanten <= 2:
                 return True
 
         # 点数状況補正
-        if AKAGI_SCOREPOLICY_ENABLE:
+        if self._cfg.scorepolicy_enable:
             rank, gap_to_third, lead_over_4th = self._rank_and_gaps()
             if rank == 1:
-                return shanten <= AKAGI_TOP_NAKI_SHANTEN_MAX
+                return shanten <= self._cfg.top_naki_shanten_max
             elif rank == 4:
-                if AKAGI_LAST_ALLOW_SHANTEN2 and shanten <= 2:
+                if self._cfg.last_allow_shanten2 and shanten <= 2:
                     return True
-            elif rank == 3 and lead_over_4th is not None and lead_over_4th <= AKAGI_NEAR_GAP_SMALL:
+            elif rank == 3 and lead_over_4th is not None and lead_over_4th <= self._cfg.near_gap_small:
                 if shanten <= 2:
                     return True
 
@@ -746,13 +580,13 @@ class AutoPlayMajsoul(object):
             return shanten == 1
         if shanten == 1:
             return True
-        if shanten == 2 and AKAGI_TENPAI_BIAS_OYA_SHANTEN2:
+        if shanten == 2 and self._cfg.tenpai_bias_oya_shanten2:
             return True
         return False
 
     # ---- naki safety (simple + somete relax) ----
     def _naki_safety_ok(self, mjai_msg: dict) -> bool:
-        if not AKAGI_NAKI_SAFETY_ENABLE:
+        if not self._cfg.naki_safety_enable:
             return True
         try:
             ntype = mjai_msg.get("type", "")
@@ -760,14 +594,14 @@ class AutoPlayMajsoul(object):
             riichi_ids = self._riichi_seat_ids()
             junme = self._junme()
 
-            min_anpai = AKAGI_NAKI_SAFETY_MIN_ANPAI
+            min_anpai = self._cfg.naki_safety_min_anpai
 
             # 親終盤 or Anti-Last はやや緩和
             if (self._oya_endgame_push_active()) or (self._anti_last_active()):
-                min_anpai = min(min_anpai, AKAGI_OYA_ENDGAME_MIN_ANPAI)
+                min_anpai = min(min_anpai, self._cfg.oya_endgame_min_anpai)
 
             # 染め手なら安牌要求を少し緩和
-            if self._is染め手_like() and AKAGI_SOMETE_SAFETY_RELAX:
+            if self._is染め手_like() and self._cfg.somete_safety_relax:
                 min_anpai = max(0, min_anpai - 1)
 
             # 1) リーチ者がいる場合、鳴き牌は「誰かの現物」であること（any）
@@ -778,7 +612,7 @@ class AutoPlayMajsoul(object):
                     return False
 
             # 2) 終盤×安牌ストック＋候補危険度
-            if junme is not None and junme >= AKAGI_NAKI_SAFETY_JUNME_TIGHT:
+            if junme is not None and junme >= self._cfg.naki_safety_junme_tight:
                 anpai_cnt = self._count_anpai_against_riichi()
                 dang = self.tile_danger(pai)
                 if anpai_cnt < min_anpai and ntype in ("chi", "pon"):
@@ -795,6 +629,7 @@ class AutoPlayMajsoul(object):
 
         return True
 
+    @_per_decision
     def _count_anpai_against_riichi(self) -> int:
         try:
             riichi_ids = self._riichi_seat_ids()
@@ -817,21 +652,19 @@ class AutoPlayMajsoul(object):
             return 0
 
     # ===== Riichi/Dama/Fold gate =====
+    @_per_decision
     def _threat_level(self) -> float:
         try:
             riichi_n = len(self._riichi_seat_ids())
             junme = self._junme() or 0
-            melds_total = 0
-            if hasattr(self.bot, "_AkagiBot__furos"):
-                furos = getattr(self.bot, "_AkagiBot__furos") or {}
-                for seat, arr in furos.items():
-                    if seat != self._my_seat():
-                        melds_total += len(arr or [])
+            me = self._my_seat()
+            melds_total = sum(len(arr) for seat, arr in self._furos().items() if seat != me)
             v = 0.7*min(1.0, riichi_n/2.0) + 0.25*min(1.0, melds_total/4.0) + 0.15*min(1.0, max(0, junme-8)/6.0)
             return clamp(v, 0.0, 1.0)
         except Exception:
             return 0.0
 
+    @_per_decision
     def _placement_pressure(self) -> float:
         try:
             rank, gap_to_third, lead_over_4th = self._rank_and_gaps()
@@ -841,7 +674,7 @@ class AutoPlayMajsoul(object):
             if rank == 4:
                 base = 0.6 + 0.3*sigmoid((6000 - (gap_to_third or 0))/2000.0)
             elif rank == 3:
-                base = 0.3 + 0.3*sigmoid(((AKAGI_NEAR_GAP_SMALL) - (lead_over_4th or 99999))/1500.0)
+                base = 0.3 + 0.3*sigmoid(((self._cfg.near_gap_small) - (lead_over_4th or 99999))/1500.0)
             elif rank == 2:
                 base = 0.2
             else:
@@ -851,20 +684,22 @@ class AutoPlayMajsoul(object):
         except Exception:
             return 0.3
 
+    @_per_decision
     def _risk_budget(self) -> float:
         try:
             base = (
-                RIICHI_BASE_RISK
-                + (RIICHI_DEALER_BONUS if self._is_oya else 0.0)
-                - RIICHI_THREAT_PENALTY*self._threat_level()
-                - RIICHI_PLACE_PENALTY*self._placement_pressure()
+                self._cfg.riichi_base_risk
+                + (self._cfg.riichi_dealer_bonus if self._is_oya else 0.0)
+                - self._cfg.riichi_threat_penalty*self._threat_level()
+                - self._cfg.riichi_place_penalty*self._placement_pressure()
             )
             myd = self._my_dora_count()
-            bonus = clamp(AKAGI_MYDORA_RISK_PER_TILE * float(myd), 0.0, AKAGI_MYDORA_MAX_RISK_BONUS)
+            bonus = clamp(self._cfg.mydora_risk_per_tile * float(myd), 0.0, self._cfg.mydora_max_risk_bonus)
             return clamp(base + bonus, -0.4, 0.8)
         except Exception:
             return 0.0
 
+    @_per_decision
     def _estimate_hand_value(self) -> float:
         try:
             if hasattr(self.bot, "expected_points"):
@@ -881,6 +716,7 @@ class AutoPlayMajsoul(object):
         except Exception:
             return 2200.0
 
+    @_per_decision
     def _good_shape_rate(self) -> float:
         """
         置換：受け入れ総数＋好形比を推定し、[0..1] の好形レートに射影
@@ -893,6 +729,7 @@ class AutoPlayMajsoul(object):
         except Exception:
             return 0.5
 
+    @_per_decision
     def _need_big_hand_for_rankup(self) -> bool:
         try:
             scores = self._scores()
@@ -1108,11 +945,11 @@ class AutoPlayMajsoul(object):
                     logger.debug(f"[SOMETE-PROG SAFETY] decline: need genbutsu vs riichi, pai={pai}")
                     return False
 
-            if junme is not None and junme >= AKAGI_NAKI_SAFETY_JUNME_TIGHT:
-                base_min = AKAGI_NAKI_SAFETY_MIN_ANPAI
-                if AKAGI_SOMETE_SAFETY_RELAX:
+            if junme is not None and junme >= self._cfg.naki_safety_junme_tight:
+                base_min = self._cfg.naki_safety_min_anpai
+                if self._cfg.somete_safety_relax:
                     base_min = max(0, base_min - 1)
-                if AKAGI_SOMETE_PROGRESS_RELAX_ANPAI:
+                if self._cfg.somete_progress_relax_anpai:
                     base_min = max(0, base_min - 1)
                 anpai_cnt = self._count_anpai_against_riichi()
                 if anpai_cnt < base_min:
@@ -1129,7 +966,7 @@ class AutoPlayMajsoul(object):
 
     # ---- 連鎖鳴きヘルパー ----
     def _start_naki_chain(self):
-        if not AKAGI_NAKI_CHAIN_ENABLE:
+        if not self._cfg.naki_chain_enable:
             return
         self._naki_chain_active = True
         self._naki_chain_count += 1
@@ -1144,17 +981,17 @@ class AutoPlayMajsoul(object):
             logger.debug("[NAKI-CHAIN] stop on discard")
 
     def _naki_chain_window_open(self) -> bool:
-        if not (AKAGI_NAKI_CHAIN_ENABLE and self._naki_chain_active):
+        if not (self._cfg.naki_chain_enable and self._naki_chain_active):
             return False
-        if self._naki_chain_count >= (1 + AKAGI_NAKI_CHAIN_MAX):
+        if self._naki_chain_count >= (1 + self._cfg.naki_chain_max):
             return False
         threat = self._threat_level()
-        if threat > AKAGI_NAKI_CHAIN_THREAT_MAX and not (self._anti_last_active() or self._oya_endgame_push_active()):
+        if threat > self._cfg.naki_chain_threat_max and not (self._anti_last_active() or self._oya_endgame_push_active()):
             return False
         try:
             j0 = self._naki_chain_anchor_junme or 0
             jn = self._junme() or j0
-            return (jn - j0) <= AKAGI_NAKI_CHAIN_WINDOW_JUNME
+            return (jn - j0) <= self._cfg.naki_chain_window_junme
         except Exception:
             return True
 
@@ -1173,11 +1010,11 @@ class AutoPlayMajsoul(object):
                     logger.debug(f"[NAKI-CHAIN SAFETY] need genbutsu vs riichi, pai={pai}")
                     return False
 
-            if junme is not None and junme >= AKAGI_NAKI_SAFETY_JUNME_TIGHT:
-                base_min = AKAGI_NAKI_SAFETY_MIN_ANPAI
-                if self._is染め手_like() and AKAGI_SOMETE_SAFETY_RELAX:
+            if junme is not None and junme >= self._cfg.naki_safety_junme_tight:
+                base_min = self._cfg.naki_safety_min_anpai
+                if self._is染め手_like() and self._cfg.somete_safety_relax:
                     base_min = max(0, base_min - 1)
-                if AKAGI_NAKI_CHAIN_RELAX_ANPAI:
+                if self._cfg.naki_chain_relax_anpai:
                     base_min = max(0, base_min - 1)
                 anpai_cnt = self._count_anpai_against_riichi()
                 if anpai_cnt < base_min:
@@ -1195,38 +1032,38 @@ class AutoPlayMajsoul(object):
     # ---- KAN policy ----
     def _kan_allowed(self, mjai_msg: dict) -> bool:
         try:
-            if not AKAGI_KAN_ENABLE:
+            if not self._cfg.kan_enable:
                 return False
 
             ktype = mjai_msg.get('type', '')
             if ktype not in ('ankan','kakan','daiminkan'):
                 return True
 
-            if ktype == 'ankan' and not AKAGI_ANKAN_ENABLE: return False
-            if ktype == 'kakan' and not AKAGI_KAKAN_ENABLE: return False
-            if ktype == 'daiminkan' and not AKAGI_DAIMINKAN_ENABLE: return False
+            if ktype == 'ankan' and not self._cfg.ankan_enable: return False
+            if ktype == 'kakan' and not self._cfg.kakan_enable: return False
+            if ktype == 'daiminkan' and not self._cfg.daiminkan_enable: return False
 
             threat = self._threat_level()
             junme  = self._junme() or 0
             riichi_ids = self._riichi_seat_ids()
 
-            strong_ok = (self._anti_last_active() and AKAGI_KAN_ALLOW_IF_ANTI_LAST) \
-                        or (self._is染め手_like() and AKAGI_KAN_ALLOW_IF_SOMETE) \
-                        or (self._need_big_hand_for_rankup() and AKAGI_KAN_ALLOW_IF_NEED_BIG)
+            strong_ok = (self._anti_last_active() and self._cfg.kan_allow_if_anti_last) \
+                        or (self._is染め手_like() and self._cfg.kan_allow_if_somete) \
+                        or (self._need_big_hand_for_rankup() and self._cfg.kan_allow_if_need_big)
 
-            if junme >= AKAGI_KAN_LATE_JUNME_BLOCK and not strong_ok:
+            if junme >= self._cfg.kan_late_junme_block and not strong_ok:
                 return False
-            if threat > AKAGI_KAN_THREAT_MAX and not strong_ok:
+            if threat > self._cfg.kan_threat_max and not strong_ok:
                 return False
 
             if riichi_ids:
-                if self._count_anpai_against_riichi() < AKAGI_KAN_MIN_ANPAI_VS_RIICHI:
+                if self._count_anpai_against_riichi() < self._cfg.kan_min_anpai_vs_riichi:
                     return False
 
             shanten = self._get_shanten_safe()
 
             if ktype == 'ankan':
-                if shanten is not None and shanten > AKAGI_ANKAN_MIN_SHANTEN:
+                if shanten is not None and shanten > self._cfg.ankan_min_shanten:
                     return False
                 if self._fold_mode:
                     return False
@@ -1235,19 +1072,19 @@ class AutoPlayMajsoul(object):
             if ktype == 'kakan':
                 if self._fold_mode:
                     return False
-                if AKAGI_KAKAN_REQUIRE_TENPAI:
+                if self._cfg.kakan_require_tenpai:
                     if shanten is None or shanten != 0:
                         return False
                 if len(riichi_ids) > 0:
                     return False
-                if self._good_shape_rate() < AKAGI_KAKAN_MIN_SHAPE_GOOD and not strong_ok:
+                if self._good_shape_rate() < self._cfg.kakan_min_shape_good and not strong_ok:
                     return False
                 return self.estimate_kan_ev_delta('kakan') > 0.0
 
             if ktype == 'daiminkan':
                 if self._fold_mode:
                     return False
-                if junme > AKAGI_DMK_EARLY_JUNME and not strong_ok:
+                if junme > self._cfg.dmk_early_junme and not strong_ok:
                     return False
                 if len(riichi_ids) > 0:
                     return False
@@ -1259,11 +1096,35 @@ class AutoPlayMajsoul(object):
             return False
 
     # ---------------- main ----------------
-    def act(self, mjai_msg: dict) -> list[Point]:
+    def act(self, mjai_msg: dict, received_at: float | None = None) -> list[Point]:
+        """
+        received_at: 判断のきっかけになった mjai メッセージの受信時刻（time.monotonic()）。
+        与えられれば、そこからの経過時間を最初のクリック前の待ちから差し引く。
+        """
         if mjai_msg is None:
             return []
-        logger.debug(f"Act: {mjai_msg}")
-        logger.debug(f"reach_accepted: {self.bot.self_riichi_accepted}")
+        t0 = time.perf_counter()
+        self._cfg = self._tunables.get()
+        self._timing.begin(self._cfg, received_at, self._hand_key())
+        self._decision_cache = {}
+        try:
+            return self._timing.fit(self._act(mjai_msg))
+        finally:
+            if DEBUG_ENABLED:
+                logger.debug(f"[ACT] decided in {(time.perf_counter() - t0) * 1000:.2f}ms (memo={len(self._decision_cache)})")
+            self._decision_cache = None
+
+    def _hand_key(self) -> tuple | None:
+        """局の識別子（タイミング集計の区切り）"""
+        if self.bot is None:
+            return None
+        snap = self._snap
+        return (snap.round_wind, snap.dealer, snap.honba)
+
+    def _act(self, mjai_msg: dict) -> list[Point]:
+        if DEBUG_ENABLED:
+            logger.debug(f"Act: {mjai_msg}")
+            logger.debug(f"reach_accepted: {self.bot.self_riichi_accepted}")
 
         # ---- 局開始イベントでフラグをリセット＆親判定 ----
         if mjai_msg.get("type") == "start_kyoku":
@@ -1286,22 +1147,21 @@ class AutoPlayMajsoul(object):
 
         # --- 打牌（自分の手番） ---
         if mjai_msg['type'] == 'dahai' and not self.bot.self_riichi_accepted:
-            wait = random.uniform(0.8, 1.0)
+            wait = self._timing.think_time()
 
             if not self.bot.last_kawa_tile:
                 wait = max(wait, 1.0)
                 try:
                     if self._is_oya_now() and self._is_my_first_discard_this_hand():
-                        extra = max(0.0, AKAGI_OYA_FIRST_DAHAI_EXTRA)
+                        extra = max(0.0, self._cfg.oya_first_dahai_extra)
                         wait += extra
                         logger.debug(f"[OYA-FIRST] extra wait applied: +{extra}s "
-                                    f"(dealer={getattr(self.bot, '_AkagiBot__dealer', None)}, "
-                                    f"me={getattr(self.bot, 'player_id', None)})")
+                                    f"(dealer={self._snap.dealer}, me={self._snap.player_id})")
                 except Exception as _e:
                     logger.debug(f"[OYA-FIRST] check skipped due to: {_e}")
 
             if self._is_oya and (not self._first_discard_done) and (not self.bot.last_kawa_tile):
-                wait += max(0.0, AKAGI_OYA_FIRST_DAHAI_EXTRA)
+                wait += max(0.0, self._cfg.oya_first_dahai_extra)
 
             return_points = [Point(-1, -1, wait)]
             return_points += self.click_dahai(mjai_msg)
@@ -1396,9 +1256,9 @@ class AutoPlayMajsoul(object):
             if (mjai_msg.get('type') == 'pon') and self._is_oya:
                 called_tile = mjai_msg.get('pai', '')
                 if self._is_yakuhai_tile(called_tile):
-                    if AKAGI_OYA_YAKUHAI_FORCE_PON or (not self._fold_mode):
+                    if self._cfg.oya_yakuhai_force_pon or (not self._fold_mode):
                         force_accept_naki = True
-                        logger.debug(f"[OYA-YAKUHAI] FORCE PON on {called_tile} (oya, force={AKAGI_OYA_YAKUHAI_FORCE_PON}, fold={self._fold_mode})")
+                        logger.debug(f"[OYA-YAKUHAI] FORCE PON on {called_tile} (oya, force={self._cfg.oya_yakuhai_force_pon}, fold={self._fold_mode})")
 
             # 鳴きは安全度→“できれば聴牌”の順で判定（＋EV比較）
             if mjai_msg.get('type') in naki_types:
@@ -1415,10 +1275,10 @@ class AutoPlayMajsoul(object):
                             junme = self._junme() or 0
                             threat = self._threat_level()
                             allow_progress = (
-                                AKAGI_NAKI_PROGRESS_OVERRIDE_ENABLE
+                                self._cfg.naki_progress_override_enable
                                 and self._naki_advances_hand(mjai_msg)
-                                and (junme <= AKAGI_NAKI_PROGRESS_MAX_JUNME)
-                                and (threat <= AKAGI_NAKI_PROGRESS_THREAT_MAX or self._anti_last_active() or self._oya_endgame_push_active())
+                                and (junme <= self._cfg.naki_progress_max_junme)
+                                and (threat <= self._cfg.naki_progress_threat_max or self._anti_last_active() or self._oya_endgame_push_active())
                             )
                             if allow_progress:
                                 logger.debug(f"[NAKI-PROGRESS] override accept {mjai_msg['type']} "
@@ -1431,7 +1291,7 @@ class AutoPlayMajsoul(object):
 
                 # --- 親テンパイ強制（yakuhai面子＋追加で0シャンテン見込） ---
                 try:
-                    if AKAGI_OYA_TENPAI_FORCE_ENABLE and self._is_oya and mjai_msg.get('type') in ('chi','pon') and mjai_msg.get('type') != 'none':
+                    if self._cfg.oya_tenpai_force_enable and self._is_oya and mjai_msg.get('type') in ('chi','pon') and mjai_msg.get('type') != 'none':
                         called = self._normalize_pai(mjai_msg.get('pai', ''))
                         sh = self._get_shanten_safe()
                         # 役牌面子が既にあるか（簡易：副露に役牌含む）
@@ -1442,7 +1302,7 @@ class AutoPlayMajsoul(object):
                                 has_yaku_meld = True
                                 break
                         threat = self._threat_level()
-                        if (sh is not None and sh == 1 and has_yaku_meld and threat <= AKAGI_OYA_TENPAI_FORCE_THREAT):
+                        if (sh is not None and sh == 1 and has_yaku_meld and threat <= self._cfg.oya_tenpai_force_threat):
                             logger.debug(f"[OYA-TENPAI] force accept naki (sh=1->0, threat={threat:.2f})")
                         # 実装は既に受け側に寄っているため、ここではログのみ（ブロックを通過させる）
                 except Exception as _e:
@@ -1451,7 +1311,7 @@ class AutoPlayMajsoul(object):
                 # --- 染め手・進行オーバーライド ---
                 try:
                     if (
-                        AKAGI_SOMETE_PROGRESS_OVERRIDE_ENABLE
+                        self._cfg.somete_progress_override_enable
                         and self._is染め手_like()
                         and mjai_msg.get('type') in ('chi','pon')
                         and mjai_msg.get('type') != 'none'
@@ -1468,7 +1328,7 @@ class AutoPlayMajsoul(object):
                                 if self._naki_advances_hand(mjai_msg):
                                     junme = self._junme() or 0
                                     threat = self._threat_level()
-                                    if (junme <= AKAGI_SOMETE_PROGRESS_MAX_JUNME) and (threat <= AKAGI_SOMETE_PROGRESS_THREAT_MAX or self._anti_last_active() or self._oya_endgame_push_active()):
+                                    if (junme <= self._cfg.somete_progress_max_junme) and (threat <= self._cfg.somete_progress_threat_max or self._anti_last_active() or self._oya_endgame_push_active()):
                                         if self._naki_safety_ok_somete_progress(mjai_msg):
                                             logger.debug(f"[SOMETE-PROGRESS] override ACCEPT {mjai_msg['type']} "
                                                          f"(suit={called_suit}, sh={self._get_shanten_safe()}, junme={junme}, threat={threat:.2f})")
@@ -1529,23 +1389,23 @@ class AutoPlayMajsoul(object):
 
         # 鳴きのときだけ pre-wait / none は短め
         if mjai_msg['type'] in {'chi','pon'}:
-            pre = max(0.0, NAKI_PREWAIT)
+            pre = max(0.0, self._cfg.naki_prewait)
             return_points.append(Point(-1, -1, pre))
         elif mjai_msg['type'] == 'none':
-            pre = max(0.0, NAKI_NONE_PREWAIT)
+            pre = max(0.0, self._cfg.naki_none_prewait)
             return_points.append(Point(-1, -1, pre))
 
         # 個別ウェイト
         if mjai_msg['type'] == 'reach':
-            btn_wait = AKAGI_REACH_WAIT
+            btn_wait = self._cfg.reach_wait
         elif mjai_msg['type'] == 'hora':
-            btn_wait = AKAGI_RON_WAIT
+            btn_wait = self._cfg.ron_wait
         elif mjai_msg['type'] == 'zimo':
-            btn_wait = AKAGI_TSUMO_WAIT
+            btn_wait = self._cfg.tsumo_wait
         elif mjai_msg['type'] == 'ryukyoku':
-            btn_wait = AKAGI_REACH_WAIT
+            btn_wait = self._cfg.reach_wait
         else:
-            btn_wait = max(0.0, NAKI_BUTTON_WAIT + random.uniform(-0.02, 0.02))
+            btn_wait = max(0.0, self._cfg.naki_button_wait + random.uniform(-0.02, 0.02))
 
         # 連鎖鳴きは押す直前で開始フラグ（chi/ponのみ）
         if mjai_msg['type'] in ('chi','pon'):
@@ -1557,7 +1417,7 @@ class AutoPlayMajsoul(object):
             LOCATION['actions'][target_idx][1],
             btn_wait
         ))
-        if NAKI_DOUBLE_CLICK:
+        if self._cfg.naki_double_click:
             return_points.append(Point(
                 LOCATION['actions'][target_idx][0],
                 LOCATION['actions'][target_idx][1],
@@ -1584,7 +1444,7 @@ class AutoPlayMajsoul(object):
             if mjai_msg['type'] == 'chi':
                 chi_candidates = sorted(self.bot.find_chi_consume_simple(), key=cmp_to_key(compare_tehai))
                 if len(chi_candidates) == 1:
-                    return_points.append(Point(-1, -1, max(0.0, NAKI_SINGLE_WAIT + random.uniform(-0.02, 0.02))))
+                    return_points.append(Point(-1, -1, max(0.0, self._cfg.naki_single_wait + random.uniform(-0.02, 0.02))))
                     return return_points
                 for idx, chi_candidate in enumerate(chi_candidates):
                     if consumed_pais_mjai == chi_candidate:
@@ -1592,21 +1452,21 @@ class AutoPlayMajsoul(object):
                         return_points.append(Point(
                             LOCATION['candidates'][candidate_idx][0],
                             LOCATION['candidates'][candidate_idx][1],
-                            max(0.0, NAKI_CAND_WAIT + random.uniform(-0.02, 0.02))
+                            max(0.0, self._cfg.naki_cand_wait + random.uniform(-0.02, 0.02))
                         ))
                         return return_points
                 mid_idx = int((-(len(chi_candidates)/2)+(len(chi_candidates)//2)+0.5)*2+5)
                 return_points.append(Point(
                     LOCATION['candidates'][mid_idx][0],
                     LOCATION['candidates'][mid_idx][1],
-                    max(0.0, NAKI_CAND_WAIT + random.uniform(-0.02, 0.02))
+                    max(0.0, self._cfg.naki_cand_wait + random.uniform(-0.02, 0.02))
                 ))
                 return return_points
 
             elif mjai_msg['type'] == 'pon':
                 pon_candidates = self.bot.find_pon_consume_simple()
                 if len(pon_candidates) == 1:
-                    return_points.append(Point(-1, -1, max(0.0, NAKI_SINGLE_WAIT + random.uniform(-0.02, 0.02))))
+                    return_points.append(Point(-1, -1, max(0.0, self._cfg.naki_single_wait + random.uniform(-0.02, 0.02))))
                     return return_points
                 def _norm(lst): return sorted(lst, key=cmp_to_key(compare_pai))
                 target_norm = _norm(consumed_pais_mjai)
@@ -1621,7 +1481,7 @@ class AutoPlayMajsoul(object):
                 return_points.append(Point(
                     LOCATION['candidates'][candidate_idx][0],
                     LOCATION['candidates'][candidate_idx][1],
-                    max(0.0, NAKI_CAND_WAIT + random.uniform(-0.02, 0.02))
+                    max(0.0, self._cfg.naki_cand_wait + random.uniform(-0.02, 0.02))
                 ))
                 return return_points
 
@@ -1669,12 +1529,12 @@ class AutoPlayMajsoul(object):
 
         # ===== 染め手ケア：必要なら打牌を安全寄りに置き換える =====
         try:
-            if AKAGI_SOMETE_CARE_ENABLE:
+            if self._cfg.somete_care_enable:
                 danger_suits = self._detect_somete_danger_suits()
                 if danger_suits:
                     orig_suit = self._suit_of(dahai)
                     threat = self._threat_level()
-                    need_care = self._fold_mode or (threat >= AKAGI_SOMETE_CARE_THREAT_GATE)
+                    need_care = self._fold_mode or (threat >= self._cfg.somete_care_threat_gate)
                     if need_care and orig_suit in danger_suits:
                         alt = self._choose_safer_tile_vs_somete(dahai, danger_suits, tehai)
                         if alt and alt != dahai:
@@ -0,0 +1,124 @@
+"""
+クリックのタイミング計画。
+
+AutoPlayMajsoul が返す Point 列の待ち時間は「考えている時間」の目標値。
+実際には WebSocket 受信 → bridge 解析 → 推論 → act() の時点で既に時間が経って
+いるので、その上流遅延を目標から差し引き、受信からクリックまでの合計が
+目標（と timing_max_response）に収まるようにする。
+
+差し引くのは最初の実クリックまで（= 考慮時間）の待ちだけで、その後の
+候補選択やダブルクリックの間隔は UI 操作なのでそのまま残す。
+
+局ごとに「意図的に待った時間」と「処理に掛かった時間」を集計してログに出す。
+"""
+from __future__ import annotations
+
+import random
+import time
+from dataclasses import dataclass
+
+from settings.tunables import Tunables
+from .logger import logger
+from .util import Point
+
+
+@dataclass
+class HandTiming:
+    decisions: int = 0
+    upstream: float = 0.0   # 受信 → act() 開始
+    decide: float = 0.0     # act() 内の判断
+    waited: float = 0.0     # Point に載せた待ち時間の合計
+    absorbed: float = 0.0   # 上流遅延で相殺した待ち時間
+    late: int = 0           # 目標を既に超えていた判断数
+
+    @property
+    def work(self) -> float:
+        return self.upstream + self.decide
+
+
+class TimingPlanner:
+    def __init__(self, cfg: Tunables):
+        self.cfg = cfg
+        self._received_at: float | None = None
+        self._started_at: float = 0.0
+        self._hand_key: tuple | None = None
+        self._hand = HandTiming()
+
+    def think_time(self) -> float:
+        """打牌の目標考慮時間（一様分布）"""
+        lo = max(0.0, self.cfg.dahai_think_min)
+        hi = max(lo, self.cfg.dahai_think_max)
+        return random.uniform(lo, hi)
+
+    def begin(self, cfg: Tunables, received_at: float | None, hand_key: tuple | None = None) -> None:
+        """act() の先頭で呼ぶ。received_at は time.monotonic() 基準の受信時刻"""
+        self.cfg = cfg
+        self._started_at = time.monotonic()
+        self._received_at = received_at
+        if hand_key != self._hand_key:
+            self.report()
+            self._hand_key = hand_key
+
+    def fit(self, points: list[Point]) -> list[Point]:
+        """上流遅延と判断時間を考慮時間から差し引く（points を直接書き換える）"""
+        now = time.monotonic()
+        decide = now - self._started_at
+        upstream = 0.0
+        if self._received_at is not None:
+            upstream = max(0.0, self._started_at - self._received_at)
+        elapsed = upstream + decide
+
+        if not points:
+            return points
+
+        # 最初の実クリックまでが考慮時間
+        think_end = next((i for i, p in enumerate(points) if p.x >= 0), len(points) - 1)
+        think = points[:think_end + 1]
+        target = sum(p.delay for p in think)
+
+        absorbed = 0.0
+        late = False
+        if self.cfg.timing_adaptive and self._received_at is not None:
+            min_wait = max(0.0, self.cfg.timing_min_wait)
+            # 受信から最初のクリックまでの目標合計
+            envelope = min(target, self.cfg.timing_max_response)
+            remaining = max(envelope - elapsed, min_wait)
+            late = elapsed >= envelope
+            # 先頭から順に削る
+            excess = max(0.0, target - remaining)
+            for p in think:
+                cut = min(p.delay, excess)
+                p.delay -= cut
+                excess -= cut
+                absorbed += cut
+            # 最初の実クリック直前には最低 min_wait を残す
+            if think[-1].delay < min_wait:
+                absorbed -= min_wait - think[-1].delay
+                think[-1].delay = min_wait
+
+        waited = sum(p.delay for p in points)
+        h = self._hand
+        h.decisions += 1
+        h.upstream += upstream
+        h.decide += decide
+        h.waited += waited
+        h.absorbed += max(0.0, absorbed)
+        h.late += int(late)
+        logger.debug(
+            f"[TIMING] upstream={upstream * 1000:.0f}ms decide={decide * 1000:.1f}ms "
+            f"target={target:.2f}s absorbed={absorbed:.2f}s waits={[round(p.delay, 3) for p in points]}"
+        )
+        return points
+
+    def report(self) -> None:
+        """直前の局の待ち／処理時間を出力してリセット"""
+        h = self._hand
+        if h.decisions:
+            total = h.work + h.waited
+            share = (h.waited / total * 100.0) if total > 0 else 0.0
+            logger.info(
+                f"[TIMING] hand={self._hand_key} decisions={h.decisions} "
+                f"work={h.work:.2f}s (upstream={h.upstream:.2f}s decide={h.decide:.2f}s) "
+                f"waited={h.waited:.2f}s ({share:.0f}%) absorbed={h.absorbed:.2f}s late={h.late}"
+            )
+        self._hand = HandTiming()
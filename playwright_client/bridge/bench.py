@@ -0,0 +1,213 @@
+"""
+Throughput benchmark for the Majsoul bridge over recorded frames.
+
+Loads every frames_*.bin.gz under a directory (see recorder.py) into memory,
+then for each parsing backend runs the whole corpus through
+
+    backend.parse(frame)            -> liqi dict   ("liqi" stage)
+    MajsoulBridge.parse_liqi(dict)  -> mjai events ("bridge" stage)
+
+and reports frames/sec and events/sec, broken down by message type
+(ActionDiscardTile, ActionDealTile, syncGame, lobby, ...), plus the
+tracemalloc high-water mark of a separate pass.
+
+    python bench_bridge.py logs/
+    python bench_bridge.py logs/ --backend liqi --backend mypkg.fastliqi:FastLiqi
+    python bench_bridge.py logs/ --save bench.json
+    python bench_bridge.py logs/ --baseline bench.json --max-regression 0.10
+
+A backend is "liqi" (LiqiProto) or "module:Class"; the class is constructed
+without arguments and must provide LiqiProto's parse(bytes) -> dict | None.
+The exit status is 1 when a backend's overall frames/sec falls below
+--min-fps or more than --max-regression under the --baseline file.
+"""
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+from .majsoul import MajsoulBridge
+from .majsoul.liqi import LiqiProto
+from .recorder import KIND_BINARY, KIND_OPEN, _recording_order, iter_frames
+
+
+def load_corpus(directory: Path) -> list[tuple[tuple[str, int], bytes | None]]:
+    """((run, stream), payload) の並び。payload=None は新しい WebSocket（bridge を作り直す）"""
+    corpus: list[tuple[tuple[str, int], bytes | None]] = []
+    files = sorted(directory.glob("frames_*.bin.gz"), key=_recording_order) if directory.is_dir() else [directory]
+    for path in files:
+        # stream id は 1 回の実行（frames_<stamp>_*）の中で通し番号
+        run = _recording_order(path)[0]
+        for frame in iter_frames(path):
+            if frame.kind == KIND_OPEN:
+                corpus.append(((run, frame.stream), None))
+            elif frame.kind == KIND_BINARY:
+                corpus.append(((run, frame.stream), frame.payload))
+    return corpus
+
+
+def message_type(msg: dict) -> str:
+    method = msg.get("method", "?")
+    if method == ".lq.ActionPrototype":
+        return msg.get("data", {}).get("name", "ActionPrototype")
+    if method.startswith(".lq.Lobby."):
+        return "lobby"
+    return method.rsplit(".", 1)[-1]
+
+
+def resolve_backend(spec: str) -> Callable[[], object]:
+    if spec == "liqi":
+        return LiqiProto
+    module, _, name = spec.partition(":")
+    return getattr(importlib.import_module(module), name or "LiqiProto")
+
+
+@dataclass
+class TypeStats:
+    frames: int = 0
+    events: int = 0
+    liqi_ns: int = 0
+    bridge_ns: int = 0
+
+    @property
+    def fps(self) -> float:
+        total = self.liqi_ns + self.bridge_ns
+        return self.frames / (total / 1e9) if total else 0.0
+
+    @property
+    def eps(self) -> float:
+        total = self.liqi_ns + self.bridge_ns
+        return self.events / (total / 1e9) if total else 0.0
+
+
+@dataclass
+class BackendResult:
+    name: str
+    total: TypeStats = field(default_factory=TypeStats)
+    by_type: dict[str, TypeStats] = field(default_factory=lambda: defaultdict(TypeStats))
+    failed: int = 0
+    peak_kb: float = 0.0
+
+    def to_json(self) -> dict:
+        return {
+            "fps": self.total.fps, "eps": self.total.eps, "frames": self.total.frames,
+            "failed": self.failed, "peak_kb": self.peak_kb,
+            "by_type": {k: {"frames": v.frames, "fps": v.fps} for k, v in self.by_type.items()},
+        }
+
+
+def run_backend(name: str, factory: Callable[[], object], corpus: list[tuple[tuple[str, int], bytes | None]]) -> BackendResult:
+    result = BackendResult(name)
+    bridges: dict[tuple[str, int], MajsoulBridge] = {}
+    clock = time.perf_counter_ns
+    for stream, payload in corpus:
+        bridge = bridges.get(stream)
+        if payload is None or bridge is None:
+            bridge = bridges[stream] = MajsoulBridge()
+            bridge.liqi_proto = factory()
+            if payload is None:
+                continue
+        t0 = clock()
+        msg = bridge.liqi_proto.parse(payload)
+        t1 = clock()
+        if msg is None:
+            result.failed += 1
+            continue
+        try:
+            events = bridge.parse_liqi(msg) or []
+        except Exception:
+            events = []
+            result.failed += 1
+        t2 = clock()
+        for stats in (result.total, result.by_type[message_type(msg)]):
+            stats.frames += 1
+            stats.events += len(events)
+            stats.liqi_ns += t1 - t0
+            stats.bridge_ns += t2 - t1
+    return result
+
+
+def measure_peak(factory: Callable[[], object], corpus: list[tuple[tuple[str, int], bytes | None]]) -> float:
+    """tracemalloc は遅いので計時とは別パスで最大使用量だけ取る（KB）"""
+    tracemalloc.start()
+    try:
+        run_backend("peak", factory, corpus)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def format_result(r: BackendResult, top: int) -> str:
+    t = r.total
+    lines = [f"[{r.name}] {t.frames} frames ({r.failed} failed), {t.events} events: "
+             f"{t.fps:,.0f} frames/s, {t.eps:,.0f} events/s, "
+             f"liqi {t.liqi_ns / 1e6:.1f}ms + bridge {t.bridge_ns / 1e6:.1f}ms, peak {r.peak_kb:,.0f} KB"]
+    rows = sorted(r.by_type.items(), key=lambda kv: kv[1].liqi_ns + kv[1].bridge_ns, reverse=True)[:top]
+    for kind, s in rows:
+        lines.append(f"  {kind:<28} n={s.frames:7d} {s.fps:12,.0f} f/s  "
+                     f"liqi {s.liqi_ns / max(1, s.frames) / 1e3:8.1f}us  bridge {s.bridge_ns / max(1, s.frames) / 1e3:8.1f}us")
+    return "\n".join(lines)
+
+
+def check(results: list[BackendResult], baseline: dict, max_regression: float, min_fps: float) -> list[str]:
+    problems = []
+    for r in results:
+        if min_fps and r.total.fps < min_fps:
+            problems.append(f"{r.name}: {r.total.fps:,.0f} frames/s < --min-fps {min_fps:,.0f}")
+        base = baseline.get(r.name, {}).get("fps")
+        if base and r.total.fps < base * (1 - max_regression):
+            problems.append(f"{r.name}: {r.total.fps:,.0f} frames/s is {(1 - r.total.fps / base) * 100:.1f}% "
+                            f"below baseline {base:,.0f}")
+    return problems
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark LiqiProto.parse + MajsoulBridge.parse_liqi on recorded frames.")
+    parser.add_argument("corpus", type=Path, help="directory of frames_*.bin.gz (or a single file)")
+    parser.add_argument("--backend", action="append", help='"liqi" or "module:Class" (repeatable, default: liqi)')
+    parser.add_argument("--repeat", type=int, default=3, help="timed passes per backend; the fastest is reported")
+    parser.add_argument("--top", type=int, default=12, help="message types to list per backend")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--save", type=Path, help="write results as JSON (use as a later --baseline)")
+    parser.add_argument("--baseline", type=Path, help="JSON from an earlier --save")
+    parser.add_argument("--max-regression", type=float, default=0.10, help="allowed frames/s drop vs baseline")
+    parser.add_argument("--min-fps", type=float, default=0.0, help="absolute frames/s floor")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    corpus = load_corpus(args.corpus)
+    frames = sum(1 for _, p in corpus if p is not None)
+    print(f"loaded {frames} frames from {args.corpus} in {time.perf_counter() - t0:.2f}s")
+    if not frames:
+        return 1
+
+    results = []
+    for spec in args.backend or ["liqi"]:
+        factory = resolve_backend(spec)
+        best = min((run_backend(spec, factory, corpus) for _ in range(max(1, args.repeat))),
+                   key=lambda r: r.total.liqi_ns + r.total.bridge_ns)
+        if not args.no_memory:
+            best.peak_kb = measure_peak(factory, corpus)
+        results.append(best)
+        print(format_result(best, args.top))
+
+    if args.save:
+        args.save.write_text(json.dumps({r.name: r.to_json() for r in results}, indent=2))
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else {}
+    problems = check(results, baseline, args.max_regression, args.min_fps)
+    for p in problems:
+        print(f"REGRESSION {p}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,13 @@
+import os
 from typing import Self
 from enum import Enum
 from functools import cmp_to_key
 from .liqi import LiqiProto, MsgType
 from ..bridge_base import BridgeBase
-from ..logger import logger
+from ..logger import logger, DEBUG_ENABLED
+
+# 解析済み liqi メッセージ（大きな dict）を debug に出す間隔。1=毎フレーム, N=N フレームに 1 回, 0=出さない
+LOG_FRAME_SAMPLE = int(os.getenv("AKAGI_LOG_FRAME_SAMPLE", "1"))
         
 MS_TILE_2_MJAI_TILE = {
     '0m': '5mr',
@@ -130,6 +134,12 @@ class MajsoulBridge(BridgeBase):
         self.score = -1
 
         self.is_3p = False
+        self.game_uuid = ""
+        # 解析した liqi メッセージの通知先（method, "Req"|"Res"|"Notify", data）。lobby 自動化の待ちとキャッシュに使う
+        self.on_method = None
+        # 終局結果（game_result dict）の通知先。NotifyGameEndResult から組み立てる
+        self.on_game_result = None
+        self.frame_count = 0
 
     def reset(self):
         super().__init__()
@@ -152,6 +162,7 @@ class MajsoulBridge(BridgeBase):
         self.score = -1
 
         self.is_3p = False
+        self.game_uuid = ""
 
 
     def parse(self, content: bytes) -> None | list[dict]:
@@ -164,9 +175,17 @@ class MajsoulBridge(BridgeBase):
             None | list[dict]: MJAI command.
         """
         liqi_message = self.liqi_proto.parse(content)
-        logger.debug(f"{liqi_message}")
+        self.frame_count += 1
+        if DEBUG_ENABLED and LOG_FRAME_SAMPLE > 0 and self.frame_count % LOG_FRAME_SAMPLE == 0:
+            logger.debug(f"{liqi_message}")
+        if liqi_message is not None and self.on_method is not None:
+            try:
+                self.on_method(liqi_message['method'], liqi_message['type'].name, liqi_message.get('data'))
+            except Exception:
+                pass
         ret = self.parse_liqi(liqi_message)
-        logger.debug(f"-> {ret}")
+        if DEBUG_ENABLED and ret:
+            logger.debug(f"-> {ret}")
         return ret
 
     def parse_liqi(self, liqi_message: dict) -> None | list[dict]:
@@ -201,6 +220,7 @@ class MajsoulBridge(BridgeBase):
         if liqi_message['method'] == '.lq.FastTest.authGame' and liqi_message['type'] == MsgType.Req:
             self.reset()
             self.accountId = liqi_message['data']['accountId']
+            self.game_uuid = liqi_message['data'].get('gameUuid', "")
             return ret
         if liqi_message['method'] == '.lq.FastTest.authGame' and liqi_message['type'] == MsgType.Res:
             self.is_3p = len(liqi_message['data']['seatList']) == 3
@@ -488,6 +508,13 @@ class MajsoulBridge(BridgeBase):
                         self.score = player['partPoint1']
             except:
                 pass
+            if liqi_message['method'] == '.lq.NotifyGameEndResult' and self.on_game_result is not None:
+                result = self.game_result(liqi_message['data'])
+                if result is not None:
+                    try:
+                        self.on_game_result(result)
+                    except Exception:
+                        logger.exception("on_game_result failed")
             ret.append(
                 {
                     'type': 'end_game'
@@ -497,6 +524,28 @@ class MajsoulBridge(BridgeBase):
         return ret
         
     
+    def game_result(self, data: dict) -> None | dict:
+        """NotifyGameEndResult の data から自席の結果を取り出す（players は順位順）"""
+        try:
+            players = data['result']['players']
+        except (KeyError, TypeError):
+            return None
+        for idx, player in enumerate(players):
+            if player.get('seat', 0) != self.seat:
+                continue
+            return {
+                'type': 'game_result',
+                'uuid': self.game_uuid,
+                'mode_id': self.mode_id,
+                'is_sanma': self.is_3p,
+                'seat': self.seat,
+                'rank': idx + 1,
+                'score': int(player.get('totalPoint', 0)),
+                'part_point': int(player.get('partPoint1', 0)),
+                'grading_delta': int(player.get('gradingScore', 0)),
+            }
+        return None
+
     def build(self, command: dict) -> None | bytes:
         pass
 
@@ -0,0 +1,159 @@
+"""
+Binary recorder for raw WebSocket frames.
+
+Instead of stringified liqi dicts in the debug log, the controller can write
+the frames themselves (AKAGI_FRAME_RECORD=1) to gzip files under ./logs:
+
+    frames_<YYYYmmdd_HHMMSS>_<n>.bin.gz
+
+Each record is a fixed header followed by the payload:
+
+    <d  time.time()
+    H   stream id (one per WebSocket, in open order)
+    B   direction (0 = received, 1 = sent)
+    B   kind (0 = binary frame, 1 = text frame, 2 = open (payload = url), 3 = close)
+    I   payload length
+
+Files rotate after AKAGI_FRAME_RECORD_MAX_MB of (uncompressed) records and only the newest
+AKAGI_FRAME_RECORD_KEEP files are kept. `iter_frames()` reads them back.
+"""
+from __future__ import annotations
+
+import gzip
+import os
+import struct
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Iterator, NamedTuple, Optional
+
+from .logger import logger
+
+FRAME_RECORD = os.getenv("AKAGI_FRAME_RECORD", "0") == "1"
+FRAME_RECORD_DIR = Path(os.getenv("AKAGI_FRAME_RECORD_DIR", str(Path().cwd() / "logs")))
+FRAME_RECORD_MAX_MB = float(os.getenv("AKAGI_FRAME_RECORD_MAX_MB", "64"))
+FRAME_RECORD_KEEP = int(os.getenv("AKAGI_FRAME_RECORD_KEEP", "5"))
+
+_HEADER = struct.Struct("<dHBBI")
+
+KIND_BINARY = 0
+KIND_TEXT = 1
+KIND_OPEN = 2
+KIND_CLOSE = 3
+
+
+class Frame(NamedTuple):
+    ts: float
+    stream: int
+    from_client: bool
+    kind: int
+    payload: bytes
+
+    @property
+    def data(self) -> str | bytes:
+        """WebSocket に流れた形（text フレームは str）"""
+        return self.payload.decode("utf-8", errors="replace") if self.kind == KIND_TEXT else self.payload
+
+
+def _recording_order(path: Path) -> tuple[str, int]:
+    """frames_<stamp>_<n>.bin.gz -> (frames_<stamp>, n)。n は数値で比べるので _10 が _9 の後に来る"""
+    stem = path.name.split(".", 1)[0]
+    run, _, n = stem.rpartition("_")
+    return (run, int(n)) if n.isdigit() else (stem, 0)
+
+
+class FrameRecorder:
+    def __init__(self, directory: Path | str = FRAME_RECORD_DIR, max_bytes: int = int(FRAME_RECORD_MAX_MB * 1024 * 1024),
+                 keep: int = FRAME_RECORD_KEEP, compresslevel: int = 1) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.keep = keep
+        self.compresslevel = compresslevel
+        self._stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self._lock = threading.Lock()
+        self._file: Optional[BinaryIO] = None
+        self._index = 0
+        self._written = 0
+        self._next_stream = 0
+
+    @classmethod
+    def from_env(cls, subdir: str = "") -> Optional["FrameRecorder"]:
+        """subdir: 複数卓で同時に記録するとき卓ごとに分ける（ファイル名の衝突とローテートの巻き込みを防ぐ）"""
+        if not FRAME_RECORD:
+            return None
+        return cls(FRAME_RECORD_DIR / subdir) if subdir else cls()
+
+    # ---- 書き込み ----
+
+    def open_stream(self, url: str) -> int:
+        with self._lock:
+            stream = self._next_stream
+            self._next_stream += 1
+        self._write(stream, False, KIND_OPEN, url.encode("utf-8"))
+        return stream
+
+    def close_stream(self, stream: int) -> None:
+        self._write(stream, False, KIND_CLOSE, b"")
+
+    def frame(self, stream: int, from_client: bool, payload: str | bytes) -> None:
+        if isinstance(payload, str):
+            self._write(stream, from_client, KIND_TEXT, payload.encode("utf-8"))
+        else:
+            self._write(stream, from_client, KIND_BINARY, bytes(payload))
+
+    def _write(self, stream: int, from_client: bool, kind: int, payload: bytes) -> None:
+        header = _HEADER.pack(time.time(), stream & 0xFFFF, int(from_client), kind, len(payload))
+        with self._lock:
+            if self.max_bytes < 0:
+                return
+            try:
+                if self._file is None or self._written >= self.max_bytes:
+                    self._rotate()
+                self._file.write(header)
+                self._file.write(payload)
+                self._written += len(header) + len(payload)
+            except OSError as e:
+                logger.error(f"[recorder] write failed, recording stopped: {e}")
+                self._file = None
+                self.max_bytes = -1
+
+    def _rotate(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._index += 1
+        path = self.directory / f"frames_{self._stamp}_{self._index}.bin.gz"
+        self._file = gzip.open(path, "wb", compresslevel=self.compresslevel)
+        self._written = 0
+        logger.info(f"[recorder] recording frames to {path}")
+        files = sorted(self.directory.glob("frames_*.bin.gz"), key=_recording_order)
+        for old in files[:-self.keep] if self.keep > 0 else []:
+            try:
+                old.unlink()
+            except OSError:
+                pass
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def iter_frames(path: Path | str) -> Iterator[Frame]:
+    """記録ファイル 1 つを先頭から読む（末尾の書きかけレコードは無視）"""
+    with gzip.open(path, "rb") as f:
+        while True:
+            try:
+                header = f.read(_HEADER.size)
+                if len(header) < _HEADER.size:
+                    return
+                ts, stream, direction, kind, length = _HEADER.unpack(header)
+                payload = f.read(length)
+            except EOFError:
+                # 強制終了などで gzip が閉じられていないファイル
+                return
+            if len(payload) < length:
+                return
+            yield Frame(ts, stream, bool(direction), kind, payload)
@@ -0,0 +1,156 @@
+"""
+CPU / memory cost of one table's Chromium (Linux /proc).
+
+Chromium runs as many processes (browser, GPU, renderers, utilities). They
+are counted per table by finding the browser started with
+--user-data-dir=<profile> and walking its descendants.
+
+    python -m playwright_client.browser_cost playwright_data playwright_data_1 --seconds 30
+
+The controller takes the same samples every AKAGI_COST_INTERVAL seconds,
+together with the game page's renderer main-thread time from CDP
+Performance.getMetrics. It logs them as "[cost]" lines tagged with the
+render mode (headed / headless, viewport, frame rate), so two modes can be
+compared from the logs.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional
+
+_PROC = Path("/proc")
+_CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def available() -> bool:
+    return (_PROC / "self" / "stat").exists()
+
+
+def _stat(pid: int) -> Optional[tuple[int, float, int]]:
+    """(ppid, utime+stime 秒, rss バイト)"""
+    try:
+        raw = (_PROC / str(pid) / "stat").read_bytes()
+    except OSError:
+        return None
+    # comm は括弧付きで空白を含み得るので最後の ')' の後ろから数える
+    fields = raw[raw.rfind(b")") + 2:].split()
+    return int(fields[1]), (int(fields[11]) + int(fields[12])) / _CLK_TCK, int(fields[21]) * _PAGE_SIZE
+
+
+def profile_pids(user_data_dir: Path | str) -> set[int]:
+    """--user-data-dir=<profile> で起動した Chromium とその子孫プロセス"""
+    path = Path(user_data_dir)
+    needles = {f"--user-data-dir={path.absolute()}".encode(), f"--user-data-dir={path.resolve()}".encode()}
+    children: dict[int, list[int]] = defaultdict(list)
+    matched: set[int] = set()
+    for entry in os.scandir(_PROC):
+        if not entry.name.isdigit():
+            continue
+        pid = int(entry.name)
+        st = _stat(pid)
+        if st is None:
+            continue
+        children[st[0]].append(pid)
+        try:
+            args = (_PROC / entry.name / "cmdline").read_bytes().split(b"\0")
+        except OSError:
+            continue
+        if needles.intersection(args):
+            matched.add(pid)
+    pids: set[int] = set()
+    stack = list(matched)
+    while stack:
+        pid = stack.pop()
+        if pid not in pids:
+            pids.add(pid)
+            stack.extend(children.get(pid, ()))
+    return pids
+
+
+@dataclass
+class CostSample:
+    ts: float
+    cpu_s: float
+    rss: int
+    procs: int
+
+
+def sample(pids: Iterable[int]) -> CostSample:
+    cpu, rss, procs = 0.0, 0, 0
+    for pid in pids:
+        st = _stat(pid)
+        if st is None:
+            continue
+        cpu += st[1]
+        rss += st[2]
+        procs += 1
+    return CostSample(time.monotonic(), cpu, rss, procs)
+
+
+class CostMeter:
+    """1 テーブル（プロファイル）分。measure() の度に前回からの CPU 使用率を返す"""
+
+    def __init__(self, user_data_dir: Path | str) -> None:
+        self.user_data_dir = Path(user_data_dir)
+        self._first: Optional[CostSample] = None
+        self._last: Optional[CostSample] = None
+        self._cpu_total = 0.0
+
+    def measure(self) -> Optional[dict]:
+        if not available():
+            return None
+        s = sample(profile_pids(self.user_data_dir))
+        if not s.procs:
+            return None
+        result: dict = {"procs": s.procs, "rss_mb": s.rss / 2**20}
+        if self._last is not None:
+            # レンダラの入れ替えで合計が減ることがある：その区間は 0 扱い
+            used = max(0.0, s.cpu_s - self._last.cpu_s)
+            self._cpu_total += used
+            result["cpu_pct"] = used / max(1e-6, s.ts - self._last.ts) * 100
+        if self._first is None:
+            self._first = s
+        self._last = s
+        return result
+
+    def average_cpu_pct(self) -> Optional[float]:
+        """最初と最後のサンプルの間の平均 CPU 使用率（1 コア = 100%）"""
+        if self._first is None or self._last is None or self._last.ts <= self._first.ts:
+            return None
+        return self._cpu_total / (self._last.ts - self._first.ts) * 100
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure Chromium CPU/RSS per browser profile (Linux).")
+    parser.add_argument("profiles", nargs="+", type=Path, help="user_data_dir of each running table")
+    parser.add_argument("--seconds", type=float, default=30.0, help="measurement window")
+    parser.add_argument("--interval", type=float, default=5.0, help="seconds between samples")
+    args = parser.parse_args()
+    if not available():
+        parser.error("/proc is not available on this platform")
+
+    meters = {p: CostMeter(p) for p in args.profiles}
+    for m in meters.values():
+        m.measure()
+    end = time.monotonic() + args.seconds
+    while time.monotonic() < end:
+        time.sleep(min(args.interval, max(0.0, end - time.monotonic())))
+        for p, m in meters.items():
+            r = m.measure()
+            if r is None:
+                print(f"{p}: no Chromium found")
+            elif "cpu_pct" in r:
+                print(f"{p}: cpu={r['cpu_pct']:.1f}% rss={r['rss_mb']:.0f}MB procs={r['procs']}")
+    for p, m in meters.items():
+        avg = m.average_cpu_pct()
+        print(f"{p}: average cpu={'n/a' if avg is None else f'{avg:.1f}%'}")
+
+
+if __name__ == "__main__":
+    main()
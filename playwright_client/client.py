@@ -3,35 +3,48 @@ import loguru
 from loguru import logger as main_logger
 from datetime import datetime
 from pathlib import Path
+from .logger import LOG_LEVEL, DEBUG_ENABLED
 
 # Log to: "./Logs/rpc_client_<timestamp>.log"
 log_path = Path().cwd() / "logs" / f"rpc_client_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
 logger: loguru.Logger = main_logger.bind(module="rpc_client")
-main_logger.add(log_path, level="DEBUG", filter=lambda record: record["extra"].get("module") == "rpc_client")
+main_logger.add(log_path, level=LOG_LEVEL, filter=lambda record: record["extra"].get("module") == "rpc_client")
 
 import time
 import queue
 import asyncio
 import threading
 from settings.settings import settings
-from .majsoul import PlaywrightController, mjai_messages
+from .majsoul import PlaywrightController, QueuedMessage
 
 
 class Client(object):
-    def __init__(self):
-        self.messages: queue.Queue[dict] = None
+    def __init__(self, user_data_dir: Path | None = None, name: str = ""):
+        """
+        Args:
+            user_data_dir (Path | None): Browser profile for this client (default ./playwright_data).
+            name (str): Table name. A named client gets its own message queue (multi-table mode).
+        """
+        self.messages: queue.Queue[QueuedMessage] = None
+        # dump_messages() で取り出した最後の WS メッセージの受信時刻（time.monotonic()）
+        self.last_batch_at: float | None = None
+        # 同じく、そのメッセージの event_seq（コマンドの陳腐化判定に使う）
+        self.last_batch_seq: int | None = None
         self.running = False
         self._thread: threading.Thread = None
         self.controller: PlaywrightController = PlaywrightController(
             settings.playwright.majsoul_url, 
             settings.playwright.viewport.width,
-            settings.playwright.viewport.height
+            settings.playwright.viewport.height,
+            user_data_dir=user_data_dir,
+            messages=queue.Queue() if name else None,
+            name=name,
         )
 
     def start(self):
         if self.running:
             return
-        self.messages = mjai_messages
+        self.messages = self.controller.messages
         self._thread = threading.Thread(target=self.controller.start, daemon=True)
         self._thread.start()
         self.running = True
@@ -52,13 +65,32 @@ class Client(object):
             raise RuntimeError("Client is not running.")
         if not self.controller.running:
             raise RuntimeError("Controller is not running.")
-        logger.debug(f"Sending command: {command}")
+        if DEBUG_ENABLED:
+            logger.debug(f"Sending command: {command}")
         self.controller.command_queue.put(command)
 
+    def send_gesture(self, steps: list[list[float]], supersede: bool = True, seq: int | None = None) -> int:
+        if not self.running:
+            raise RuntimeError("Client is not running.")
+        if not self.controller.running:
+            raise RuntimeError("Controller is not running.")
+        if DEBUG_ENABLED:
+            logger.debug(f"Sending gesture: {steps}")
+        return self.controller.gesture(steps, supersede, seq)
+
+    def put_message(self, message: dict) -> None:
+        """WS 以外の mjai メッセージ（リーチ宣言の反映など）を積む。バッチの seq/受信時刻は変えない"""
+        self.messages.put((None, None, message))
+
     def dump_messages(self) -> list[dict]:
         ans: list[dict] = []
         while not self.messages.empty():
-            message = self.messages.get()
-            logger.debug(f"Message: {message}")
+            seq, received_at, message = self.messages.get()
+            if DEBUG_ENABLED:
+                logger.debug(f"Message: {message}")
             ans.append(message)
+            # controller の属性は取り出し後にも進むので、取り出したメッセージ自身の番号を使う
+            if seq is not None:
+                self.last_batch_seq = seq
+                self.last_batch_at = received_at
         return ans
@@ -0,0 +1,78 @@
+"""
+Pointer input backends for PlaywrightController.
+
+ - "mouse": page.mouse.move / page.mouse.click (the original path; Playwright
+   replays move+down+up through its own mouse state machine)
+ - "cdp":   Input.dispatchMouseEvent over one persistent CDP session. The move
+   is issued ahead of the wait that precedes a click, so no hover wait is
+   needed. Press and release are still two sequential CDP round trips (the
+   sync API waits for each acknowledgement); the gain over "mouse" comes from
+   dropping hover_ms, not from pipelining the click itself.
+
+Select with AKAGI_INPUT_BACKEND=mouse|cdp (default: mouse). CDP needs Chromium;
+if the session cannot be opened the controller falls back to "mouse".
+
+`python -m playwright_client.input_bench` compares both on a local page.
+"""
+from __future__ import annotations
+
+import os
+
+from playwright.sync_api import CDPSession, Page
+
+from .logger import logger
+
+INPUT_BACKEND = os.getenv("AKAGI_INPUT_BACKEND", "mouse").strip().lower()
+
+
+class MouseInput:
+    name = "mouse"
+    # ボタンの hover 反応待ち（従来の move → 100ms → click）
+    hover_ms = 100
+
+    def __init__(self, page: Page) -> None:
+        self.page = page
+
+    def move(self, x: float, y: float) -> None:
+        self.page.mouse.move(x, y)
+
+    def click(self, x: float, y: float) -> None:
+        self.page.mouse.click(x, y)
+
+
+class CDPInput:
+    name = "cdp"
+    hover_ms = 0
+
+    def __init__(self, page: Page) -> None:
+        self.page = page
+        self.session: CDPSession = page.context.new_cdp_session(page)
+
+    def _dispatch(self, type_: str, x: float, y: float, **extra) -> None:
+        self.session.send("Input.dispatchMouseEvent", {"type": type_, "x": x, "y": y, **extra})
+
+    def move(self, x: float, y: float) -> None:
+        self._dispatch("mouseMoved", x, y)
+
+    def click(self, x: float, y: float) -> None:
+        # mousePressed の座標で pointer も移動するので、事前の move は必須ではない
+        # press / release はそれぞれ応答を待つ 2 往復（同期 API では投げっぱなしにできない）
+        self._dispatch("mousePressed", x, y, button="left", buttons=1, clickCount=1)
+        self._dispatch("mouseReleased", x, y, button="left", buttons=0, clickCount=1)
+
+    def close(self) -> None:
+        try:
+            self.session.detach()
+        except Exception:
+            pass
+
+
+def make_input(page: Page, backend: str = INPUT_BACKEND) -> MouseInput | CDPInput:
+    if backend == "cdp":
+        try:
+            return CDPInput(page)
+        except Exception as e:
+            logger.warning(f"[Input] CDP session unavailable, using page.mouse: {e}")
+    elif backend != "mouse":
+        logger.warning(f"[Input] unknown AKAGI_INPUT_BACKEND={backend!r}, using page.mouse")
+    return MouseInput(page)
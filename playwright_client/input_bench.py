@@ -0,0 +1,111 @@
+"""
+Click latency bench for the pointer input backends (playwright_client/input.py).
+
+Opens a local HTML page that records pointermove/pointerdown/pointerup/click
+with performance.now(), then drives it the same way the controller does
+(move, hover wait, click) with each backend:
+
+    python -m playwright_client.input_bench --clicks 200
+    python -m playwright_client.input_bench --backend cdp --headed
+
+Reported per backend:
+  call   wall time of the controller-side move+click sequence (Python)
+  down   first event (move) -> pointerdown on the page
+  click  pointerdown -> click on the page
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+from playwright.sync_api import sync_playwright
+
+from .input import MouseInput, make_input
+
+BENCH_PAGE = """<!doctype html>
+<html><body style="margin:0">
+<div id="target" style="position:absolute;left:0;top:0;width:100vw;height:100vh"></div>
+<script>
+  window.__events = [];
+  for (const t of ['pointermove', 'pointerdown', 'pointerup', 'click']) {
+    document.addEventListener(t, e => window.__events.push([t, performance.now(), e.clientX, e.clientY]), true);
+  }
+</script>
+</body></html>"""
+
+
+def _pct(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def _summary(name: str, values: list[float]) -> str:
+    if not values:
+        return f"{name:>5}: n/a"
+    return (f"{name:>5}: mean={statistics.fmean(values):7.2f}ms p50={_pct(values, 0.5):7.2f}ms "
+            f"p95={_pct(values, 0.95):7.2f}ms max={max(values):7.2f}ms")
+
+
+def _page_timings(events: list[list]) -> tuple[list[float], list[float]]:
+    """events を 1 クリック毎に区切って (move->down, down->click) を返す"""
+    down_lat, click_lat = [], []
+    first = down = None
+    for kind, ts, _, _ in events:
+        if kind == "pointermove" and first is None:
+            first = ts
+        elif kind == "pointerdown":
+            down = ts
+            if first is not None:
+                down_lat.append(ts - first)
+        elif kind == "click" and down is not None:
+            click_lat.append(ts - down)
+            first = down = None
+    return down_lat, click_lat
+
+
+def run_backend(page, backend: str, clicks: int, width: int, height: int) -> None:
+    page.set_content(BENCH_PAGE)
+    inp = make_input(page, backend)
+    call_ms = []
+    for i in range(clicks):
+        # 同じ座標だと pointermove が出ないので毎回ずらす
+        x = 20 + (i * 37) % (width - 40)
+        y = 20 + (i * 53) % (height - 40)
+        t0 = time.perf_counter()
+        inp.move(x, y)
+        if inp.hover_ms:
+            page.wait_for_timeout(inp.hover_ms)
+        inp.click(x, y)
+        call_ms.append((time.perf_counter() - t0) * 1000)
+    events = page.evaluate("() => window.__events")
+    down_lat, click_lat = _page_timings(events)
+    label = inp.name if inp.name == backend else f"{backend}->{inp.name}"
+    print(f"[{label}] {clicks} clicks, {len(click_lat)} recorded by the page")
+    print("  " + _summary("call", call_ms))
+    print("  " + _summary("down", down_lat))
+    print("  " + _summary("click", click_lat))
+    if not isinstance(inp, MouseInput):
+        inp.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare click latency of the input backends.")
+    parser.add_argument("--backend", action="append", choices=["mouse", "cdp"],
+                        help="backend to measure (repeatable, default: both)")
+    parser.add_argument("--clicks", type=int, default=100)
+    parser.add_argument("--width", type=int, default=1600)
+    parser.add_argument("--height", type=int, default=900)
+    parser.add_argument("--headed", action="store_true")
+    args = parser.parse_args()
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=not args.headed)
+        page = browser.new_page(viewport={"width": args.width, "height": args.height})
+        for backend in args.backend or ["mouse", "cdp"]:
+            run_backend(page, backend, args.clicks, args.width, args.height)
+        browser.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Cached account / rank probe for the lobby.
+
+One `LobbyProbe` per page keeps the account's level ids and level scores:
+ - frames already parsed by MajsoulBridge refresh it for free: any lobby
+   response carrying our own `account` (login / oauth2Login /
+   fetchAccountInfo ...) updates the cache, and NotifyGameEndResult marks it
+   stale (the level score is about to change);
+ - otherwise `get()` does a single page.evaluate of an injected probe that
+   reads GameMgr.Inst.account_data and only falls back to one lobby RPC
+   (fetchInfo, then fetchAccountInfo) when that is missing or a refresh is
+   requested. The probe also caches its result in the page
+   (window.__akagiLobbyCache).
+
+fetch_current_rank_ids / _peek_both_scores / fetch_rank_score_with_retry in
+majsoul.py are thin views over this.
+"""
+from __future__ import annotations
+
+import threading
+import time
+import weakref
+from typing import Any, Optional
+
+from playwright.sync_api import Page
+
+from .logger import logger
+
+# ページ内に 1 度だけ定義するプローブ本体
+_PROBE_DEFINE_JS = r"""
+if (!window.__akagiLobbyProbe) {
+  const num = (v) => {
+    if (typeof v === "number") return v;
+    if (v && typeof v.toNumber === "function") { try { return v.toNumber(); } catch (_) {} }
+    if (typeof v === "string" && v.trim() !== "") { const n = Number(v); if (!Number.isNaN(n)) return n; }
+    return null;
+  };
+  const int = (v) => { const n = num(v); return n == null ? null : Math.trunc(n); };
+  const fromAccount = (a, myId, source) => {
+    if (!a) return null;
+    const l4 = a.level || {}, l3 = a.level3 || {};
+    return {
+      account_id: int(a.account_id ?? a.id ?? myId),
+      nickname: a.nickname ?? a.nick ?? null,
+      level_id_4: int(l4.id), level_id_3: int(l3.id),
+      level_score_4: int(l4.score), level_score_3: int(l3.score),
+      source,
+    };
+  };
+  const hasLevel = (o) => o && (o.level_id_4 != null || o.level_id_3 != null);
+  const rpc = (method, req) => new Promise((resolve) => {
+    try {
+      app.NetAgent.sendReq2Lobby("Lobby", method, req, (err, resp) => resolve(err ? null : resp));
+    } catch (_) { resolve(null); }
+  });
+
+  window.__akagiLobbyProbe = async (refresh) => {
+    const myId = globalThis.GameMgr?.Inst?.account_id || null;
+    if (!myId) return { account_id: null, source: "not_logged_in" };
+    let out = null;
+    if (!refresh) {
+      out = fromAccount(GameMgr.Inst.account_data, myId, "local");
+    }
+    if (!hasLevel(out)) {
+      const resp = await rpc("fetchInfo", {});
+      out = fromAccount(resp && (resp.account || resp.info || resp.player), myId, "fetchInfo");
+    }
+    if (!hasLevel(out)) {
+      const resp = await rpc("fetchAccountInfo", { account_id: myId });
+      out = fromAccount(resp && (resp.account || resp.info || resp.player || resp), myId, "fetchAccountInfo");
+    }
+    out = out || { account_id: myId, source: "failed" };
+    window.__akagiLobbyCache = Object.assign({ at: Date.now() }, out);
+    return out;
+  };
+}
+"""
+
+_PROBE_CALL_JS = "(refresh) => { " + _PROBE_DEFINE_JS + " return window.__akagiLobbyProbe(refresh); }"
+
+_FIELDS = ("account_id", "nickname", "level_id_4", "level_id_3", "level_score_4", "level_score_3")
+
+
+def _int(v: Any) -> Optional[int]:
+    try:
+        return None if v is None else int(v)
+    except (TypeError, ValueError):
+        return None
+
+
+class LobbyProbe:
+    def __init__(self, max_age: float = 300.0) -> None:
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._data: dict = {}
+        self._updated_at = 0.0
+        self._stale = True
+        self.evaluations = 0
+
+    # ---- bridge 由来の更新（Playwright スレッド） ----
+
+    def on_liqi(self, method: str, msg_type: str, data: Optional[dict], my_account_id: Optional[int] = None) -> None:
+        if method in (".lq.NotifyGameEndResult", ".lq.NotifyGameTerminate"):
+            self.invalidate()
+            return
+        if msg_type != "Res" or not method.startswith(".lq.Lobby.") or not isinstance(data, dict):
+            return
+        acc = data.get("account")
+        if not isinstance(acc, dict):
+            return
+        acc_id = _int(acc.get("accountId"))
+        me = my_account_id or self._data.get("account_id")
+        # 他人のプロフィール参照（fetchAccountInfo）は無視。ログイン応答は自分
+        if me is None and not method.endswith(("login", "Login")):
+            return
+        if me is not None and acc_id != me:
+            return
+        level, level3 = acc.get("level") or {}, acc.get("level3") or {}
+        self._store({
+            "account_id": acc_id,
+            "nickname": acc.get("nickname"),
+            "level_id_4": _int(level.get("id")),
+            "level_id_3": _int(level3.get("id")),
+            "level_score_4": _int(level.get("score")),
+            "level_score_3": _int(level3.get("score")),
+        }, source=f"ws:{method.rsplit('.', 1)[-1]}")
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._stale = True
+
+    def _store(self, values: dict, source: str) -> None:
+        with self._lock:
+            for k in _FIELDS:
+                if values.get(k) is not None:
+                    self._data[k] = values[k]
+            self._data["_source"] = source
+            self._updated_at = time.monotonic()
+            self._stale = False
+        logger.debug(f"[lobby] cache updated from {source}: {self._data}")
+
+    # ---- 参照 ----
+
+    def cached(self) -> Optional[dict]:
+        with self._lock:
+            fresh = (not self._stale) and (time.monotonic() - self._updated_at) <= self.max_age
+            has_level = self._data.get("level_id_4") is not None or self._data.get("level_id_3") is not None
+            if not (fresh and has_level):
+                return None
+            out = {k: self._data.get(k) for k in _FIELDS}
+            out["_source"] = self._data.get("_source")
+            return out
+
+    def last(self, key: str) -> Any:
+        """鮮度に関係なく最後に分かっている値（終局直後の「対局前の段位ポイント」など）"""
+        with self._lock:
+            return self._data.get(key)
+
+    def get(self, page: Page, refresh: bool = False) -> Optional[dict]:
+        """キャッシュが新しければそのまま、なければ page.evaluate 1 回で取り直す"""
+        if not refresh:
+            hit = self.cached()
+            if hit is not None:
+                hit["_source"] = f"cache({hit.get('_source')})"
+                return hit
+        try:
+            self.evaluations += 1
+            data = page.evaluate(_PROBE_CALL_JS, bool(refresh or self._stale))
+        except Exception as e:
+            logger.warning(f"[lobby] probe failed: {e}")
+            return None
+        if not isinstance(data, dict):
+            return None
+        if data.get("level_id_4") is not None or data.get("level_id_3") is not None:
+            self._store(data, source=str(data.get("source")))
+        out = {k: _int(data.get(k)) if k != "nickname" else data.get(k) for k in _FIELDS}
+        out["_source"] = data.get("source")
+        return out
+
+
+# waits._signals と同じく、id(page) ではなくページオブジェクトをキーにする（古いキャッシュを返さない）
+_probes: "weakref.WeakKeyDictionary[Page, LobbyProbe]" = weakref.WeakKeyDictionary()
+
+
+def lobby_probe(page: Page) -> LobbyProbe:
+    probe = _probes.get(page)
+    if probe is None:
+        probe = _probes[page] = LobbyProbe()
+    return probe
@@ -15,11 +15,17 @@ from playwright.sync_api import (
 from email.header import Header
 from email.utils import formatdate, make_msgid, formataddr
 from .bridge import MajsoulBridge
+from .bridge.recorder import FrameRecorder
+from .browser_cost import CostMeter
+from .input import INPUT_BACKEND, CDPInput, MouseInput, make_input
+from .lobby import lobby_probe
+from .waits import install_observer, signals_for, wait_for_quiet, wait_for_signal, wait_until
 from .logger import logger
 from akagi.hooks import register_page
+from akagi.outbox import LineSender, Outbox, SlackSender, get_outbox
+from akagi.result_store import get_result_store
 import os
 from datetime import datetime
-import requests
 import os, json, ssl, smtplib
 from email.mime.text import MIMEText
 from typing import Optional, Dict, Any, Tuple, List
@@ -40,23 +46,35 @@ AKAGI_MAX_RANK_ID_3P = os.getenv("AKAGI_MAX_RANK_ID_3P")  # 例: "20302"（三
 
 _PROOF_DIR = Path("logs/click_proof"); _PROOF_DIR.mkdir(parents=True, exist_ok=True)
 
+ACCOUNT_PROBE_JS = r"""
+() => {
+  const id = (globalThis.GameMgr && GameMgr.Inst && typeof GameMgr.Inst.account_id !== 'undefined')
+      ? GameMgr.Inst.account_id : -1;
+  const hasAcc = !!(globalThis.GameMgr && GameMgr.Inst && GameMgr.Inst.account_data);
+  const hasNet = !!(globalThis.app && app.NetAgent && app.NetAgent.sendReq2Lobby);
+  // 参照できる環境により名前が違うことがあるので広めに見る
+  const inHall = !!(globalThis.GameMgr?.Inst?.in_hall || globalThis.GameMgr?.Inst?.in_lobby || globalThis.GameMgr?.Inst?.lobby);
+  return { id, hasAcc, hasNet, inHall };
+}
+"""
+
+
 def wait_for_account_ready(page: Page, timeout_ms: int = 180_000, poll_ms: int = 500) -> bool:
     """
     GameMgr/NetAgent 初期化と account_id>0（=ログイン完了）まで待つ。
     進捗をログ出力。True=準備OK, False=タイムアウト。
+    GameMgr オブザーバ（waits.install_observer）が入っていれば、その通知で即座に解決する。
     """
+    sig = signals_for(page)
+    if sig.observer:
+        if sig.account_ready or wait_until(page, lambda: sig.account_ready, timeout_ms, label="account_ready"):
+            notify_log.info(f"[READY] account_id > 0 を確認。段位取得を開始します。 state={sig.state}")
+            return True
+        notify_log.warning(f"[READY] タイムアウト：account_id が正になりませんでした（未ログイン/未入場） state={sig.state}")
+        return False
+
     end = time.time() + (timeout_ms / 1000.0)
-    js_probe = r"""
-    () => {
-      const id = (globalThis.GameMgr && GameMgr.Inst && typeof GameMgr.Inst.account_id !== 'undefined')
-          ? GameMgr.Inst.account_id : -1;
-      const hasAcc = !!(GameMgr && GameMgr.Inst && GameMgr.Inst.account_data);
-      const hasNet = !!(globalThis.app && app.NetAgent && app.NetAgent.sendReq2Lobby);
-      // 参照できる環境により名前が違うことがあるので広めに見る
-      const inHall = !!(GameMgr?.Inst?.in_hall || GameMgr?.Inst?.in_lobby || GameMgr?.Inst?.lobby);
-      return { id, hasAcc, hasNet, inHall };
-    }
-    """
+    js_probe = ACCOUNT_PROBE_JS
     last_print = 0.0
     while time.time() < end:
         try:
@@ -75,9 +93,9 @@ def wait_for_account_ready(page: Page, timeout_ms: int = 180_000, poll_ms: int =
     notify_log.warning("[READY] タイムアウト：account_id が正になりませんでした（未ログイン/未入場）")
     return False
 
-def allow_auto_start_by_rank(page: Page) -> bool:
-    # 準備ができるまで待つ（未ログインなら False）
-    if not wait_for_account_ready(page, timeout_ms=180_000):
+def allow_auto_start_by_rank(page: Page, ready_timeout_ms: int = 180_000) -> bool:
+    # 準備ができるまで待つ（未ログインなら False）。準備を確認済みの呼び出し元は ready_timeout_ms=0
+    if not wait_for_account_ready(page, timeout_ms=ready_timeout_ms):
         notify_log.warning("[gate] account 未準備（account_id<=0）。ログイン/入場完了後に再試行してください。")
         return False
 
@@ -127,215 +145,42 @@ def _as_int(v):
             return None
 
 # ★ 追加: 現在段位ID取得（四麻 level.id / 三麻 level3.id）
-def fetch_current_rank_ids(page: Page) -> Optional[dict]:
+def fetch_current_rank_ids(page: Page, refresh: bool = False) -> Optional[dict]:
     """
-    段位IDを堅牢に取得。詳細デバッグ情報付き。
+    段位IDを取得（lobby.LobbyProbe のキャッシュ経由。無ければ page.evaluate 1 回）。
     返り値: {
         "account_id": int|None, "nickname": str|None,
         "level_id_4": int|None, "level_id_3": int|None,
-        "_source": "local" | "fetchInfo_account" | "fetchInfo_list" | "fetchAccountInfo",
-        "debug": [str, ...]  # 取得経路ログ
+        "level_score_4": int|None, "level_score_3": int|None,
+        "_source": "cache(...)" | "local" | "fetchInfo" | "fetchAccountInfo" | "failed" | "not_logged_in",
     }
     """
-    js = r"""
-    () => new Promise((resolve) => {
-      const debug = [];
-      function j(o){ try{return JSON.stringify(o)}catch(_){return String(o)}}
-      function keys(o){ try{return Object.keys(o||{}).join(',')}catch(_){return ''} }
-
-      function num(v){
-        if (typeof v === "number") return v;
-        if (v && typeof v.toNumber === "function") { try { return v.toNumber(); } catch(_){} }
-        if (typeof v === "string" && v.trim() !== "") { const n = Number(v); if (!Number.isNaN(n)) return n; }
-        return null;
-      }
-      function pickInt(v){ const n = num(v); return (n == null ? null : Math.trunc(n)); }
-
-      const myId = (globalThis.GameMgr && GameMgr.Inst && GameMgr.Inst.account_id) ? GameMgr.Inst.account_id : null;
-      debug.push("myId=" + myId);
-      if (!myId) { debug.push("no myId -> abort"); resolve({debug}); return; }
-
-      // ---- 1) local (GameMgr.Inst.account_data)
-      try{
-        const acc = GameMgr?.Inst?.account_data || null;
-        debug.push("local: has_acc=" + !!acc);
-        if (acc){
-          const level  = acc.level  || {};
-          const level3 = acc.level3 || {};
-          const out = {
-            account_id: pickInt(acc.account_id ?? myId),
-            nickname: (acc.nickname ?? acc.nick ?? null),
-            level_id_4: pickInt(level.id),
-            level_id_3: pickInt(level3.id),
-            _source: "local",
-            debug
-          };
-          debug.push("local ids: 4=" + out.level_id_4 + " 3=" + out.level_id_3);
-          if (out.level_id_4 != null || out.level_id_3 != null) { resolve(out); return; }
-        }
-      }catch(e){ debug.push("local err: "+e); }
-
-      // ---- 2) fetchInfo({})
-      try{
-        app.NetAgent.sendReq2Lobby("Lobby", "fetchInfo", {}, function(err, resp){
-          if (err){ debug.push("fetchInfo{} err"); step3(); return; }
-          debug.push("fetchInfo{} keys=" + keys(resp));
-          if (resp && resp.error != null) debug.push("fetchInfo{} error=" + j(resp.error));
-          const a = resp && (resp.account || resp.info || resp.player || null);
-          if (a){
-            const level  = a.level  || {};
-            const level3 = a.level3 || {};
-            const out = {
-              account_id: pickInt(a.account_id ?? a.id ?? myId),
-              nickname: (a.nickname ?? a.nick ?? null),
-              level_id_4: pickInt(level.id),
-              level_id_3: pickInt(level3.id),
-              _source: "fetchInfo_account",
-              debug
-            };
-            debug.push("fetchInfo{} ids: 4=" + out.level_id_4 + " 3=" + out.level_id_3);
-            if (out.level_id_4 != null || out.level_id_3 != null) { resolve(out); return; }
-          }else{
-            debug.push("fetchInfo{} no account field");
-          }
-          step3(); // continue
-        });
-      }catch(e){ debug.push("fetchInfo{} throw:"+e); step3(); }
-
-      // ---- 3) fetchInfo({account_id_list:[myId]})  ※配列系の形状を総当り
-      function step3(){
-        try{
-          app.NetAgent.sendReq2Lobby("Lobby", "fetchInfo", { account_id_list: [myId] }, function(err, resp){
-            if (err){ debug.push("fetchInfo[list] err"); step4(); return; }
-            debug.push("fetchInfo[list] keys=" + keys(resp));
-            if (resp && resp.error != null) debug.push("fetchInfo[list] error=" + j(resp.error));
-            const candidates = resp && (resp.infos || resp.accounts || resp.players || resp.account_info || []);
-            const arr = Array.isArray(candidates) ? candidates : [candidates];
-            let picked = null;
-            for (const cand of arr){
-              if (!cand) continue;
-              const a = cand.account || cand; // 中に account を抱える形とフラットの両方に対応
-              const id = pickInt(a && (a.account_id ?? a.id));
-              if (id != null && id === pickInt(myId)){ picked = a; break; }
-            }
-            if (picked){
-              const level  = picked.level  || {};
-              const level3 = picked.level3 || {};
-              const out = {
-                account_id: pickInt(picked.account_id ?? picked.id ?? myId),
-                nickname: (picked.nickname ?? picked.nick ?? null),
-                level_id_4: pickInt(level.id),
-                level_id_3: pickInt(level3.id),
-                _source: "fetchInfo_list",
-                debug
-              };
-              debug.push("fetchInfo[list] ids: 4=" + out.level_id_4 + " 3=" + out.level_id_3);
-              if (out.level_id_4 != null || out.level_id_3 != null) { resolve(out); return; }
-            }else{
-              debug.push("fetchInfo[list] no matched account");
-            }
-            step4();
-          });
-        }catch(e){ debug.push("fetchInfo[list] throw:"+e); step4(); }
-      }
-
-      // ---- 4) fetchAccountInfo({account_id: myId})
-      function step4(){
-        try{
-          app.NetAgent.sendReq2Lobby("Lobby", "fetchAccountInfo", { account_id: myId }, function(err, resp){
-            if (err){ debug.push("fetchAccountInfo err"); finish(); return; }
-            debug.push("fetchAccountInfo keys=" + keys(resp));
-            if (resp && resp.error != null) debug.push("fetchAccountInfo error=" + j(resp.error));
-            const a = resp && (resp.account || resp.info || resp.player || resp) || null;
-            if (a){
-              const level  = a.level  || {};
-              const level3 = a.level3 || {};
-              const out = {
-                account_id: pickInt(a.account_id ?? a.id ?? myId),
-                nickname: (a.nickname ?? a.nick ?? null),
-                level_id_4: pickInt(level.id),
-                level_id_3: pickInt(level3.id),
-                _source: "fetchAccountInfo",
-                debug
-              };
-              debug.push("fetchAccountInfo ids: 4=" + out.level_id_4 + " 3=" + out.level_id_3);
-              resolve(out); return;
-            }
-            finish();
-          });
-        }catch(e){ debug.push("fetchAccountInfo throw:"+e); finish(); }
-      }
-
-      function finish(){
-        debug.push("all paths failed");
-        resolve({ debug });
-      }
-    })
-    """
-    try:
-        data = page.evaluate(js)
-        # JS 側で debug を常に返すので、ここで状況を可視化
-        dbg = (data or {}).get("debug") if isinstance(data, dict) else None
-        if isinstance(dbg, list):
-            for line in dbg:
-                notify_log.info(f"[RANK.debug] {line}")
-
-        if not data or not isinstance(data, dict):
-            notify_log.warning("[RANK] JS returned non-dict or null")
-            return None
-
-        # 正規化
-        data["account_id"] = _as_int(data.get("account_id"))
-        data["level_id_4"] = _as_int(data.get("level_id_4"))
-        data["level_id_3"] = _as_int(data.get("level_id_3"))
-
-        notify_log.info(f"[RANK] ids fetched: 4p={data.get('level_id_4')} 3p={data.get('level_id_3')} source={data.get('_source')}")
-        return data if (data.get("level_id_4") is not None or data.get("level_id_3") is not None) else data  # 取れなかった場合も debug のため返す
-    except Exception:
-        notify_log.exception("[RANK] fetch_current_rank_ids failed")
+    data = lobby_probe(page).get(page, refresh=refresh)
+    if data is None:
+        notify_log.warning("[RANK] lobby probe returned nothing")
         return None
-
+    notify_log.info(f"[RANK] ids fetched: 4p={data.get('level_id_4')} 3p={data.get('level_id_3')} source={data.get('_source')}")
+    return data  # 取れなかった場合も _source 確認のため返す
 
 
 def _peek_both_scores(page):
-    js = r"""
-    () => new Promise((resolve) => {
-      app.NetAgent.sendReq2Lobby("Lobby", "fetchInfo", {}, (err, info) => {
-        if (err || !info || !info.account) { resolve(null); return; }
-        const l4 = info.account.level?.score ?? null;
-        const l3 = info.account.level3?.score ?? null;
-        resolve({ level_score_4p: l4, level_score_3p: l3 });
-      });
-    })
-    """
-    try:
-        return page.evaluate(js)
-    except Exception:
+    data = lobby_probe(page).get(page)
+    if data is None:
         return None
+    return {"level_score_4p": data.get("level_score_4"), "level_score_3p": data.get("level_score_3")}
 
 def fetch_rank_score_with_retry(page: Page, is_sanma: bool, retries: int = 3, wait_ms: int = 300) -> Optional[int]:
     """
-    fetchInfo を叩いて Account.level / level3 の score を取得。
-    取りこぼしや反映遅延に備えてリトライ。
-    """
-    js = r"""
-    (isSanma) => new Promise((resolve) => {
-      app.NetAgent.sendReq2Lobby("Lobby", "fetchInfo", {},
-        function(err, info){
-          if (err || !info || !info.account) { resolve(null); return; }
-          const lv = isSanma ? info.account.level3 : info.account.level;
-          const v = (lv && typeof lv.score === 'number') ? lv.score : null;
-          resolve(v);
-        });
-    })
+    Account.level / level3 の score を取得（キャッシュが古ければ fetchInfo 1 回）。
+    取りこぼしや反映遅延に備えて、取れなかった時だけ取り直す。
     """
-    for _ in range(retries):
-        try:
-            v = page.evaluate(js, is_sanma)
-            if isinstance(v, (int, float)):
-                return int(v)
-        except Exception:
-            pass
+    key = "level_score_3" if is_sanma else "level_score_4"
+    probe = lobby_probe(page)
+    for i in range(retries):
+        data = probe.get(page, refresh=i > 0)
+        v = data.get(key) if data else None
+        if isinstance(v, int):
+            return v
         page.wait_for_timeout(wait_ms)
     return None
 
@@ -457,109 +302,53 @@ def _mask(s: str, show: int = 6) -> str:
     return s[:show] + "..." if len(s) > show else "***"
 
 
-def send_line_message_api(message: str) -> bool:
-    """LINE Messaging API で push 通知を送る（詳細ログ付き）"""
+def _notify_outbox() -> Outbox:
+    """通知アウトボックス（初回に LINE/Slack の送信先を登録する）"""
+    outbox = get_outbox()
+    if "slack" not in outbox.senders:
+        outbox.register("slack", SlackSender(SLACK_BOT_TOKEN, SLACK_CHANNEL_ID))
+        outbox.register("line", LineSender(LINE_CHANNEL_ACCESS_TOKEN, LINE_USER_ID))
+    return outbox
+
+
+def send_line_message_api(message: str, coalesce_key: Optional[str] = None) -> bool:
+    """LINE push 通知をアウトボックスに積む（送信・リトライはバックグラウンド）"""
     if not (LINE_CHANNEL_ACCESS_TOKEN and LINE_USER_ID):
         notify_log.error("[LINE] token or user_id missing")
         return False
-    url = "https://api.line.me/v2/bot/message/push"
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {LINE_CHANNEL_ACCESS_TOKEN}",
-    }
-    payload = {
-        "to": LINE_USER_ID,
-        "messages": [{"type": "text", "text": message}],
-    }
-
-    # ログ（トークンは伏せる）
     if AKAGI_DEBUG_NOTIFY:
-        notify_log.info(f"[LINE] push -> user={_mask(LINE_USER_ID, 6)} payload={json.dumps(payload, ensure_ascii=False)}")
+        notify_log.info(f"[LINE] enqueue -> user={_mask(LINE_USER_ID, 6)} text={message!r}")
     else:
-        notify_log.info(f"[LINE] push -> user={_mask(LINE_USER_ID, 6)}")
+        notify_log.info(f"[LINE] enqueue -> user={_mask(LINE_USER_ID, 6)}")
+    _notify_outbox().enqueue("line", {"text": message}, coalesce_key)
+    return True
+
 
-    try:
-        resp = requests.post(url, headers=headers, json=payload, timeout=10)
-        ok = (resp.status_code == 200)
-        if ok:
-            notify_log.info("[LINE] sent OK (200)")
-        else:
-            notify_log.error(f"[LINE] API error: {resp.status_code} {resp.text[:500]}")
-        return ok
-    except requests.Timeout:
-        notify_log.error("[LINE] timeout")
-        return False
-    except Exception as e:
-        notify_log.exception(f"[LINE] exception: {e}")
-        return False
-    
 def send_slack_message_api(
     message: str,
     channel_id: Optional[str] = None,
     thread_ts: Optional[str] = None,
-    max_retries: int = 3,
-    timeout_sec: int = 10,
+    coalesce_key: Optional[str] = None,
 ) -> bool:
     """
-    Slack の chat.postMessage で通知を送る（簡易リトライ付き、429対応）。
-    依存: requests
+    Slack の chat.postMessage 通知をアウトボックスに積む。
+    呼び出し元（Playwright スレッド）はネットワークを待たない。429/障害時の再送は akagi.outbox が行う。
     """
-    token = SLACK_BOT_TOKEN
     channel = channel_id or SLACK_CHANNEL_ID
-
-    if not token or not channel:
+    if not SLACK_BOT_TOKEN or not channel:
         notify_log.error("[Slack] token or channel_id missing")
         return False
-
-    url = "https://slack.com/api/chat.postMessage"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json; charset=utf-8",
-    }
-    payload: Dict[str, Any] = {"channel": channel, "text": message}
+    payload: Dict[str, Any] = {"text": message}
+    if channel_id:
+        payload["channel"] = channel_id
     if thread_ts:
         payload["thread_ts"] = thread_ts  # スレッド返信したいとき
-
-    # ログ（トークンは伏せる）
     if AKAGI_DEBUG_NOTIFY:
-        notify_log.info(f"[Slack] post -> ch={_mask(channel, 6)} payload={json.dumps(payload, ensure_ascii=False)}")
+        notify_log.info(f"[Slack] enqueue -> ch={_mask(channel, 6)} payload={json.dumps(payload, ensure_ascii=False)}")
     else:
-        notify_log.info(f"[Slack] post -> ch={_mask(channel, 6)}")
-
-    for attempt in range(1, max_retries + 1):
-        try:
-            resp = requests.post(url, headers=headers, json=payload, timeout=timeout_sec)
-            if resp.status_code == 429:
-                # レート制限: Retry-After 秒待つ
-                retry_after = int(resp.headers.get("Retry-After", "1"))
-                notify_log.warning(f"[Slack] 429 Too Many Requests, retry after {retry_after}s (attempt {attempt}/{max_retries})")
-                time.sleep(retry_after)
-                continue
-
-            data = {}
-            try:
-                data = resp.json()
-            except Exception:
-                pass
-
-            if resp.ok and data.get("ok"):
-                notify_log.info(f"[Slack] sent OK (ts={data.get('ts')})")
-                return True
-
-            # それ以外は内容をログ出し
-            snippet = resp.text[:500]
-            notify_log.error(f"[Slack] API error: {resp.status_code} {snippet}")
-        except requests.Timeout:
-            notify_log.error("[Slack] timeout")
-        except Exception as e:
-            notify_log.exception(f"[Slack] exception: {e}")
-
-        # 次の試行まで指数バックオフ
-        sleep_sec = 2 ** attempt
-        notify_log.warning(f"[Slack] retrying in {sleep_sec}s (attempt {attempt}/{max_retries})")
-        time.sleep(sleep_sec)
-
-    return False
+        notify_log.info(f"[Slack] enqueue -> ch={_mask(channel, 6)}")
+    _notify_outbox().enqueue("slack", payload, coalesce_key)
+    return True
 
 
 def try_extract_end_result_from_text_frame(payload: str) -> Tuple[Optional[int], Optional[int]]:
@@ -775,14 +564,383 @@ class PostGameGuard:
         return (time.time() - self._last_activity) >= sec
 
 
+# ---- 終局後フロー（待ちは固定 sleep ではなく準備完了シグナルで進める） ----
+POSTGAME_IDLE_SEC     = float(os.getenv("AKAGI_POSTGAME_IDLE_SEC", "2.0"))      # 終局後この秒数 WS が静かなら開始（WS で結果が取れた時は待たない）
+POSTGAME_SETTLE_SEC   = float(os.getenv("AKAGI_POSTGAME_SETTLE_SEC", "3.0"))    # 結果画面：WS がこの秒数静かになれば次へ
+POSTGAME_SETTLE_MAX   = float(os.getenv("AKAGI_POSTGAME_SETTLE_MAX", "13.0"))   # 〃 上限（旧: 10s + 3s 固定）
+POSTGAME_RELOAD_TIMEOUT = float(os.getenv("AKAGI_POSTGAME_RELOAD_TIMEOUT", "25.0"))  # reload 後ロビー準備の上限（超えたらもう一度 reload）
+POSTGAME_POLL_SEC     = 0.5
+
+
+def build_result_message(info: Optional[dict], last_end_point: Optional[int]) -> Optional[str]:
+    """game_result（bridge）または fetch_my_latest_result の結果から通知本文を作る（取れなければ None）"""
+    if not info:
+        return None
+    rank  = _as_int(info.get("rank"))
+    score = _as_int(info.get("score"))
+    delta = _as_int(info.get("grading_delta"))
+    total_score = _as_int(info.get("grading_after"))
+
+    # 追加: WS 由来ポイントの保険
+    if score is None and last_end_point is not None:
+        score = _as_int(last_end_point)
+
+    # ★ 順位に応じて補正を追加
+    bonus = {1: 10000, 2: 20000, 3: 30000, 4: 40000}.get(rank, 0)
+
+    # delta の表示形式を調整 (+付き)
+    delta_txt = "不明"
+    if delta is not None:
+        delta_txt = f"{delta:+}"
+
+    disp_score = None if score is None else (score + bonus)
+    rank_txt  = f"{rank}位" if rank is not None else "不明"
+    score_txt = f"{disp_score:,}" if disp_score is not None else "不明"
+
+    return (
+        f"結果順位: {rank_txt}\n"
+        f"最終スコア: {score_txt}\n"
+        f"加算ポイント: {delta_txt}\n"
+        f"現在のポイント: {total_score}\n"
+        f"時刻: {time.strftime('%Y/%m/%d %H:%M')}"
+    )
+
+
+class PostGameFlow:
+    """
+    終局後の後片付けを状態遷移で進める。PlaywrightController のアイドル時に step() を呼ぶ。
+    待ちは状態と期限で表し step() の中では待たないので、その間もコマンドキューと WS は処理される。
+    例外は RESULT の牌譜 API（WS で結果を拾えなかった時だけ。ロビー要求 2 往復の間 step() が止まる）。
+
+      IDLE     -- _ended かつ（WS の結果あり or POSTGAME_IDLE_SEC 静か） --> RESULT
+      RESULT   結果（WS の game_result、無ければ API）→ 通知はアウトボックスへ --> SETTLE
+      SETTLE   WS が POSTGAME_SETTLE_SEC 静か（上限 MAX）    --> RELOAD
+      RELOAD   page.reload(wait_until="commit")              --> LOBBY
+      LOBBY    reload 後の WS 接続 + account_id>0            --> GATE
+               （POSTGAME_RELOAD_TIMEOUT 超過なら 1 回だけ再 reload）
+      GATE     account_id>0（上限 LOBBY_READY_TIMEOUT）→ 段位ゲート
+               許可 --> QUIET、不許可 → 完了通知              --> IDLE
+      QUIET    ロビー WS が 1 秒静か（上限 5 秒）→ 段位戦      --> RANKED
+      RANKED   LOBBY_MENU_WAIT_MS 後 → 王の間                 --> ROOM
+      ROOM     LOBBY_MENU_WAIT_MS 後 → 四人南                 --> MATCH
+      MATCH    matchGame:Res（MATCH_ACK_TIMEOUT 毎に 1 回だけ押し直す） --> IDLE
+    """
+    IDLE, RESULT, SETTLE, RELOAD, LOBBY, GATE = "idle", "result", "settle", "reload", "lobby", "gate"
+    QUIET, RANKED, ROOM, MATCH = "quiet", "ranked", "room", "match"
+
+    def __init__(self, controller: "PlaywrightController") -> None:
+        self.c = controller
+        self.state = self.IDLE
+        self._entered = 0.0
+        self._started_at = 0.0
+        self._reloads = 0
+        self._reload_at = 0.0
+        self._next_poll = 0.0
+        self._clicked_at = 0.0
+        self._reclicked = False
+
+    @property
+    def active(self) -> bool:
+        return self.state != self.IDLE
+
+    def _goto(self, state: str) -> None:
+        now = time.monotonic()
+        logger.debug(f"[PostGame] {self.state} -> {state} ({(now - self._entered) * 1000:.0f}ms)")
+        self.state = state
+        self._entered = now
+
+    def abort(self, err: Exception) -> None:
+        """step() が例外を出したら最初からやり直さず打ち切る（同じ失敗を 20ms 毎に繰り返さない）"""
+        logger.error(f"[post-game] error in {self.state}: {err}")
+        self.c._started = False
+        self.c._ended = False
+        self.c._game_result = None
+        self.c._postgame_guard.bump()
+        self._goto(self.IDLE)
+
+    def _finish(self, now: float) -> None:
+        self.c._postgame_guard.bump()
+        logger.info(f"[PostGame] done in {now - self._started_at:.1f}s")
+        self._goto(self.IDLE)
+
+    @staticmethod
+    def _account_ready(page: Page) -> bool:
+        """account_id>0 かつ NetAgent 接続済みか（オブザーバがあれば通知済みの状態、無ければ probe 1 回）"""
+        sig = signals_for(page)
+        if sig.observer:
+            st = sig.state
+        else:
+            try:
+                st = page.evaluate(ACCOUNT_PROBE_JS)
+            except Exception:
+                st = None
+        return isinstance(st, dict) and (_as_int(st.get("id")) or 0) > 0 and bool(st.get("hasNet"))
+
+    def step(self) -> None:
+        c = self.c
+        page = c.page
+        if page is None:
+            return
+        now = time.monotonic()
+
+        if self.state == self.IDLE:
+            # WS で結果が取れていれば静かになるのを待たずに進む
+            if c._ended and (c._game_result is not None or c._postgame_guard.idle_for(POSTGAME_IDLE_SEC)):
+                logger.info("[PostGame] handling post-game flow...")
+                self._started_at = now
+                self._goto(self.RESULT)
+            return
+
+        if self.state == self.RESULT:
+            info, source = c._game_result, "ws"
+            if info is None:
+                # WS で拾えなかった時だけ牌譜 API で取り直す
+                info, source = fetch_my_latest_result(page), "api"
+                if info:
+                    peek = _peek_both_scores(page)
+                    notify_log.info(f"[peek] level_score_4p={peek and peek.get('level_score_4p')} "
+                                    f"level_score_3p={peek and peek.get('level_score_3p')} "
+                                    f"is_sanma_guess={info.get('is_sanma')}")
+            c._game_result = None
+            if info and info.get("rank") is not None:
+                get_result_store().record(info, source=source)
+            body = build_result_message(info, c._last_end_point)
+            if body:
+                # send_line_message_api(message=body)
+                send_slack_message_api(message=body)
+            else:
+                notify_log.warning("[PostGame] 結果情報の取得に失敗しました（API応答なし）")
+            c._started = False
+            c._ended = False
+            self._goto(self.SETTLE)
+            return
+
+        if self.state == self.SETTLE:
+            waited = now - self._entered
+            if c._postgame_guard.idle_for(POSTGAME_SETTLE_SEC) or waited >= POSTGAME_SETTLE_MAX:
+                self._reloads = 0
+                self._goto(self.RELOAD)
+            return
+
+        if self.state == self.RELOAD:
+            # ★ ページを再読み込み（F5 相当）。commit で返し、準備完了は LOBBY で待つ
+            try:
+                self._reload_at = now
+                self._reloads += 1
+                # reload 前の GameMgr 状態で誤って準備完了と判定しないように捨てる
+                signals_for(page).state = {}
+                page.reload(wait_until="commit")
+            except Exception as e:
+                logger.error(f"[Recovery] reload failed: {e}")
+            self._next_poll = now + POSTGAME_POLL_SEC
+            self._goto(self.LOBBY)
+            return
+
+        if self.state == self.LOBBY:
+            if now < self._next_poll:
+                return
+            self._next_poll = now + POSTGAME_POLL_SEC
+            ws_ok = c._ws_opened_at is not None and c._ws_opened_at >= self._reload_at
+            if ws_ok and self._account_ready(page):
+                notify_log.info(f"[READY] lobby ready {now - self._reload_at:.1f}s after reload #{self._reloads}")
+                self._next_poll = now
+                self._goto(self.GATE)
+            elif now - self._reload_at >= POSTGAME_RELOAD_TIMEOUT:
+                if self._reloads < 2:
+                    notify_log.warning(f"[READY] lobby not ready after {POSTGAME_RELOAD_TIMEOUT:.0f}s, reloading again")
+                    self._goto(self.RELOAD)
+                else:
+                    # 残りは GATE で LOBBY_READY_TIMEOUT まで待つ
+                    self._next_poll = now
+                    self._goto(self.GATE)
+            return
+
+        if self.state == self.GATE:
+            if now < self._next_poll:
+                return
+            self._next_poll = now + POSTGAME_POLL_SEC
+            if not self._account_ready(page):
+                if now - self._entered < LOBBY_READY_TIMEOUT / 1000.0:
+                    return
+                # 段位が読めないまま「到達」通知は出さない
+                notify_log.warning("[gate] account 未準備（account_id<=0）のため自動開始しません")
+                self._finish(now)
+                return
+            # ★ ここでゲート判定 → 許可時のみ開始（準備は確認済みなので待たない）
+            try:
+                allowed = allow_auto_start_by_rank(page, ready_timeout_ms=0)
+            except Exception as e:
+                logger.error(f"[gate] error: {e}")
+                self._finish(now)
+                return
+            if allowed:
+                logger.info("[auto-start] begin (post-game)")
+                self._goto(self.QUIET)
+                return
+            notify_log.warning(f"[auto-start]{c._tag} skipped by rank gate (post-game)")
+            # 複数卓では卓（プロファイル）ごとに 1 通。キーを共有すると他の卓の完了通知を上書きしてしまう
+            table = c.name or c.user_data_dir.name
+            body = (
+                "雀魂 依頼完了\n"
+                f"御依頼の段位ランクに到達しました。代打ちを終了します。\n"
+                f"卓: {table}（{c.user_data_dir}）\n"
+                f"時刻: {time.strftime('%Y/%m/%d %H:%M')}"
+            )
+            send_slack_message_api(message=body, coalesce_key=f"rank-gate-done:{c.user_data_dir}")
+            self._finish(now)
+            return
+
+        # ---- 自動開始（run_auto_start_sequence と同じ手順を 1 クリックずつ） ----
+        if self.state == self.QUIET:
+            last_ws = signals_for(page).last("ws") or 0.0
+            if now - last_ws < 1.0 and now - self._entered < 5.0:
+                return
+            _click_design(page, 900, 180)  # 段位戦
+            self._goto(self.RANKED)
+            return
+
+        if self.state == self.RANKED:
+            if now - self._entered < LOBBY_MENU_WAIT_MS / 1000.0:
+                return
+            _click_design(page, 900, 600)  # 王の間
+            self._goto(self.ROOM)
+            return
+
+        if self.state == self.ROOM:
+            if now - self._entered < LOBBY_MENU_WAIT_MS / 1000.0:
+                return
+            self._reclicked = False
+            self._clicked_at = now
+            _click_design(page, 900, 400)  # 四人南
+            self._goto(self.MATCH)
+            return
+
+        if self.state == self.MATCH:
+            # マッチング要求の応答（.lq.Lobby.matchGame）で完了を確認。来なければ 1 回だけ押し直す
+            if signals_for(page).seen_since(".lq.Lobby.matchGame:Res", self._clicked_at):
+                self._finish(now)
+                return
+            if now - self._entered < MATCH_ACK_TIMEOUT / 1000.0:
+                return
+            if self._reclicked:
+                logger.warning("[auto-start] no matchGame response after retry")
+                self._finish(now)
+                return
+            logger.warning("[auto-start] no matchGame response, clicking again")
+            self._reclicked = True
+            self._clicked_at = now
+            _click_design(page, 900, 400)
+            self._goto(self.MATCH)
+            return
+
+
 # =========================
 # PlaywrightController
 # =========================
 
 # フロー管理（bridge は既存実装に準拠）
 activated_flows: list[str] = []  # store all flow.id ([-1] is the recently opened)
-majsoul_bridges: dict[WebSocket, MajsoulBridge] = {}  # store all flow.id -> MajsoulBridge
-mjai_messages: queue.Queue[dict] = queue.Queue()  # store all messages
+# (seq, received_at, msg)。seq は積んだ時点の event_seq、received_at は time.monotonic()。
+# WS 以外から積んだメッセージ（リーチ宣言の反映など）は seq/received_at が None
+QueuedMessage = tuple[Optional[int], Optional[float], dict]
+mjai_messages: queue.Queue[QueuedMessage] = queue.Queue()  # store all messages（既定のコントローラ用。複数卓では卓ごとに別キュー）
+GESTURE_SLICE = 0.05  # gesture の待機を区切る間隔（秒）。キャンセル判定の粒度
+
+# ヘッドレス（サーバ向け）。ウィンドウを出さず、小さいビューポート・低フレームレートで描画コストを下げる
+HEADLESS = os.getenv("AKAGI_HEADLESS", "0") == "1"
+HEADLESS_VIEWPORT = os.getenv("AKAGI_HEADLESS_VIEWPORT", "960x540")  # "WxH"。空なら settings の viewport
+# Laya.stage.frameRate: "fast"(60) / "slow"(30) / "mouse"(入力直後だけ fast) / 空 = 変更しない
+FRAME_RATE = os.getenv("AKAGI_FRAME_RATE", "slow" if HEADLESS else "").strip().lower()
+# ブラウザの CPU/RSS を "[cost]" としてログに出す間隔（秒）。0 で無効
+COST_INTERVAL = float(os.getenv("AKAGI_COST_INTERVAL", "60"))
+
+_HEADLESS_ARGS = [
+    '--mute-audio',
+    '--force-device-scale-factor=1',     # HiDPI でも 1 ピクセル = 1 CSS px で描く
+    '--use-angle=swiftshader',           # GPU の無いサーバでも WebGL（Laya）を使えるように
+    '--enable-unsafe-swiftshader',
+    '--disable-dev-shm-usage',           # コンテナの小さい /dev/shm 対策
+    '--disable-extensions',
+    '--no-first-run',
+    '--no-default-browser-check',
+]
+
+# Laya のステージが出来たらフレームレートを下げる（ゲーム側に戻されたら掛け直す）
+_FRAME_RATE_JS = """
+(rate) => {
+  const apply = () => {
+    const stage = globalThis.Laya && Laya.stage;
+    if (stage && stage.frameRate !== rate) stage.frameRate = rate;
+  };
+  apply();
+  setInterval(apply, 2000);
+}
+"""
+
+# ページ側でウィンドウサイズの変化を Python に通知する
+_RESIZE_LISTENER_JS = """
+(() => {
+  const notify = () => {
+    if (window.__akagiViewportResized) {
+      window.__akagiViewportResized(window.innerWidth, window.innerHeight);
+    }
+  };
+  window.addEventListener('resize', notify);
+  window.addEventListener('load', notify);
+})();
+"""
+
+
+def _parse_size(text: str, default: tuple[int, int]) -> tuple[int, int]:
+    """"960x540" -> (960, 540)。空や不正なら default"""
+    try:
+        w, h = (int(v) for v in text.lower().split("x"))
+        if w > 0 and h > 0:
+            return w, h
+    except ValueError:
+        pass
+    return default
+
+
+class ViewportGeometry:
+    """
+    ビューポートに内接する 16:9 矩形への変換。サイズごとに 1 回だけ作る。
+    primed に渡したグリッド座標は作成時にピクセルへ変換済み。
+    """
+    TARGET_ASPECT = 16 / 9
+
+    def __init__(self, width: int, height: int, primed: tuple[tuple[float, float], ...] = ()) -> None:
+        self.width = width
+        self.height = height
+        self.rect_width = width
+        self.rect_height = height
+        self.offset_x = 0.0
+        self.offset_y = 0.0
+        # Determine the dimensions of the 16:9 inscribed rectangle
+        if width / height > self.TARGET_ASPECT:
+            # Viewport is wider than 16:9 (letterboxed)
+            self.rect_width = int(height * self.TARGET_ASPECT)
+            self.offset_x = (width - self.rect_width) / 2
+        else:
+            # Viewport is taller than 16:9 (pillarboxed)
+            self.rect_height = int(width / self.TARGET_ASPECT)
+            self.offset_y = (height - self.rect_height) / 2
+        self._sx = self.rect_width / 16
+        self._sy = self.rect_height / 9
+        self._cache: dict[tuple[float, float], tuple[float, float]] = {}
+        for x, y in primed:
+            self.to_pixel(x, y)
+
+    def to_pixel(self, x: float, y: float) -> tuple[float, float] | None:
+        key = (x, y)
+        pixel = self._cache.get(key)
+        if pixel is not None:
+            return pixel
+        if not (0 <= x <= 16 and 0 <= y <= 9):
+            return None
+        pixel = (self.offset_x + x * self._sx, self.offset_y + y * self._sy)
+        self._cache[key] = pixel
+        return pixel
 
 
 class PlaywrightController:
@@ -792,15 +950,25 @@ class PlaywrightController:
     and handles clicking based on a normalized 16x9 grid.
     """
 
-    def __init__(self, url: str, width: int = 1600, height: int = 900) -> None:
+    def __init__(self, url: str, width: int = 1600, height: int = 900,
+                 user_data_dir: Path | None = None, messages: queue.Queue[dict] | None = None,
+                 name: str = "") -> None:
         """
         Initializes the controller.
         Args:
             url (str): The fixed URL the browser page will navigate to.
+            user_data_dir (Path | None): Persistent profile directory (default ./playwright_data).
+            messages (queue.Queue | None): Where parsed mjai messages go (default: module-level mjai_messages).
+            name (str): Table name for logs and frame recordings (multi-table mode).
         """
         self.url = url
         self.width = width
         self.height = height
+        self.user_data_dir = Path(user_data_dir) if user_data_dir else Path().cwd() / "playwright_data"
+        self.messages: queue.Queue[QueuedMessage] = mjai_messages if messages is None else messages
+        self.name = name
+        # この context の WebSocket -> MajsoulBridge
+        self.bridges: dict[WebSocket, MajsoulBridge] = {}
         self.command_queue: queue.Queue[dict] = queue.Queue()
         self.running = False
 
@@ -810,36 +978,93 @@ class PlaywrightController:
 
         self.bridge_lock = threading.Lock()
         self._postgame_guard = PostGameGuard()
+        self._postgame = PostGameFlow(self)
+        self._ws_opened_at: float | None = None  # 直近の WebSocket 接続時刻（reload 後の準備判定用）
         self._ended = False  # ← 終局フラグ（WS/解析で True）
         self._started = False  # ← 追加：次の対戦が始まったか
         self._last_end_rank: Optional[int] = None
         self._last_end_point: Optional[int] = None
+        # NotifyGameEndResult から組み立てた結果（bridge.game_result）。無ければ API で取り直す
+        self._game_result: Optional[dict] = None
         self._auto_started_once = False
+        # 最後に mjai メッセージを積んだ時刻（time.monotonic()）。クリック待ちの上流遅延計測用
+        self.last_message_at: float | None = None
+        # 積んだ mjai メッセージの通し番号。コマンドの "seq" がこれより古ければ陳腐化とみなす
+        self.event_seq = 0
+        # 16:9 レターボックス変換のキャッシュ（resize で作り直す）
+        self._geometry: ViewportGeometry | None = None
+        self._primed_points: tuple[tuple[float, float], ...] = ()
+        # ポインタ入力（AKAGI_INPUT_BACKEND=mouse|cdp）。ページ確定後に作る
+        self.input_backend = INPUT_BACKEND
+        self._input: MouseInput | CDPInput | None = None
+        # gesture の通し番号。id が _gesture_floor 未満のものは打ち切る
+        self._gesture_lock = threading.Lock()
+        self._gesture_seq = 0
+        self._gesture_floor = 0
+        # 生フレームの記録（AKAGI_FRAME_RECORD=1）。WebSocket 毎に stream id を振る
+        self._recorder = FrameRecorder.from_env(name)
+        self._ws_streams: dict[WebSocket, int] = {}
+        # 描画モード（AKAGI_HEADLESS）とブラウザのコスト計測（AKAGI_COST_INTERVAL）
+        self.headless = HEADLESS
+        self.render_mode = ""
+        self._cost = CostMeter(self.user_data_dir) if COST_INTERVAL > 0 else None
+        self._cost_next = 0.0
+        self._perf_cdp: Any = None
+        self._perf_task: tuple[float, float] | None = None
     # -------------- WebSocket -------------
 
     def _on_web_socket(self, ws: WebSocket) -> None:
         """Callback for new WebSocket connections."""
-        global majsoul_bridges
-        logger.info(f"[WebSocket] Connection opened: {ws.url}")
+        logger.info(f"[WebSocket]{self._tag} Connection opened: {ws.url}")
 
         # Create and store a bridge for this new WebSocket flow
-        majsoul_bridges[ws] = MajsoulBridge()
+        bridge = self.bridges[ws] = MajsoulBridge()
+        bridge.on_method = self._on_liqi if self.page else None
+        bridge.on_game_result = self._on_game_result
+        self._ws_opened_at = time.monotonic()
+        if self._recorder is not None:
+            self._ws_streams[ws] = self._recorder.open_stream(ws.url)
 
         # Set up listeners for messages and closure on this specific WebSocket instance
         ws.on("framesent", lambda payload: self._on_frame(ws, payload, from_client=True))
         ws.on("framereceived", lambda payload: self._on_frame(ws, payload, from_client=False))
         ws.on("close", lambda: self._on_socket_close(ws))
 
+    @property
+    def _tag(self) -> str:
+        return f"[{self.name}]" if self.name else ""
+
+    def _on_liqi(self, method: str, msg_type: str, data: Optional[dict] = None) -> None:
+        """bridge が解析した liqi メッセージ：待ちのシグナルと lobby キャッシュに流す"""
+        if self.page is None:
+            return
+        sig = signals_for(self.page)
+        sig.on_method(method, msg_type, data)
+        my_id = _as_int(sig.state.get("id"))
+        lobby_probe(self.page).on_liqi(method, msg_type, data, my_id if my_id and my_id > 0 else None)
+
+    def _on_game_result(self, result: dict) -> None:
+        """bridge からの終局結果。対局前の段位ポイント（lobby キャッシュ）を足して保持する"""
+        if self.page is not None:
+            before = lobby_probe(self.page).last("level_score_3" if result.get("is_sanma") else "level_score_4")
+            result["grading_before"] = before
+            result["grading_after"] = None if before is None else before + result["grading_delta"]
+        self._game_result = result
+        self._ended = True
+        self._last_end_rank = result.get("rank")
+        self._last_end_point = result.get("score")
+        notify_log.info(f"[ws:result]{self._tag} {result}")
+
     def _on_frame(self, ws: WebSocket, payload: str | bytes, from_client: bool) -> None:
         """Callback for WebSocket messages."""
-        global mjai_messages, majsoul_bridges
-
         # アクティビティ更新（ゲームが動いている）
         self._postgame_guard.bump()
+        if self._recorder is not None and ws in self._ws_streams:
+            self._recorder.frame(self._ws_streams[ws], from_client, payload)
 
-        bridge = majsoul_bridges.get(ws)
+        bridge = self.bridges.get(ws)
         if not bridge:
-            logger.error(f"[WebSocket] Message from untracked WebSocket: {ws.url}")
+            logger.error(f"[WebSocket]{self._tag} Message from untracked WebSocket: {ws.url}")
             return
 
         # 文字列フレームに 'end_game' が含まれていれば即フラグ
@@ -873,8 +1098,12 @@ class PlaywrightController:
                                 notify_log.info(f"[ws:parsed] end_game detected rank={self._last_end_rank} point={self._last_end_point}")
                             elif t == "start_game":
                                 self._started = True
+                                self._game_result = None
                                 notify_log.info("[ws:parsed] start_game detected")
-                        mjai_messages.put(m)
+                        # 番号を先に進めてから番号ごと積む（取り出した側が古い event_seq を読まないように）
+                        self.event_seq += 1
+                        self.last_message_at = time.monotonic()
+                        self.messages.put((self.event_seq, self.last_message_at, m))
                     except Exception:
                         pass
         except Exception:
@@ -882,12 +1111,13 @@ class PlaywrightController:
 
     def _on_socket_close(self, ws: WebSocket) -> None:
         """Callback for WebSocket closures."""
-        global majsoul_bridges
-        if ws in majsoul_bridges:
-            logger.info(f"[WebSocket] Connection closed: {ws.url}")
-            del majsoul_bridges[ws]
+        if self._recorder is not None and ws in self._ws_streams:
+            self._recorder.close_stream(self._ws_streams.pop(ws))
+        if ws in self.bridges:
+            logger.info(f"[WebSocket]{self._tag} Connection closed: {ws.url}")
+            del self.bridges[ws]
         else:
-            logger.warning(f"[WebSocket] Untracked WebSocket connection closed: {ws.url}")
+            logger.warning(f"[WebSocket]{self._tag} Untracked WebSocket connection closed: {ws.url}")
 
     # -------------- Coordinates -------------
 
@@ -895,46 +1125,69 @@ class PlaywrightController:
         """
         Converts normalized grid coordinates (0-16 for x, 0-9 for y)
         to pixel coordinates based on the current viewport size.
+        The letterbox transform is cached and only rebuilt on resize.
         """
         if not self.page:
             logger.error("Page is not available to get click coordinates.")
             return (None, None)
 
-        viewport_size = self.page.viewport_size
-        if not viewport_size:
+        geometry = self._geometry or self._refresh_geometry()
+        if geometry is None:
             logger.error("Could not get viewport size.")
             return (None, None)
 
-        viewport_width = viewport_size["width"]
-        viewport_height = viewport_size["height"]
+        pixel = geometry.to_pixel(x, y)
+        if pixel is None:
+            logger.warning(f"Click coordinates ({x}, {y}) are outside the 0-16, 0-9 grid.")
+            return (None, None)
+        return pixel
 
-        target_aspect_ratio = 16 / 9
-        viewport_aspect_ratio = viewport_width / viewport_height
+    def _refresh_geometry(self) -> "ViewportGeometry | None":
+        """
+        現在のビューポートから変換を作り直す。
+        viewport=None（window-size 優先）では page.viewport_size が None なので innerWidth/innerHeight を読む。
+        """
+        size = None
+        try:
+            size = self.page.evaluate("() => [window.innerWidth, window.innerHeight]")
+        except Exception:
+            vp = self.page.viewport_size
+            if vp:
+                size = [vp["width"], vp["height"]]
+        if not size or size[0] <= 0 or size[1] <= 0:
+            return None
+        self._set_geometry(int(size[0]), int(size[1]))
+        return self._geometry
 
-        rect_width = viewport_width
-        rect_height = viewport_height
-        offset_x = 0
-        offset_y = 0
+    def _set_geometry(self, width: int, height: int) -> None:
+        if self._geometry and (self._geometry.width, self._geometry.height) == (width, height):
+            return
+        self._geometry = ViewportGeometry(width, height, self._primed_points)
+        logger.info(f"[Viewport] {width}x{height} -> 16:9 rect {self._geometry.rect_width}x{self._geometry.rect_height} "
+                    f"at ({self._geometry.offset_x:.1f}, {self._geometry.offset_y:.1f})")
 
-        # Determine the dimensions of the 16:9 inscribed rectangle
-        if viewport_aspect_ratio > target_aspect_ratio:
-            # Viewport is wider than 16:9 (letterboxed)
-            rect_width = int(viewport_height * target_aspect_ratio)
-            offset_x = (viewport_width - rect_width) / 2
-        else:
-            # Viewport is taller than 16:9 (pillarboxed)
-            rect_height = int(viewport_width / target_aspect_ratio)
-            offset_y = (viewport_height - rect_height) / 2
+    def _on_viewport_resize(self, source: Any, width: int, height: int) -> None:
+        """ページ側の resize リスナーから呼ばれる（Playwright スレッド）"""
+        try:
+            self._set_geometry(int(width), int(height))
+        except Exception as e:
+            logger.error(f"[Viewport] resize handling failed: {e}")
 
-        # Normalize grid coordinates (0-16 for x, 0-9 for y)
-        if not (0 <= x <= 16 and 0 <= y <= 9):
-            logger.warning(f"Click coordinates ({x}, {y}) are outside the 0-16, 0-9 grid.")
-            return (None, None)
+    def _install_resize_listener(self) -> None:
+        try:
+            self.page.expose_binding("__akagiViewportResized", self._on_viewport_resize)
+            self.page.add_init_script(_RESIZE_LISTENER_JS)
+        except Exception as e:
+            logger.warning(f"[Viewport] resize listener not installed, falling back to per-navigation refresh: {e}")
 
-        # Calculate the absolute pixel coordinates
-        click_x = offset_x + (x / 16) * rect_width
-        click_y = offset_y + (y / 9) * rect_height
-        return (click_x, click_y)
+    def prime_points(self, points) -> None:
+        """
+        よく使うグリッド座標（autoplay の LOCATION など）を登録し、
+        現在と以降のサイズで前もってピクセルに変換しておく。
+        """
+        self._primed_points = tuple(points)
+        if self._geometry is not None:
+            self._geometry = ViewportGeometry(self._geometry.width, self._geometry.height, self._primed_points)
 
     def _move_mouse(self, click_x: float, click_y: float) -> None:
         """Moves the mouse to the specified pixel coordinates."""
@@ -943,7 +1196,7 @@ class PlaywrightController:
             return
         try:
             logger.info(f"Moving mouse to pixel ({click_x:.2f}, {click_y:.2f})")
-            self.page.mouse.move(click_x, click_y)
+            self._input.move(click_x, click_y)
         except Exception as e:
             logger.error(f"Failed to move mouse: {e}")
 
@@ -954,18 +1207,77 @@ class PlaywrightController:
             return
         try:
             logger.info(f"Clicking at pixel ({click_x:.2f}, {click_y:.2f})")
-            self.page.mouse.click(click_x, click_y)
+            self._input.click(click_x, click_y)
         except Exception as e:
             logger.error(f"Failed to perform click: {e}")
     
-    def _wait_started(self, timeout_sec: float = 30.0) -> bool:
-        end = time.time() + timeout_sec
-        while time.time() < end:
-            if self._started:
+    # -------------- Gestures -------------
+
+    def _is_stale(self, command_data: dict) -> bool:
+        """コマンドが答えているイベントより後に新しい mjai メッセージが来ていれば True"""
+        seq = command_data.get("seq")
+        return seq is not None and seq < self.event_seq
+
+    def _gesture_superseded(self, command_data: dict) -> bool:
+        return (
+            command_data.get("id", 0) < self._gesture_floor
+            or self._is_stale(command_data)
+            or not self.running
+        )
+
+    def _gesture_wait(self, command_data: dict, delay: float) -> bool:
+        """delay 秒待つ。途中で新しい gesture／mjai イベントが来たら False（WS コールバックは待機中も処理される）"""
+        end = time.monotonic() + max(0.0, delay)
+        while True:
+            if self._gesture_superseded(command_data):
+                return False
+            left = end - time.monotonic()
+            if left <= 0:
                 return True
-            if self.page:
-                self.page.wait_for_timeout(200)
-        return False
+            self.page.wait_for_timeout(int(min(left, GESTURE_SLICE) * 1000) or 1)
+
+    def _run_gesture(self, command_data: dict) -> None:
+        """
+        steps: [[x, y, delay], ...]（x, y は 16x9 グリッド、x < 0 は待つだけ）
+        各クリックは先にマウスを移動してから delay 待ち、押す。
+        """
+        gesture_id = command_data.get("id", 0)
+        steps = command_data.get("steps") or []
+        if not self.page:
+            logger.error("Page is not available to run gesture.")
+            return
+        t0 = time.monotonic()
+        for i, step in enumerate(steps):
+            try:
+                x, y, delay = float(step[0]), float(step[1]), float(step[2])
+            except (TypeError, ValueError, IndexError):
+                logger.error(f"Invalid gesture step: {step}")
+                return
+            pixel = None
+            if x >= 0:
+                click_x, click_y = self._get_clickxy(x, y)
+                if click_x is None or click_y is None:
+                    logger.error(f"Invalid click coordinates: {[x, y]}")
+                    return
+                pixel = (click_x, click_y)
+                # 待ちの間にカーソルを乗せておく（hover 用の固定待ちは不要）
+                self._move_mouse(click_x, click_y)
+            if not self._gesture_wait(command_data, delay):
+                logger.info(f"[Gesture] #{gesture_id} dropped at step {i + 1}/{len(steps)} "
+                            f"(seq={command_data.get('seq')} now={self.event_seq})")
+                return
+            if pixel is not None:
+                logger.info(f"Clicking at normalized grid point {[x, y]} -> pixel ({pixel[0]:.2f}, {pixel[1]:.2f})")
+                self._click(*pixel)
+        logger.debug(f"[Gesture] #{gesture_id} done: {len(steps)} steps in {(time.monotonic() - t0) * 1000:.0f}ms")
+
+    def _wait_started(self, timeout_sec: float = 30.0) -> bool:
+        if self._started:
+            return True
+        if not self.page:
+            return False
+        # start_game は _on_frame が立てる（待機中も WS コールバックは処理される）
+        return wait_until(self.page, lambda: self._started, int(timeout_sec * 1000), label="start_game")
 
 
     # -------------- Main loop -------------
@@ -977,6 +1289,11 @@ class PlaywrightController:
                 command_data = self.command_queue.get_nowait()
                 command = command_data.get("command")
 
+                # 後続の mjai イベントで無意味になったクリック／待ちは実行しない
+                if self._is_stale(command_data):
+                    logger.info(f"Dropping stale '{command}' command (seq={command_data['seq']} now={self.event_seq})")
+                    continue
+
                 if command == "click":
                     point = command_data.get("point")
                     if point and len(point) == 2:
@@ -985,13 +1302,16 @@ class PlaywrightController:
                             logger.error(f"Invalid click coordinates: {point}")
                             continue
                         self._move_mouse(click_x, click_y)
-                        if self.page:
-                            self.page.wait_for_timeout(100)
+                        if self.page and self._input.hover_ms:
+                            self.page.wait_for_timeout(self._input.hover_ms)
                         logger.info(f"Clicking at normalized grid point {point} -> pixel ({click_x:.2f}, {click_y:.2f})")
                         self._click(click_x, click_y)
                     else:
                         logger.error(f"Invalid 'click' command data: {command_data}")
 
+                elif command == "gesture":
+                    self._run_gesture(command_data)
+
                 elif command == "delay":
                     delay = command_data.get("delay", 0)
                     if isinstance(delay, (int, float)) and delay >= 0:
@@ -1014,104 +1334,68 @@ class PlaywrightController:
                 if self.page:
                     self.page.wait_for_timeout(20)
                     try:
-                        # 終局フラグが立っており、直近2秒アイドルなら後片付け実行
-                        if self._ended and self._postgame_guard.idle_for(2.0):
-                            logger.info("[PostGame] handling post-game flow...")
-                            info = fetch_my_latest_result(self.page)
-                            if info:
-                                rank  = _as_int(info.get("rank"))
-                                score = _as_int(info.get("score"))
-                                delta = _as_int(info.get("grading_delta"))
-                                total_score = _as_int(info.get("grading_after"))
-
-                                # 追加: WS 由来ポイントの保険
-                                if score is None and self._last_end_point is not None:
-                                    score = _as_int(self._last_end_point)
-                                
-                                # ★ 順位に応じて補正を追加
-                                bonus = 0
-                                if rank == 1:
-                                    bonus = 10000
-                                elif rank == 2:
-                                    bonus = 20000
-                                elif rank == 3:
-                                    bonus = 30000
-                                elif rank == 4:
-                                    bonus = 40000
-
-                                # delta の表示形式を調整 (+付き)
-                                delta_txt = "不明"
-                                if delta is not None:
-                                    delta_txt = f"{delta:+}"
-
-                                disp_score = None if score is None else (score + bonus)
-                                rank_txt  = f"{rank}位" if rank is not None else "不明"
-                                score_txt = f"{disp_score:,}" if disp_score is not None else "不明"
-
-                                # 送信用メッセージ
-                                body = (
-                                    # "雀魂 終局\n"
-                                    f"結果順位: {rank_txt}\n"
-                                    f"最終スコア: {score_txt}\n"
-                                    f"加算ポイント: {delta_txt}\n"
-                                    f"現在のポイント: {total_score}\n"
-                                    f"時刻: {time.strftime('%Y/%m/%d %H:%M')}"
-                                )
-                                peek = _peek_both_scores(self.page)
-                                notify_log.info(f"[peek] level_score_4p={peek and peek.get('level_score_4p')} "
-                                                f"level_score_3p={peek and peek.get('level_score_3p')} "
-                                                f"is_sanma_guess={info.get('is_sanma')}")
-                                # send_line_message_api(message=body)
-                                send_slack_message_api(message=body)
-                                
-                            else:
-                                # 取れなかった場合でも通知（必要なければ省略可）
-                                body = (
-                                    "雀魂 終局\n"
-                                    "結果情報の取得に失敗しました（API応答なし）\n"
-                                    f"時刻: {time.strftime('%Y/%m/%d %H:%M:%S')}"
-                                )
-                                # send_line_message_api(message=body)
-                            
-
-                            self._started = False
-                            self._ended = False
-                            
-                            self.page.wait_for_timeout(10_000)  # 少し待機
-                            # _snap(self.page, "result")
-                            self.page.wait_for_timeout(3_000)  # 少し待機
-                                # ★ ページを再読み込み（F5 相当）
-                            try:
-                                self.page.reload()
-                                self.page.wait_for_timeout(15_000)  # 少し待機
-                                self.page.reload()
-                                self.page.wait_for_timeout(10000)  # 少し待機
-                            except Exception as e:
-                                logger.error(f"[Recovery] reload failed: {e}")
-
-                            # run_fixed_postgame_sequence(self.page)
-
-                            # ★ ここでゲート判定 → 許可時のみ開始
-                            try:
-                                if allow_auto_start_by_rank(self.page):
-                                    run_auto_start_sequence(self.page)
-                                else:
-                                    notify_log.warning("[auto-start] skipped by rank gate (post-game)")
-                                    body = (
-                                        "雀魂 依頼完了\n"
-                                        f"御依頼の段位ランクに到達しました。代打ちを終了します。"
-                                        f"時刻: {time.strftime('%Y/%m/%d %H:%M')}"
-                                    )
-                                    send_slack_message_api(message=body)
-                            except Exception as e:
-                                logger.error(f"[gate] error: {e}")
-
-                            self._postgame_guard.bump()
-                        
+                        # 終局後フロー（1 ステップずつ。待ちは状態遷移側で管理）
+                        self._postgame.step()
                     except Exception as e:
-                        logger.error(f"[post-game] error: {e}")
+                        self._postgame.abort(e)
+                    self._sample_cost()
                 continue
 
+    # -------------- Rendering cost -------------
+
+    def _tune_rendering(self) -> None:
+        """描画コストを下げる：Laya のフレームレート、ヘッドレス時はゲームタブだけ常に active 扱い"""
+        if FRAME_RATE:
+            try:
+                self.page.add_init_script(f"({_FRAME_RATE_JS})({json.dumps(FRAME_RATE)})")
+            except Exception as e:
+                logger.warning(f"[Render] frame rate script not installed: {e}")
+        if not self.headless:
+            return
+        try:
+            # ブラウザ全体のフラグではなく、このページにだけフォーカス／可視状態を固定する
+            cdp = self.page.context.new_cdp_session(self.page)
+            cdp.send("Emulation.setFocusEmulationEnabled", {"enabled": True})
+            cdp.send("Page.setWebLifecycleState", {"state": "active"})
+        except Exception as e:
+            logger.warning(f"[Render] could not keep the game tab active: {e}")
+
+    def _renderer_busy(self, now: float) -> Optional[float]:
+        """ゲームページのレンダラ・メインスレッド稼働率（%）。CDP Performance.getMetrics の TaskDuration の差分"""
+        try:
+            if self._perf_cdp is None:
+                self._perf_cdp = self.page.context.new_cdp_session(self.page)
+                self._perf_cdp.send("Performance.enable")
+            metrics = {m["name"]: m["value"] for m in self._perf_cdp.send("Performance.getMetrics")["metrics"]}
+        except Exception:
+            self._perf_cdp = None
+            return None
+        task = metrics.get("TaskDuration")
+        if task is None:
+            return None
+        prev, self._perf_task = self._perf_task, (now, task)
+        if prev is None or task < prev[1]:
+            # 初回 / ナビゲーションでリセットされた
+            return None
+        return (task - prev[1]) / max(1e-6, now - prev[0]) * 100
+
+    def _sample_cost(self) -> None:
+        now = time.monotonic()
+        if COST_INTERVAL <= 0 or now < self._cost_next:
+            return
+        self._cost_next = now + COST_INTERVAL
+        parts = []
+        m = self._cost.measure() if self._cost is not None else None
+        if m is not None:
+            if "cpu_pct" in m:
+                parts.append(f"cpu={m['cpu_pct']:.1f}%")
+            parts.append(f"rss={m['rss_mb']:.0f}MB procs={m['procs']}")
+        busy = self._renderer_busy(now)
+        if busy is not None:
+            parts.append(f"main_thread={busy:.1f}%")
+        if parts:
+            logger.info(f"[cost]{self._tag} {self.render_mode} " + " ".join(parts))
+
     # -------------- Lifecycle -------------
 
     def start(self) -> None:
@@ -1119,28 +1403,44 @@ class PlaywrightController:
         Starts the Playwright instance, opens the browser, and begins
         the command processing loop.
         """
-        logger.info("Controller Starting...")
+        logger.info(f"Controller Starting...{self._tag} profile={self.user_data_dir}")
         self.running = True
 
         try:
             with sync_playwright() as p:
                 self.playwright = p
+                if self.headless:
+                    vw, vh = _parse_size(HEADLESS_VIEWPORT, (self.width, self.height))
+                    launch = dict(
+                        headless=True,
+                        viewport={"width": vw, "height": vh},  # 16:9 のまま縮める（座標は ViewportGeometry が合わせる）
+                        args=_HEADLESS_ARGS,
+                    )
+                    self.render_mode = f"headless {vw}x{vh}"
+                else:
+                    launch = dict(
+                        headless=False,                      # アプリウィンドウで表示
+                        viewport=None,                       # ← window-size を優先させる
+                        args=[
+                            f'--app={"https://game.mahjongsoul.com"}',      # ← ここがポイント（例: https://game.mahjongsoul.com）
+                            f'--window-size={self.width},{self.height}',
+                            '--no-first-run',
+                            '--no-default-browser-check',
+                            '--noerrdialogs',
+                            # 必要なら: '--start-fullscreen',  # さらに広く表示したいとき
+                            # 必要なら: '--kiosk',             # 完全全画面（Escで解除不可。用途に注意）
+                        ],
+                    )
+                    self.render_mode = f"headed {self.width}x{self.height}"
+                if FRAME_RATE:
+                    self.render_mode += f" fps={FRAME_RATE}"
                 self.browser = self.playwright.chromium.launch_persistent_context(
-                    user_data_dir=Path().cwd() / "playwright_data",
-                    headless=False,                      # アプリウィンドウで表示
-                    viewport=None,                       # ← window-size を優先させる
+                    user_data_dir=self.user_data_dir,
                     ignore_default_args=['--enable-automation'],
-                    args=[
-                        f'--app={"https://game.mahjongsoul.com"}',      # ← ここがポイント（例: https://game.mahjongsoul.com）
-                        f'--window-size={self.width},{self.height}',
-                        '--no-first-run',
-                        '--no-default-browser-check',
-                        '--noerrdialogs',
-                        # 必要なら: '--start-fullscreen',  # さらに広く表示したいとき
-                        # 必要なら: '--kiosk',             # 完全全画面（Escで解除不可。用途に注意）
-                    ],
                     chromium_sandbox=True,
+                    **launch,
                 )
+                logger.info(f"[Browser]{self._tag} {self.render_mode}")
 
                 pages: list[Page] = self.browser.pages
                 if not pages:
@@ -1153,6 +1453,13 @@ class PlaywrightController:
 
                 self.page = pages[0]
                 self.page.on("websocket", self._on_web_socket)
+                self._install_resize_listener()
+                self._input = make_input(self.page, self.input_backend)
+                install_observer(self.page)
+                self._tune_rendering()
+                logger.info(f"[Input] backend: {self._input.name}")
+                # ナビゲーション後は次のクリックでサイズを取り直す
+                self.page.on("load", lambda _page: setattr(self, "_geometry", None))
 
                 logger.info(f"Navigating to {self.url}...")
                 register_page(self.page)  # hooks: 外部オート等が必要な場合の受け渡し
@@ -1161,9 +1468,7 @@ class PlaywrightController:
                 # --- 起動直後の自動“対戦開始”（一度だけ） ---
                 try:
                     if not self._auto_started_once and not self._started:
-                        # ロビーUIが整うまで少し待つ（必要に応じて調整）
-                        self.page.wait_for_timeout(3000)
-                        # ★ ゲート判定してから開始
+                        # ★ ゲート判定してから開始（ロビー準備はゲート／開始シーケンス側で待つ）
                         if allow_auto_start_by_rank(self.page):
                             run_auto_start_sequence(self.page)
                             self._auto_started_once = True
@@ -1181,6 +1486,11 @@ class PlaywrightController:
         finally:
             logger.info("Shutting down...")
             self.running = False
+            if self._recorder is not None:
+                self._recorder.close()
+            avg = self._cost.average_cpu_pct() if self._cost is not None else None
+            if avg is not None:
+                logger.info(f"[cost]{self._tag} {self.render_mode} average cpu={avg:.1f}%")
             logger.info("Controller Stopped.")
 
     def stop(self) -> None:
@@ -1193,6 +1503,28 @@ class PlaywrightController:
 
     # -------------- Public API -------------
 
+    def gesture(self, steps: list[list[float]], supersede: bool = True, seq: int | None = None) -> int:
+        """
+        Queue a click sequence [[x, y, delay], ...] to run in one step on the
+        Playwright thread. With supersede=True any gesture still running or
+        queued is cancelled; otherwise it runs after them. `seq` is the
+        event_seq the decision answers; the gesture is dropped as soon as a
+        newer mjai message arrives. Returns the gesture id.
+        """
+        with self._gesture_lock:
+            self._gesture_seq += 1
+            gesture_id = self._gesture_seq
+            if supersede:
+                self._gesture_floor = gesture_id
+        if self.running:
+            command = {"command": "gesture", "id": gesture_id, "steps": steps}
+            if seq is not None:
+                command["seq"] = seq
+            self.command_queue.put(command)
+        else:
+            logger.warning("Controller is not running. Cannot queue gesture command.")
+        return gesture_id
+
     def click(self, x: float, y: float) -> None:
         """
         Queue a click command on normalized grid (0..16, 0..9).
@@ -1211,6 +1543,36 @@ def _ensure_viewport(page: Page, need_w: int, need_h: int) -> None:
     if new_w != cur_w or new_h != cur_h:
         page.set_viewport_size({"width": new_w, "height": new_h})
 
+def _click_design(page: Page, x: int, y: int, marker: Optional[str] = None) -> None:
+    """
+    1600x900 で採寸した固定座標を押す。
+    ヘッドレス（小さいビューポート）では 16:9 矩形に合わせて縮め、ヘッドありでは従来どおり足りなければ広げる。
+    """
+    px, py = float(x), float(y)
+    if HEADLESS:
+        vp = page.viewport_size or {"width": 1600, "height": 900}
+        pixel = ViewportGeometry(vp["width"], vp["height"]).to_pixel(x / 100, y / 100)
+        if pixel is not None:
+            px, py = pixel
+    else:
+        _ensure_viewport(page, need_w=x + 10, need_h=y + 10)
+    if marker:
+        _snap_with_marker(page, px, py, marker)
+    page.mouse.click(px, py)
+
+LOBBY_MENU_WAIT_MS  = int(os.getenv("AKAGI_LOBBY_MENU_WAIT_MS", "1200"))   # メニュー遷移（WS を伴わない画面内アニメーション）
+LOBBY_READY_TIMEOUT = int(os.getenv("AKAGI_LOBBY_READY_TIMEOUT_MS", "30000"))
+MATCH_ACK_TIMEOUT   = int(os.getenv("AKAGI_MATCH_ACK_TIMEOUT_MS", "5000"))   # matchGame 応答待ち
+
+
+def _wait_lobby_settled(page: Page, timeout_ms: int = LOBBY_READY_TIMEOUT) -> bool:
+    """ログイン済み（GameMgr）かつロビー WS が 1 秒静かになるまで待つ"""
+    sig = signals_for(page)
+    ready = wait_for_account_ready(page, timeout_ms=timeout_ms)
+    quiet = wait_for_quiet(page, lambda: sig.last("ws") or 0.0, 1000, timeout_ms=5000)
+    return ready and quiet
+
+
 def run_fixed_postgame_sequence(page: Page) -> None:
     """
     終局 → 10秒 → (1456,929) → 5秒 → (1456,929) → 5秒 → (1223,937) → 5秒 → (666,775)
@@ -1219,44 +1581,35 @@ def run_fixed_postgame_sequence(page: Page) -> None:
     # 事前スクショ
     # _snap(page, "before_sequence")
 
-    # 20秒待機
-    page.wait_for_timeout(30_000)
+    # 結果画面の通信が落ち着くまで（最大 30 秒）
+    sig = signals_for(page)
+    wait_for_quiet(page, lambda: sig.last("ws") or 0.0, 3000, timeout_ms=30_000)
 
     # 1回目 確認
-    _ensure_viewport(page, need_w=1500+10, need_h=870+10)
-    _snap_with_marker(page, 1500, 870, "end1_marker")
-    page.mouse.click(1500, 870)
-    page.wait_for_timeout(5_000)
+    _click_design(page, 1500, 870, marker="end1_marker")
+    page.wait_for_timeout(LOBBY_MENU_WAIT_MS)
     # _snap(page, "after_tap1")
     # page.wait_for_timeout(5_000)
 
     # 2回目 確認
-    _ensure_viewport(page, need_w=1500+10, need_h=870+10)
-    _snap_with_marker(page, 1500, 870, "end2_marker")
-    page.mouse.click(1500, 870)
-    page.wait_for_timeout(5_000)
+    _click_design(page, 1500, 870, marker="end2_marker")
+    page.wait_for_timeout(LOBBY_MENU_WAIT_MS)
     # _snap(page, "after_tap2")
     # page.wait_for_timeout(5_000)
 
     # 3回目 確認
-    _ensure_viewport(page, need_w=1300+10, need_h=300+10)
-    _snap_with_marker(page, 1300, 300, "start1_ranked")
-    page.mouse.click(1300, 300)
-    page.wait_for_timeout(5_000)
+    _click_design(page, 1300, 300, marker="start1_ranked")
+    page.wait_for_timeout(LOBBY_MENU_WAIT_MS)
     # _snap(page, "after_tap3")
     # page.wait_for_timeout(5_000)
     # もう一局
-    _ensure_viewport(page, need_w=1300+10, need_h=850+10)
-    _snap_with_marker(page, 1300, 850, "end3_marker")
-    page.mouse.click(1300, 850)
-    page.wait_for_timeout(5_000)
+    _click_design(page, 1300, 850, marker="end3_marker")
+    page.wait_for_timeout(LOBBY_MENU_WAIT_MS)
     # _snap(page, "after_tap3")
     # page.wait_for_timeout(5_000)
 
     # 最後のクリック
-    _ensure_viewport(page, need_w=666+10, need_h=700+10)
-    _snap_with_marker(page, 666, 700, "end4_marker")
-    page.mouse.click(666, 700)
+    _click_design(page, 666, 700, marker="end4_marker")
     # page.wait_for_timeout(5_000)
     # _snap(page, "after_tap4")
 
@@ -1270,7 +1623,9 @@ def run_auto_start_sequence(page: Page) -> None:
     - それぞれマーカー付きで証跡を残す
     """
     logger.info("[auto-start] begin")
-    page.wait_for_timeout(10_000)
+    t0 = time.monotonic()
+    if not _wait_lobby_settled(page):
+        logger.warning("[auto-start] lobby not confirmed ready, continuing anyway")
 
     # お守り対策
     # _ensure_viewport(page, need_w=666+10, need_h=700+10)
@@ -1281,10 +1636,9 @@ def run_auto_start_sequence(page: Page) -> None:
     # _snap(page, "after_tap4")
 
     # 段位戦
-    _ensure_viewport(page, need_w=900+10, need_h=180+10)
     # _snap_with_marker(page, 900, 180, "start1_ranked")
-    page.mouse.click(900, 180)
-    page.wait_for_timeout(3_000)
+    _click_design(page, 900, 180)
+    page.wait_for_timeout(LOBBY_MENU_WAIT_MS)
 
     # 金の間（必要なら）
     # _ensure_viewport(page, need_w=900+10, need_h=500+10)
@@ -1293,15 +1647,19 @@ def run_auto_start_sequence(page: Page) -> None:
     # page.wait_for_timeout(3_000)
 
     # 王の間（本コードではこちらを選択）
-    _ensure_viewport(page, need_w=900+10, need_h=600+10)
     # # _snap_with_marker(page, 900, 600, "start2_king")
-    page.mouse.click(900, 600)
-    page.wait_for_timeout(3_000)
+    _click_design(page, 900, 600)
+    page.wait_for_timeout(LOBBY_MENU_WAIT_MS)
 
     # 四人南
-    _ensure_viewport(page, need_w=900+10, need_h=400+10)
     # _snap_with_marker(page, 900, 400, "start3_4p_south")
-    page.mouse.click(900, 400)
-    page.wait_for_timeout(3_000)
-
-    logger.info("[auto-start] done")
+    clicked_at = time.monotonic()
+    _click_design(page, 900, 400)
+    # マッチング要求の応答（.lq.Lobby.matchGame）で完了を確認。来なければ 1 回だけ押し直す
+    if not wait_for_signal(page, ".lq.Lobby.matchGame:Res", clicked_at, MATCH_ACK_TIMEOUT):
+        logger.warning("[auto-start] no matchGame response, clicking again")
+        clicked_at = time.monotonic()
+        _click_design(page, 900, 400)
+        wait_for_signal(page, ".lq.Lobby.matchGame:Res", clicked_at, MATCH_ACK_TIMEOUT)
+
+    logger.info(f"[auto-start] done in {time.monotonic() - t0:.1f}s")
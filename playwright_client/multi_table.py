@@ -0,0 +1,157 @@
+"""
+Multi-table runner: several Mahjong Soul accounts driven from one process.
+
+Every table is its own browser (a persistent context with its own
+user_data_dir, i.e. its own login) feeding its own pipeline
+
+    PlaywrightController -> Client.messages -> mjai Controller -> AkagiBot -> AutoPlay
+
+in its own thread, like AkagiApp.main_loop but without the TUI. The tables
+share one model per player count (mortal/model.py shared_engine), so torch and
+the weights are loaded once instead of once per account.
+
+    python -m playwright_client.multi_table --tables 2
+    python -m playwright_client.multi_table --profile playwright_data --profile playwright_data_alt
+
+Profiles default to ./playwright_data for the first table and
+./playwright_data_<i> for the others. Log in once per profile; the login is
+kept in the profile directory. With AKAGI_HEADLESS=1 the tables run without
+windows at a reduced viewport and frame rate. Each table logs its Chromium
+cost as "[cost][t<i>]" lines.
+"""
+from __future__ import annotations
+
+import argparse
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import Optional
+
+from mjai_bot.bot import AkagiBot
+from mjai_bot.controller import Controller
+from settings.settings import settings
+
+from .autoplay.autoplay import AutoPlay
+from .client import Client
+from .logger import logger, DEBUG_ENABLED
+
+LOOP_INTERVAL = 1 / 20  # AkagiApp.main_loop と同じ間隔
+
+
+def default_profile(index: int) -> Path:
+    base = Path().cwd() / "playwright_data"
+    return base if index == 0 else base.with_name(f"{base.name}_{index}")
+
+
+class Table:
+    """1 アカウント分のブラウザと bot / autoplay"""
+
+    def __init__(self, name: str, user_data_dir: Path, autoplay: Optional[bool] = None) -> None:
+        self.name = name
+        self.client = Client(user_data_dir=user_data_dir, name=name)
+        self.mjai_controller = Controller()
+        self.mjai_bot = AkagiBot()
+        self.autoplay = AutoPlay()
+        self.autoplay.set_bot(self.mjai_bot)
+        self.autoplay.set_client(self.client)
+        # None: settings.autoplay に従う（TUI から切り替えた値もそのまま効く）
+        self.autoplay_enabled = autoplay
+        self.running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self.client.start()
+        self.running = True
+        self._thread = threading.Thread(target=self._loop, name=f"table-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.client.stop()
+
+    @property
+    def alive(self) -> bool:
+        """ブラウザ（controller スレッド）が動いている間 True。起動直後の running=False も含む"""
+        thread = self.client._thread
+        return self.running and thread is not None and thread.is_alive()
+
+    def _loop(self) -> None:
+        while self.running:
+            try:
+                self.step()
+            except Exception:
+                logger.error(f"[{self.name}] Error in table loop: {traceback.format_exc()}")
+            time.sleep(LOOP_INTERVAL)
+
+    def step(self) -> None:
+        """溜まった mjai メッセージを 1 バッチ処理する"""
+        if not self.client.running or self.client.messages is None:
+            return
+        mjai_msgs = self.client.dump_messages()
+        if not mjai_msgs:
+            return
+        received_at, seq = self.client.last_batch_at, self.client.last_batch_seq
+        mjai_response = self.mjai_controller.react(mjai_msgs)
+        self.mjai_bot.react(input_list=mjai_msgs)
+        if DEBUG_ENABLED:
+            logger.debug(f"[{self.name}] {len(mjai_msgs)} msgs <- {mjai_response}")
+
+        can_act = self.mjai_bot.can_act_3p if self.mjai_bot.is_3p else self.mjai_bot.can_act
+        if mjai_response["type"] == "none" and not can_act:
+            return
+        enabled = settings.autoplay if self.autoplay_enabled is None else self.autoplay_enabled
+        if not enabled:
+            return
+        if not self.autoplay.act(mjai_response, received_at=received_at, seq=seq):
+            logger.warning(f"[{self.name}] Action not performed.")
+            return
+        if mjai_response["type"] == "reach":
+            self.client.put_message({
+                "type": "reach",
+                "actor": self.mjai_controller.bot.player_id,
+            })
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run several Mahjong Soul tables (one browser profile each) in one process.")
+    parser.add_argument("--tables", type=int, default=2, help="number of tables when no --profile is given")
+    parser.add_argument("--profile", action="append", type=Path,
+                        help="browser profile (user_data_dir) per table, repeatable")
+    parser.add_argument("--stagger", type=float, default=5.0,
+                        help="seconds between browser launches")
+    parser.add_argument("--no-autoplay", action="store_true", help="only run the bots (ignore settings.autoplay)")
+    args = parser.parse_args()
+
+    profiles = [p.resolve() for p in args.profile] if args.profile else [default_profile(i) for i in range(args.tables)]
+    if len(set(profiles)) != len(profiles):
+        # Chromium はプロファイルをロックするので同じディレクトリは 2 つ開けない
+        parser.error("each table needs its own --profile")
+
+    tables = [Table(f"t{i}", p, autoplay=False if args.no_autoplay else None) for i, p in enumerate(profiles)]
+    logger.info(f"Starting {len(tables)} tables: " + ", ".join(f"{t.name}={p}" for t, p in zip(tables, profiles)))
+    try:
+        for i, table in enumerate(tables):
+            if i:
+                time.sleep(args.stagger)
+            table.start()
+        while any(t.alive for t in tables):
+            time.sleep(1.0)
+        logger.info("All browsers closed.")
+    except KeyboardInterrupt:
+        logger.info("Stopping tables...")
+    finally:
+        for table in tables:
+            try:
+                table.stop()
+            except Exception:
+                logger.error(f"[{table.name}] Error while stopping: {traceback.format_exc()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Offline replay of recorded WebSocket frames (see bridge/recorder.py).
+
+Feeds a recording through the same pipeline as the live client, without a
+browser or network:
+
+    frame -> MajsoulBridge.parse -> mjai Controller.react (model)
+          -> AkagiBot.react -> AutoPlayMajsoul.act -> ClickSink
+
+    python -m playwright_client.replay logs/frames_20250101_120000_*.bin.gz
+    python -m playwright_client.replay rec.bin.gz --realtime --speed 4
+    python -m playwright_client.replay rec.bin.gz --decisions out.jsonl
+
+Every frame produced by the live session is replayed in order (one mjai batch
+per frame, like one main_loop tick), and a reach decision is fed back as a
+"reach" event just like AkagiApp.autoplay does. At the end it prints
+per-stage timings (parse / controller / bot / autoplay) and the decisions by
+type. --decisions writes one JSON line per decision for diffing two runs.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, Optional
+
+from .bridge import MajsoulBridge
+from .bridge.recorder import KIND_CLOSE, KIND_OPEN, Frame, _recording_order, iter_frames
+from .autoplay.util import Point
+
+STAGES = ("parse", "controller", "bot", "autoplay")
+
+
+class ClickSink:
+    """クリックの代わりに座標を記録するだけ"""
+
+    def __init__(self) -> None:
+        self.gestures: list[list[list[float]]] = []
+
+    def gesture(self, points: list[Point]) -> list[list[float]]:
+        steps = [[p.x, p.y, p.delay] for p in points]
+        self.gestures.append(steps)
+        return steps
+
+
+class StageTimer:
+    def __init__(self) -> None:
+        self.samples: dict[str, list[float]] = {name: [] for name in STAGES}
+
+    def add(self, stage: str, t0: float) -> None:
+        self.samples[stage].append((time.perf_counter() - t0) * 1000)
+
+    def report(self) -> str:
+        lines = []
+        for name in STAGES:
+            v = sorted(self.samples[name])
+            if not v:
+                lines.append(f"{name:>10}: n=0")
+                continue
+            p = lambda q: v[min(len(v) - 1, int(q * len(v)))]
+            lines.append(f"{name:>10}: n={len(v):6d} mean={statistics.fmean(v):8.3f}ms "
+                         f"p50={p(0.5):8.3f}ms p95={p(0.95):8.3f}ms max={v[-1]:8.3f}ms total={sum(v):9.1f}ms")
+        return "\n".join(lines)
+
+
+class Replay:
+    def __init__(self, with_bot: bool = True, decisions_path: Optional[Path] = None) -> None:
+        self.bridges: dict[int, MajsoulBridge] = {}
+        self.timer = StageTimer()
+        self.sink = ClickSink()
+        self.frames = 0
+        self.batches = 0
+        self.decisions: Counter[str] = Counter()
+        self._decisions_file = open(decisions_path, "w", encoding="utf-8") if decisions_path else None
+        self.mjai_controller = None
+        self.mjai_bot = None
+        self.autoplay = None
+        if with_bot:
+            # モデル読み込みを伴うので必要な時だけ import する
+            from mjai_bot.bot import AkagiBot
+            from mjai_bot.controller import Controller
+            from .autoplay.autoplay_majsoul import AutoPlayMajsoul
+            self.mjai_controller = Controller()
+            self.mjai_bot = AkagiBot()
+            self.autoplay = AutoPlayMajsoul()
+            self.autoplay.bot = self.mjai_bot
+
+    def feed(self, frame: Frame) -> None:
+        if frame.kind == KIND_OPEN:
+            self.bridges[frame.stream] = MajsoulBridge()
+            return
+        if frame.kind == KIND_CLOSE:
+            self.bridges.pop(frame.stream, None)
+            return
+        bridge = self.bridges.get(frame.stream)
+        if bridge is None:
+            # 記録が途中から始まっている：その stream 用に作る
+            bridge = self.bridges[frame.stream] = MajsoulBridge()
+        self.frames += 1
+        t0 = time.perf_counter()
+        try:
+            msgs = bridge.parse(frame.data)
+        except Exception:
+            msgs = None
+        self.timer.add("parse", t0)
+        if msgs:
+            self.react(msgs, frame.ts)
+
+    def react(self, msgs: list[dict], ts: float) -> None:
+        self.batches += 1
+        if self.mjai_controller is None:
+            return
+        t0 = time.perf_counter()
+        response = self.mjai_controller.react(msgs)
+        self.timer.add("controller", t0)
+
+        t0 = time.perf_counter()
+        self.mjai_bot.react(input_list=msgs)
+        self.timer.add("bot", t0)
+
+        can_act = self.mjai_bot.can_act_3p if self.mjai_bot.is_3p else self.mjai_bot.can_act
+        if response.get("type") == "none" and not can_act:
+            return
+        t0 = time.perf_counter()
+        points = self.autoplay.act(response, received_at=time.monotonic())
+        self.timer.add("autoplay", t0)
+        steps = self.sink.gesture(points) if points else []
+
+        self.decisions[response.get("type", "?")] += 1
+        if self._decisions_file is not None:
+            self._decisions_file.write(json.dumps(
+                {"ts": ts, "in": [m.get("type") for m in msgs], "out": response, "clicks": steps},
+                ensure_ascii=False) + "\n")
+        if response.get("type") == "reach":
+            # 実機では宣言後に reach イベントを client のキューへ戻している
+            self.react([{"type": "reach", "actor": self.mjai_controller.bot.player_id}], ts)
+
+    def close(self) -> None:
+        if self._decisions_file is not None:
+            self._decisions_file.close()
+
+
+def replay(paths: Iterable[Path], realtime: bool = False, speed: float = 1.0,
+           with_bot: bool = True, decisions_path: Optional[Path] = None) -> Replay:
+    r = Replay(with_bot=with_bot, decisions_path=decisions_path)
+    first_ts: Optional[float] = None
+    started = time.perf_counter()
+    try:
+        for path in paths:
+            for frame in iter_frames(path):
+                if realtime:
+                    if first_ts is None:
+                        first_ts = frame.ts
+                    wait = (frame.ts - first_ts) / speed - (time.perf_counter() - started)
+                    if wait > 0:
+                        time.sleep(wait)
+                r.feed(frame)
+    finally:
+        r.close()
+    return r
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay recorded Mahjong Soul frames through bridge, bot and autoplay.")
+    parser.add_argument("paths", nargs="+", type=Path, help="frames_*.bin.gz files, in order")
+    parser.add_argument("--realtime", action="store_true", help="keep the recorded pacing (default: full speed)")
+    parser.add_argument("--speed", type=float, default=1.0, help="pacing multiplier for --realtime")
+    parser.add_argument("--bridge-only", action="store_true", help="only parse frames (no model, no autoplay)")
+    parser.add_argument("--decisions", type=Path, help="write one JSON line per decision")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    r = replay(sorted(args.paths, key=_recording_order), args.realtime, args.speed, not args.bridge_only, args.decisions)
+    wall = time.perf_counter() - t0
+    print(f"{r.frames} frames, {r.batches} mjai batches, {len(r.sink.gestures)} gestures in {wall:.2f}s")
+    print(r.timer.report())
+    if r.decisions:
+        print("decisions: " + ", ".join(f"{k}={v}" for k, v in r.decisions.most_common()))
+
+
+if __name__ == "__main__":
+    main()
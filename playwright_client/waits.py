@@ -0,0 +1,159 @@
+"""
+Readiness signals for lobby automation.
+
+Instead of fixed wait_for_timeout() calls, lobby steps wait for something
+concrete to happen:
+
+ - WebSocket methods: MajsoulBridge reports every parsed liqi method
+   ("<method>:<Req|Res|Notify>", e.g. ".lq.Lobby.matchGame:Res",
+   ".lq.FastTest.authGame:Req") to `Signals.mark`.
+ - GameMgr state: one injected observer samples GameMgr.Inst in the page and
+   posts it back through page.expose_binding only when it changes; the fields
+   become "account_ready" / "in_hall" signals.
+
+All waits are bounded and pump Playwright events while they wait
+(page.wait_for_timeout in short slices), so WebSocket callbacks keep running.
+"""
+from __future__ import annotations
+
+import threading
+import time
+import weakref
+from typing import Callable
+
+from playwright.sync_api import Page
+
+from .logger import logger
+
+WAIT_SLICE_MS = 50
+
+# GameMgr.Inst を 250ms 毎に見て、変化した時だけ Python に通知する
+_STATE_OBSERVER_JS = r"""
+(() => {
+  if (window.__akagiObserverInstalled) return;
+  window.__akagiObserverInstalled = true;
+  let last = '';
+  const sample = () => {
+    try {
+      const inst = globalThis.GameMgr && GameMgr.Inst;
+      const st = {
+        id: (inst && typeof inst.account_id !== 'undefined') ? inst.account_id : -1,
+        hasAcc: !!(inst && inst.account_data),
+        hasNet: !!(globalThis.app && app.NetAgent && app.NetAgent.sendReq2Lobby),
+        inHall: !!(inst && (inst.in_hall || inst.in_lobby || inst.lobby)),
+      };
+      const key = JSON.stringify(st);
+      if (key !== last && window.__akagiState) {
+        last = key;
+        window.__akagiState(st);
+      }
+    } catch (e) {}
+  };
+  setInterval(sample, 250);
+})();
+"""
+
+
+class Signals:
+    """シグナル名 -> 最後に見た時刻（time.monotonic()）と回数"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._seen: dict[str, tuple[float, int]] = {}
+        self.state: dict = {}
+        self.observer = False
+
+    def mark(self, name: str) -> None:
+        with self._lock:
+            _, count = self._seen.get(name, (0.0, 0))
+            self._seen[name] = (time.monotonic(), count + 1)
+
+    def last(self, name: str) -> float | None:
+        with self._lock:
+            seen = self._seen.get(name)
+        return seen[0] if seen else None
+
+    def seen_since(self, name: str, since: float) -> bool:
+        t = self.last(name)
+        return t is not None and t >= since
+
+    def on_method(self, method: str, msg_type: str, data: dict | None = None) -> None:
+        self.mark(f"{method}:{msg_type}")
+        self.mark("ws")
+
+    def on_state(self, source, state: dict) -> None:
+        self.state = state or {}
+        if self.account_ready:
+            self.mark("account_ready")
+        if self.state.get("inHall"):
+            self.mark("in_hall")
+        logger.debug(f"[waits] GameMgr state: {self.state}")
+
+    @property
+    def account_ready(self) -> bool:
+        try:
+            return int(self.state.get("id", -1)) > 0 and bool(self.state.get("hasNet"))
+        except (TypeError, ValueError):
+            return False
+
+
+# ページオブジェクト自体をキーにする（id() は閉じたページの後に再利用され、古い observer=True を拾ってしまう）
+_signals: "weakref.WeakKeyDictionary[Page, Signals]" = weakref.WeakKeyDictionary()
+
+
+def signals_for(page: Page) -> Signals:
+    sig = _signals.get(page)
+    if sig is None:
+        sig = _signals[page] = Signals()
+    return sig
+
+
+def install_observer(page: Page) -> Signals:
+    """GameMgr 状態オブザーバをページに入れる（以降のナビゲーションにも適用）"""
+    sig = signals_for(page)
+    if sig.observer:
+        return sig
+    try:
+        page.expose_binding("__akagiState", sig.on_state)
+        page.add_init_script(_STATE_OBSERVER_JS)
+        sig.observer = True
+        # すでに読み込み済みのページにも入れておく
+        try:
+            page.evaluate(_STATE_OBSERVER_JS)
+        except Exception:
+            pass
+    except Exception as e:
+        logger.warning(f"[waits] GameMgr observer not installed: {e}")
+    return sig
+
+
+def wait_until(page: Page, predicate: Callable[[], bool], timeout_ms: int, label: str = "") -> bool:
+    """predicate() が True になるまで待つ（最大 timeout_ms）。True=成立, False=タイムアウト"""
+    t0 = time.monotonic()
+    end = t0 + timeout_ms / 1000.0
+    while True:
+        try:
+            if predicate():
+                if label:
+                    logger.debug(f"[waits] {label} after {(time.monotonic() - t0) * 1000:.0f}ms")
+                return True
+        except Exception:
+            pass
+        left = end - time.monotonic()
+        if left <= 0:
+            if label:
+                logger.warning(f"[waits] {label} timed out after {timeout_ms}ms")
+            return False
+        page.wait_for_timeout(min(WAIT_SLICE_MS, max(1, int(left * 1000))))
+
+
+def wait_for_signal(page: Page, name: str, since: float, timeout_ms: int) -> bool:
+    """since 以降に name のシグナルが来るまで待つ"""
+    sig = signals_for(page)
+    return wait_until(page, lambda: sig.seen_since(name, since), timeout_ms, label=name)
+
+
+def wait_for_quiet(page: Page, last_activity: Callable[[], float], quiet_ms: int, timeout_ms: int) -> bool:
+    """last_activity()（time.monotonic() 基準）から quiet_ms 何も起きなくなるまで待つ"""
+    quiet = quiet_ms / 1000.0
+    return wait_until(page, lambda: time.monotonic() - last_activity() >= quiet, timeout_ms, label=f"quiet {quiet_ms}ms")
@@ -1,6 +1,8 @@
 # __init__.py
 from .settings import Settings
 from .settings import load_settings, get_schema, get_settings, verify_settings, save_settings
+from .tunables import Tunables, TunablesStore, tunables_store
 
 __all__ = ["Settings", "load_settings",
-           "get_schema", "get_settings", "verify_settings", "save_settings"]
\ No newline at end of file
+           "get_schema", "get_settings", "verify_settings", "save_settings",
+           "Tunables", "TunablesStore", "tunables_store"]
\ No newline at end of file
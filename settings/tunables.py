@@ -0,0 +1,290 @@
+"""
+Autoplay / strategy tunables.
+
+All AKAGI_* knobs live in one frozen `Tunables` snapshot. Values are resolved as
+    dataclass default  <  settings/tunables.json  <  AKAGI_<FIELD_NAME> env var
+and validated (numeric, finite, ints must be integral); bad values are logged
+and ignored. `TunablesStore.get()` is cheap enough to call once per decision:
+it stats tunables.json at most once per `check_interval` and swaps in a new
+snapshot when the file changes, so tunables can be changed without a restart.
+
+settings/tunables.json example:
+    {"naki_prewait": 1.5, "fold_enable": 0}
+"""
+from __future__ import annotations
+
+import dataclasses
+import json
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Mapping
+
+from .logger import logger
+
+FILE_PATH = Path(__file__).resolve().parent
+TUNABLES_FILE = FILE_PATH / "tunables.json"
+ENV_PREFIX = "AKAGI_"
+
+
+@dataclasses.dataclass(frozen=True)
+class Tunables:
+    # --- Waits ---
+    naki_prewait: float = 2.0
+    reach_wait: float = 1.0
+    ron_wait: float = 1.0
+    tsumo_wait: float = 1.0
+    naki_button_wait: float = 0.5
+    naki_cand_wait: float = 0.25
+    naki_double_click: int = 0
+    naki_single_wait: float = 0.25
+    naki_none_prewait: float = 0.15
+    oya_first_dahai_extra: float = 2.0
+    dahai_think_min: float = 0.8
+    dahai_think_max: float = 1.0
+
+    # --- Timing planner (playwright_client/autoplay/timing.py) ---
+    timing_adaptive: int = 1  # 上流の遅延（受信→判断）を待ち時間から差し引く
+    timing_min_wait: float = 0.05  # 最初のクリック前に必ず残す待ち
+    timing_max_response: float = 6.0  # 受信からクリックまでの上限（秒）
+
+    # --- Tenpai bias ---
+    tenpai_bias_enable: int = 1
+    tenpai_bias_oya_shanten2: int = 1
+
+    # --- Naki safety (simple & strong) ---
+    naki_safety_enable: int = 1
+    naki_safety_junme_tight: int = 9  # earlier endgame
+    naki_safety_min_anpai: int = 3  # need >=3 safe tiles late
+
+    # --- Fold mode (simplified) ---
+    fold_enable: int = 1
+    fold_shanten_thresh: int = 3
+    fold_badness_score_thresh: int = 7
+    fold_early_junme: int = 7
+    fold_release_shanten: int = 1
+    fold_force_on_riichi: int = 1
+
+    # --- Oya endgame push (no KAN paths at all) ---
+    oya_endgame_push_enable: int = 1
+    oya_endgame_junme: int = 11
+    oya_endgame_allow_shanten2: int = 1
+    oya_endgame_min_anpai: int = 1
+    oya_endgame_allow_chi_pon: int = 1
+
+    # --- Anti-Last (no KAN paths at all) ---
+    anti_last_enable: int = 1
+    anti_last_junme: int = 12
+    anti_last_gap_min: int = 5000
+    anti_last_at_risk_lead: int = 3000
+    anti_last_allow_reach: int = 1
+    anti_last_allow_chi_pon: int = 1
+    anti_last_allow_child_shanten2: int = 1
+
+    # --- Score policy ---
+    scorepolicy_enable: int = 1
+    top_extra_anpai: int = 1
+    top_naki_shanten_max: int = 1
+    last_allow_shanten2: int = 1
+    near_gap_small: int = 2000
+
+    # --- Riichi gate ---
+    riichi_base_risk: float = 0.1
+    riichi_dealer_bonus: float = 0.22
+    riichi_threat_penalty: float = 0.32
+    riichi_place_penalty: float = 0.45
+
+    # --- Placement utility ---
+    utility_1st: float = 30.0
+    utility_2nd: float = 10.0
+    utility_3rd: float = -15.0
+    utility_4th: float = -40.0
+
+    # --- Dora aggression ---
+    mydora_risk_per_tile: float = 0.08
+    mydora_max_risk_bonus: float = 0.22
+
+    # --- Somete (self) relax switches ---
+    somete_enable: int = 1
+    somete_ratio: float = 0.8
+    somete_shanten_max: int = 3
+    somete_safety_relax: int = 1
+
+    # --- Somete CARE (opponent) switches ---
+    somete_care_enable: int = 1
+    somete_care_threat_gate: float = 0.5
+    somete_care_other_suit_discards: int = 6
+    somete_care_target_suit_max: int = 1
+
+    # --- Oya yakuhai force-pon ---
+    oya_yakuhai_force_pon: int = 1
+
+    # --- Naki progress override (取りこぼし救済) ---
+    naki_progress_override_enable: int = 1
+    naki_progress_max_junme: int = 12
+    naki_progress_threat_max: float = 0.7
+
+    # --- Somete progress override (自分の染め手で“鳴けば前進”を救う) ---
+    somete_progress_override_enable: int = 1
+    somete_progress_max_junme: int = 12
+    somete_progress_threat_max: float = 0.6
+    somete_progress_relax_anpai: int = 1
+
+    # --- Naki Chain (連鎖鳴き) overrides ---
+    naki_chain_enable: int = 1
+    naki_chain_max: int = 2
+    naki_chain_window_junme: int = 2
+    naki_chain_threat_max: float = 0.65
+    naki_chain_relax_anpai: int = 1
+
+    # --- KAN policy switches ---
+    kan_enable: int = 1
+    ankan_enable: int = 1
+    kakan_enable: int = 1
+    daiminkan_enable: int = 0
+    kan_threat_max: float = 0.5
+    kan_late_junme_block: int = 12
+    kan_min_anpai_vs_riichi: int = 2
+    kan_allow_if_anti_last: int = 1
+    kan_allow_if_somete: int = 1
+    kan_allow_if_need_big: int = 1
+    ankan_min_shanten: int = 1
+    kakan_require_tenpai: int = 1
+    kakan_min_shape_good: float = 0.6
+    dmk_early_junme: int = 6
+
+    # --- OYA-TENPAI 強化用 knobs（追加） ---
+    oya_tenpai_force_enable: int = 1
+    oya_tenpai_force_threat: float = 0.55
+    oya_tenpai_force_gain: float = 0.0  # 受け入れ増などの閾値補助（0で無効）
+
+    # --- Strategy layer (last_avoid / safety) ---
+    last_avoid_danger_high: float = 0.5
+    last_avoid_danger_low: float = 0.8
+    last_avoid_must_fold: int = 8000
+    last_avoid_can_escape: int = 2000
+    early_dealer_riichi_turn: int = 8
+    early_dealer_riichi_add: float = 0.10
+
+    # --- Table tracking ---
+    init_live_tiles_4p: int = 70
+    init_live_tiles_3p: int = 83
+
+    @staticmethod
+    def env_name(field_name: str) -> str:
+        return ENV_PREFIX + field_name.upper()
+
+
+# 指定がなければ別フィールドの値を引き継ぐもの
+_DERIVED_DEFAULTS = {
+    "naki_single_wait": "naki_cand_wait",
+}
+
+
+def _coerce(name: str, default: Any, raw: Any) -> Any:
+    if isinstance(raw, bool):
+        raw = int(raw)
+    value = float(raw)  # str / int / float
+    if not math.isfinite(value):
+        raise ValueError(f"{name} must be finite")
+    if isinstance(default, int):
+        if not value.is_integer():
+            raise ValueError(f"{name} must be an integer")
+        return int(value)
+    return value
+
+
+def build_tunables(file_values: Mapping[str, Any], environ: Mapping[str, str] = os.environ) -> Tunables:
+    known = {f.name: f for f in dataclasses.fields(Tunables)}
+    for key in file_values:
+        if key not in known:
+            logger.warning(f"tunables: unknown key {key!r} ignored")
+
+    values: dict[str, Any] = {}
+    explicit: set[str] = set()
+    for name, f in known.items():
+        value = f.default
+        for source, raw in (("file", file_values.get(name)), ("env", environ.get(Tunables.env_name(name)))):
+            if raw is None:
+                continue
+            try:
+                value = _coerce(name, f.default, raw)
+                explicit.add(name)
+            except (TypeError, ValueError) as e:
+                logger.warning(f"tunables: invalid {source} value for {name}: {raw!r} ({e})")
+        values[name] = value
+
+    for name, base in _DERIVED_DEFAULTS.items():
+        if name not in explicit:
+            values[name] = values[base]
+    return Tunables(**values)
+
+
+class TunablesStore:
+    def __init__(self, path: Path = TUNABLES_FILE, check_interval: float = 1.0):
+        self.path = Path(path)
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._mtime: float | None = None
+        self._next_check = 0.0
+        self._current = self._load()
+
+    def _read_file(self) -> dict[str, Any]:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            self._mtime = None
+            return {}
+        self._mtime = stat.st_mtime
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            raise ValueError("tunables.json must be a JSON object")
+        return data
+
+    def _load(self) -> Tunables:
+        try:
+            file_values = self._read_file()
+        except (OSError, ValueError) as e:
+            logger.error(f"tunables: failed to read {self.path}: {e}")
+            file_values = {}
+        return build_tunables(file_values)
+
+    def get(self) -> Tunables:
+        now = time.monotonic()
+        if now < self._next_check:
+            return self._current
+        with self._lock:
+            if now < self._next_check:
+                return self._current
+            self._next_check = now + self.check_interval
+            try:
+                mtime = self.path.stat().st_mtime
+            except FileNotFoundError:
+                mtime = None
+            if mtime != self._mtime:
+                self.reload()
+        return self._current
+
+    def reload(self) -> Tunables:
+        previous = self._current if hasattr(self, "_current") else None
+        try:
+            file_values = self._read_file()
+        except (OSError, ValueError) as e:
+            # 壊れたファイルでは今の値を維持する
+            logger.error(f"tunables: keep previous values, failed to read {self.path}: {e}")
+            return self._current
+        self._current = build_tunables(file_values)
+        if previous is not None and previous != self._current:
+            changed = {
+                f.name: getattr(self._current, f.name)
+                for f in dataclasses.fields(Tunables)
+                if getattr(previous, f.name) != getattr(self._current, f.name)
+            }
+            logger.info(f"tunables reloaded: {changed}")
+        return self._current
+
+
+tunables_store = TunablesStore()
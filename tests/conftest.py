@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# akagi / playwright_client / mjai_bot はリポジトリ直下のパッケージ
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,123 @@
+"""mjai_bot.inference.ot_client against the local OT stand-in (mjai_bot.inference.ot_stub_server)."""
+from __future__ import annotations
+
+import threading
+
+import numpy as np
+import pytest
+
+from mjai_bot.inference.ot_client import (
+    OBS_BITS, OBS_FLOAT32, OTClient,
+    decode_request, decode_response, encode_request, encode_response,
+)
+from mjai_bot.inference.ot_stub_server import make_server
+
+ACTION_SPACE = 46
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(**kwargs):
+        server = make_server(port=0, **kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _batch(batch: int = 3, bits: bool = True, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    if bits:
+        obs = [(rng.random((7, 34)) < 0.3).astype(np.float32) for _ in range(batch)]
+    else:
+        obs = [rng.standard_normal((7, 34)).astype(np.float32) for _ in range(batch)]
+    masks = [rng.random(ACTION_SPACE) < 0.5 for _ in range(batch)]
+    for m in masks:
+        m[0] = True  # 合法手が 1 つは必要
+    return obs, masks
+
+
+def _client(server, binary: bool) -> OTClient:
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    return OTClient(base, "test", "/react_batch", timeout=5.0, binary=binary)
+
+
+def _check(result, masks) -> None:
+    actions, q_out, out_masks, is_greedy = result
+    assert len(actions) == len(q_out) == len(out_masks) == len(is_greedy) == len(masks)
+    for a, q, m, expected in zip(actions, q_out, out_masks, masks):
+        assert len(q) == ACTION_SPACE
+        assert m == expected.tolist()
+        assert m[a]
+
+
+@pytest.mark.parametrize("bits", [True, False])
+def test_request_codec_round_trip(bits):
+    obs, masks = _batch(bits=bits)
+    data = encode_request(obs, masks)
+    assert data[5] == (OBS_BITS if bits else OBS_FLOAT32)
+    if bits:
+        # 0/1 の obs は 1 要素 1 ビット
+        assert len(data) < sum(o.size for o in obs) // 8 + 100
+    dec_obs, dec_masks = decode_request(data)
+    assert np.array_equal(dec_obs, np.stack(obs))
+    assert np.array_equal(dec_masks, np.stack(masks))
+
+
+def test_response_codec_round_trip():
+    q = np.random.default_rng(1).standard_normal((3, ACTION_SPACE)).astype(np.float32)
+    masks = [[i % (k + 2) == 0 for i in range(ACTION_SPACE)] for k in range(3)]
+    actions, q_out, out_masks, is_greedy = decode_response(encode_response([0, 2, 45], q, masks, [True, False, True]))
+    assert actions == [0, 2, 45]
+    assert np.array_equal(np.asarray(q_out, dtype=np.float32), q)
+    assert out_masks == masks
+    assert is_greedy == [True, False, True]
+
+
+def test_binary_is_negotiated(serve):
+    server = serve()
+    client = _client(server, binary=True)
+    try:
+        for seed in range(2):
+            obs, masks = _batch(seed=seed)
+            _check(client.react_batch(obs, masks), masks)
+    finally:
+        client.close()
+    assert client.binary_supported is True
+    assert server.received == [("/react_batch", "binary")] * 2
+
+
+def test_legacy_json_by_default(serve):
+    server = serve()
+    client = _client(server, binary=False)
+    try:
+        obs, masks = _batch(bits=False)
+        _check(client.react_batch(obs, masks), masks)
+    finally:
+        client.close()
+    assert client.binary_supported is False
+    assert server.received == [("/react_batch", "json")]
+
+
+def test_falls_back_to_legacy_on_error(serve):
+    server = serve(legacy_only=True)
+    client = _client(server, binary=True)
+    try:
+        for seed in range(2):
+            obs, masks = _batch(seed=seed)
+            _check(client.react_batch(obs, masks), masks)
+    finally:
+        client.close()
+    assert client.binary_supported is False
+    # 最初の 1 回だけ binary を試し、以降は JSON のみ
+    assert server.received == [
+        ("/react_batch", "binary-rejected"),
+        ("/react_batch", "json"),
+        ("/react_batch", "json"),
+    ]
@@ -0,0 +1,131 @@
+"""akagi.outbox against the local Slack/LINE stand-in (akagi.notify_stub_server)."""
+from __future__ import annotations
+
+import sqlite3
+import threading
+
+import pytest
+
+from akagi import outbox as outbox_mod
+from akagi.notify_stub_server import NotifyStubServer
+from akagi.outbox import LineSender, Outbox, Sender, SlackSender, XSender
+
+
+@pytest.fixture
+def stub():
+    server = NotifyStubServer(("127.0.0.1", 0), quiet=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def box(tmp_path, monkeypatch):
+    monkeypatch.setattr(outbox_mod, "COALESCE_DELAY", 0.05)
+    monkeypatch.setattr(outbox_mod, "BACKOFF_BASE", 0.01)
+    ob = Outbox(tmp_path / "outbox.sqlite3")
+    yield ob
+    ob.stop()
+
+
+def _base(server: NotifyStubServer) -> str:
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def _statuses(ob: Outbox, channel: str) -> list[str]:
+    conn = sqlite3.connect(ob.path)
+    try:
+        return [s for (s,) in conn.execute("SELECT status FROM outbox WHERE channel=? ORDER BY id", (channel,))]
+    finally:
+        conn.close()
+
+
+def test_slack_and_line_are_delivered(stub, box):
+    box.register("slack", SlackSender("xoxb-test", "C123", api_base=_base(stub) + "/api"))
+    box.register("line", LineSender("line-token", "U123", api_base=_base(stub)))
+    box.enqueue("slack", {"text": "hello slack"})
+    box.enqueue("line", {"text": "hello line"})
+    assert box.flush(timeout=5)
+    assert ("slack", "hello slack") in stub.received
+    assert ("line", "hello line") in stub.received
+
+
+def test_coalescing_keeps_each_destination(stub, box):
+    box.register("slack", SlackSender("xoxb-test", "C123", api_base=_base(stub) + "/api"))
+    box.enqueue("slack", {"text": "a"})
+    box.enqueue("slack", {"text": "b"})
+    box.enqueue("slack", {"text": "reply", "thread_ts": "123.456"})
+    box.enqueue("slack", {"text": "other", "channel": "C999"})
+    assert box.flush(timeout=5)
+    bodies = [body for channel, body in stub.bodies if channel == "slack"]
+    assert [b["text"] for b in bodies] == ["a\n\nb", "reply", "other"]
+    assert bodies[0]["channel"] == "C123" and "thread_ts" not in bodies[0]
+    assert bodies[1]["thread_ts"] == "123.456"
+    assert bodies[2]["channel"] == "C999"
+
+
+def test_rate_limit_is_retried(stub, box):
+    stub.rate_limit_every = 2
+    box.register("slack", SlackSender("xoxb-test", "C123", api_base=_base(stub) + "/api"))
+    for i in range(3):
+        box.enqueue("slack", {"text": f"m{i}", "thread_ts": str(i)})  # まとめられないように宛先を分ける
+    assert box.flush(timeout=10)
+    assert sorted(t for c, t in stub.received if c == "slack") == ["m0", "m1", "m2"]
+
+
+class _Raising(Sender):
+    name = "broken"
+
+    def __init__(self, exc: BaseException) -> None:
+        self.exc = exc
+        self.calls = 0
+
+    def send(self, payload):
+        self.calls += 1
+        raise self.exc
+
+
+def test_sender_exception_counts_as_attempt_and_does_not_block_others(stub, box, monkeypatch):
+    monkeypatch.setattr(outbox_mod, "MAX_ATTEMPTS", 3)
+    broken = _Raising(RuntimeError("boom"))
+    box.register("broken", broken)
+    box.register("slack", SlackSender("xoxb-test", "C123", api_base=_base(stub) + "/api"))
+    box.enqueue("broken", {"text": "never"})
+    box.enqueue("slack", {"text": "still delivered"})
+    assert box.flush(timeout=10)
+    assert ("slack", "still delivered") in stub.received
+    assert broken.calls == 3
+    assert _statuses(box, "broken") == ["dead"]
+
+
+def test_x_missing_image_is_dead_and_images_are_removed(tmp_path, box):
+    image = tmp_path / "summary.png"
+    image.write_bytes(b"png")
+    posted = []
+
+    def post(text, images):
+        for path in images:
+            open(path, "rb").close()
+        posted.append(text)
+        return 201, {"data": {"id": "1"}}
+
+    box.register("x", XSender(post))
+    box.enqueue("x", {"text": "gone", "images": [str(tmp_path / "missing.png")]})
+    box.enqueue("x", {"text": "ok", "images": [str(image)], "delete_images": True})
+    assert box.flush(timeout=5)
+    assert posted == ["ok"]
+    assert _statuses(box, "x") == ["dead", "sent"]
+    assert not image.exists()
+
+
+def test_x_without_stored_token_fails_fast(box, monkeypatch):
+    from akagi import x_post
+
+    monkeypatch.setattr(x_post, "CLIENT_ID", "client")
+    monkeypatch.setattr(x_post, "load_tokens", lambda: {})
+    box.register("x", XSender())
+    box.enqueue("x", {"text": "needs auth"})
+    assert box.flush(timeout=5)
+    assert _statuses(box, "x") == ["dead"]